@@ -5,7 +5,6 @@ from discord.ext import commands, tasks
 import os
 import asyncio
 import datetime
-import aiohttp
 import logging
 import sys
 import pathlib
@@ -29,6 +28,7 @@ from utils import upload_to_drive
 from utils.database_updater import DatabaseUpdater
 
 from utils.discord_tools import send_guild_log
+from utils.http_client import HttpClient
 
 # --- Enhanced Bot Manager for Better Instance Management ---
 class BotManager:
@@ -93,7 +93,8 @@ async def create_db_pool_in_bot():
 async def add_reaction_role_to_db(pool, guild_id: int, message_id: int, channel_id: int, emoji: str, role_id: int):
     current_logger = logging.getLogger('discord')
     current_logger.debug(
-        f"DB: Attempting to add reaction role for G:{guild_id}, M:{message_id}, C:{channel_id}, E:{emoji}, R:{role_id}")
+        "DB: Attempting to add reaction role for G:%s, M:%s, C:%s, E:%s, R:%s",
+        guild_id, message_id, channel_id, emoji, role_id)
 
     if not pool:
         current_logger.error("DB: No database pool available")
@@ -684,6 +685,7 @@ class MyBot(commands.Bot):
         super().__init__(command_prefix=command_prefix, intents=intents)
         self.start_time = datetime.now(pytz.utc)
         self.pool = None
+        self.http_client = None
         self.session = None
         self.command_counts = {}
         self.total_commands_today = 0
@@ -693,8 +695,9 @@ class MyBot(commands.Bot):
 
     async def setup_hook(self):
         """Enhanced setup with better error handling and graceful degradation"""
-        # Initialize HTTP session first
-        self.session = aiohttp.ClientSession()
+        # Initialize the shared pooled HTTP client first; session stays as an alias for older code
+        self.http_client = HttpClient()
+        self.session = self.http_client.session
 
         # Initialize database pool with graceful degradation
         try:
@@ -808,6 +811,7 @@ class MyBot(commands.Bot):
         # Core extensions (no dependencies) - COINS MUST BE FIRST
         core_extensions = [
             'cogs.coins',
+            'cogs.scheduler',
             'cogs.xp',
             'cogs.clear_messages',
             'cogs.voice',
@@ -828,6 +832,7 @@ class MyBot(commands.Bot):
         # Casino extensions (depend on coins)
         casino_extensions = [
             'cogs.casino_base',
+            'cogs.game_sessions',  # Must load before games so they can register restorers
             'cogs.lottery',
             'cogs.casino_blackjack',
             'cogs.casino_roulette',
@@ -1165,9 +1170,9 @@ class MyBot(commands.Bot):
                 self.logger.info("Database pool connection closed successfully.")
 
             # Close HTTP session
-            if self.session and not self.session.closed:
+            if self.http_client and not self.http_client.closed:
                 self.logger.info("Closing HTTP session...")
-                await self.session.close()
+                await self.http_client.close()
                 self.logger.info("HTTP session closed successfully.")
 
             # Close Discord connection
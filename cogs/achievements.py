@@ -1012,7 +1012,7 @@ class Achievements(commands.Cog):
         # Joined a voice channel
         if before.channel is None and after.channel is not None:
             user_data["voice_join_time"] = now
-            self.logger.debug(f"사용자 {member.name}가 음성 채널에 접속함.", extra={'guild_id': guild_id})
+            self.logger.debug("사용자 %s가 음성 채널에 접속함.", member.name, extra={'guild_id': guild_id})
 
         # Left a voice channel
         elif before.channel is not None and after.channel is None:
@@ -1025,7 +1025,7 @@ class Achievements(commands.Cog):
                 user_data["voice_time"] = user_data.get("voice_time", 0) + duration
                 user_data["voice_join_time"] = None
                 self.save_data()
-                self.logger.debug(f"사용자 {member.name}가 음성 채널을 떠남. 접속 시간: {duration:.2f}초",
+                self.logger.debug("사용자 %s가 음성 채널을 떠남. 접속 시간: %.2f초", member.name, duration,
                                   extra={'guild_id': guild_id})
 
     @tasks.loop(minutes=5)
@@ -1,7 +1,7 @@
 # cogs/betting_v2.py
 from typing import Optional, Dict, List
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import asyncio
 from datetime import datetime, timezone, timedelta
@@ -10,10 +10,53 @@ import os
 
 from utils.logger import get_logger
 from utils import config
+from cogs.scheduler import get_scheduler
 
 # 상수
 BETTING_CONTROL_CHANNEL_ID = 1419346557232484352
 BETTING_CATEGORY_ID = 1417712502220783716
+PLAYER_DISPLAY_LIMIT = 5  # 옵션별로 임베드에 표시하는 플레이어 수
+
+
+class BettingEventState:
+    """이벤트별 실시간 집계 (옵션별 풀, 베팅 인원, 상위 베팅 플레이어)
+
+    Kept in step with betting_option_totals on every bet, so the live embed is
+    rendered from memory instead of re-aggregating betting_bets_v2.
+    """
+
+    def __init__(self, event, options: List[str]):
+        self.event_id = event['id']
+        self.title = event['title']
+        self.status = event['status']
+        self.ends_at = event['ends_at']
+        self.channel_id = event['channel_id']
+        self.message_id = event['message_id']
+        self.options = options
+        self.pools = [0] * len(options)
+        self.bettors = [0] * len(options)
+        # option_index -> {user_id: amount}, only the largest PLAYER_DISPLAY_LIMIT bets
+        self.top_players: List[Dict[int, int]] = [{} for _ in options]
+
+    @property
+    def total_pool(self) -> int:
+        return sum(self.pools)
+
+    @property
+    def unique_bettors(self) -> int:
+        # 한 사람당 하나의 옵션에만 베팅 가능
+        return sum(self.bettors)
+
+    def apply_bet(self, user_id: int, option_index: int, added: int, new_total: int, is_new_bettor: bool):
+        """베팅 하나를 집계에 반영"""
+        self.pools[option_index] += added
+        if is_new_bettor:
+            self.bettors[option_index] += 1
+
+        players = self.top_players[option_index]
+        players[user_id] = new_total
+        if len(players) > PLAYER_DISPLAY_LIMIT:
+            del players[min(players, key=players.get)]
 
 
 class SimpleBettingCog(commands.Cog):
@@ -22,6 +65,11 @@ class SimpleBettingCog(commands.Cog):
         self.logger = get_logger("베팅시스템")
         self.logger.info("베팅 시스템 초기화 중...")
 
+        # 이벤트별 실시간 집계와 디바운스된 디스플레이 갱신
+        self.event_states: Dict[int, BettingEventState] = {}
+        self.pending_display_updates: Dict[int, bool] = {}  # event_id: bool
+        self.display_update_delay = 3  # seconds
+
         # 초기화 작업 시작
         self.bot.loop.create_task(self.initialize())
 
@@ -29,7 +77,7 @@ class SimpleBettingCog(commands.Cog):
         """베팅 시스템 초기화"""
         await self.bot.wait_until_ready()
         await self.setup_database()
-        self.cleanup_task.start()
+        await self.setup_scheduled_jobs()
         await self.setup_control_panel()
 
         # Re-register existing betting views after restart
@@ -70,10 +118,76 @@ class SimpleBettingCog(commands.Cog):
                 )
             """)
 
+            # 옵션별 누적 집계 (베팅과 같은 트랜잭션에서 갱신)
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS betting_option_totals (
+                    event_id INTEGER REFERENCES betting_events_v2(id) ON DELETE CASCADE,
+                    option_index INTEGER NOT NULL,
+                    pool BIGINT NOT NULL DEFAULT 0,
+                    bettors INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (event_id, option_index)
+                )
+            """)
+
+            # 집계 테이블 도입 전부터 진행 중이던 이벤트를 맞춰 둠
+            await self.bot.pool.execute("""
+                INSERT INTO betting_option_totals (event_id, option_index, pool, bettors)
+                SELECT b.event_id, b.option_index, SUM(b.amount), COUNT(*)
+                FROM betting_bets_v2 b
+                JOIN betting_events_v2 e ON e.id = b.event_id
+                WHERE e.status IN ('active', 'closed')
+                GROUP BY b.event_id, b.option_index
+                ON CONFLICT (event_id, option_index)
+                DO UPDATE SET pool = EXCLUDED.pool, bettors = EXCLUDED.bettors
+            """)
+
             self.logger.info("데이터베이스 설정 완료")
         except Exception as e:
             self.logger.error(f"데이터베이스 설정 실패: {e}")
 
+    async def setup_scheduled_jobs(self):
+        """마감/채널 삭제 작업을 스케줄러에 등록하고 진행 중인 이벤트의 마감을 예약"""
+        scheduler = get_scheduler(self.bot)
+        if not scheduler:
+            self.logger.warning("작업 스케줄러가 없어 베팅 자동 마감이 비활성화됩니다.")
+            return
+
+        scheduler.register_handler('betting_close', self.run_scheduled_close)
+        scheduler.register_handler('betting_channel_delete', self.run_scheduled_channel_deletion)
+
+        # 재시작 중 지난 마감 시간도 여기서 예약되어 즉시 실행됨
+        try:
+            events = await self.bot.pool.fetch("""
+                SELECT id, guild_id, ends_at FROM betting_events_v2
+                WHERE status = 'active' AND ends_at IS NOT NULL
+            """)
+            await scheduler.schedule_many('betting_close', [
+                (f"betting_close:{event['id']}", event['ends_at'], {'event_id': event['id']}, event['guild_id'])
+                for event in events
+            ])
+        except Exception as e:
+            self.logger.error(f"베팅 마감 예약 실패: {e}")
+
+    async def run_scheduled_close(self, payload: dict):
+        """마감 시간이 된 이벤트를 자동으로 마감"""
+        event_id = payload['event_id']
+        self.logger.info(f"Event ID {event_id} has expired. Automatically closing betting.")
+        await self.close_betting(event_id)
+
+    async def run_scheduled_channel_deletion(self, payload: dict):
+        """종료된 이벤트 채널 삭제"""
+        channel_id = payload['channel_id']
+        event_id = payload['event_id']
+        channel = self.bot.get_channel(channel_id)
+        if channel:
+            try:
+                await channel.delete(reason=f"베팅 이벤트 {event_id} 종료 후 자동 삭제")
+                self.logger.info(f"베팅 채널 {channel_id} 자동 삭제 완료")
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                self.logger.error(f"채널 삭제 실패: {e}")
+
     async def setup_control_panel(self):
         """제어판 설정"""
         try:
@@ -206,6 +320,12 @@ class SimpleBettingCog(commands.Cog):
                 RETURNING id
             """, guild_id, title, json.dumps(options), creator_id, end_time, betting_channel.id)
 
+            # 마감 시간에 정확히 자동 마감
+            scheduler = get_scheduler(self.bot)
+            if scheduler:
+                await scheduler.schedule('betting_close', f"betting_close:{event_id}", end_time,
+                                         {'event_id': event_id}, guild_id)
+
             # 베팅 메시지 생성
             await self.create_betting_message(event_id, betting_channel)
 
@@ -258,6 +378,10 @@ class SimpleBettingCog(commands.Cog):
                 UPDATE betting_events_v2 SET message_id = $1 WHERE id = $2
             """, message.id, event_id)
 
+            state = self.event_states.get(event_id)
+            if state:
+                state.message_id = message.id
+
             # 뷰 등록
             self.bot.add_view(view, message_id=message.id)
 
@@ -266,36 +390,63 @@ class SimpleBettingCog(commands.Cog):
         except Exception as e:
             self.logger.error(f"베팅 메시지 생성 실패: {e}")
 
+    async def get_event_state(self, event_id: int, event=None) -> Optional[BettingEventState]:
+        """이벤트 집계 가져오기 (처음 한 번만 DB에서 불러옴)"""
+        state = self.event_states.get(event_id)
+        if state:
+            return state
+
+        if event is None:
+            event = await self.bot.pool.fetchrow("SELECT * FROM betting_events_v2 WHERE id = $1", event_id)
+            if not event:
+                return None
+
+        state = BettingEventState(event, json.loads(event['options']))
+
+        totals = await self.bot.pool.fetch("""
+            SELECT option_index, pool, bettors FROM betting_option_totals WHERE event_id = $1
+        """, event_id)
+        for row in totals:
+            if row['option_index'] < len(state.options):
+                state.pools[row['option_index']] = row['pool']
+                state.bettors[row['option_index']] = row['bettors']
+
+        # 옵션별 상위 베팅만 불러옴
+        top_bets = await self.bot.pool.fetch("""
+            SELECT option_index, user_id, amount FROM (
+                SELECT option_index, user_id, amount,
+                       ROW_NUMBER() OVER (PARTITION BY option_index ORDER BY amount DESC) AS rank
+                FROM betting_bets_v2 WHERE event_id = $1
+            ) ranked
+            WHERE rank <= $2
+        """, event_id, PLAYER_DISPLAY_LIMIT)
+        for bet in top_bets:
+            if bet['option_index'] < len(state.options):
+                state.top_players[bet['option_index']][bet['user_id']] = bet['amount']
+
+        self.event_states[event_id] = state
+        return state
+
     async def create_betting_embed(self, event_id: int, options: List[str], event) -> discord.Embed:
         """베팅 임베드 생성 (플레이어 목록 포함)"""
-        # 베팅 통계 가져오기
-        stats = await self.bot.pool.fetch("""
-            SELECT option_index, COUNT(*) as bets, SUM(amount) as total
-            FROM betting_bets_v2 
-            WHERE event_id = $1
-            GROUP BY option_index
-            ORDER BY option_index
-        """, event_id)
+        state = await self.get_event_state(event_id, event)
+        return self.render_betting_embed(state)
 
-        # 각 옵션별 베팅한 플레이어 목록 가져오기
-        player_bets = await self.bot.pool.fetch("""
-            SELECT option_index, user_id, amount
-            FROM betting_bets_v2 
-            WHERE event_id = $1
-            ORDER BY option_index, amount DESC
-        """, event_id)
+    def render_betting_embed(self, state: BettingEventState) -> discord.Embed:
+        """메모리 집계로 베팅 임베드 렌더링"""
+        options = state.options
 
         # 상태에 따른 제목과 색상 설정
-        if event['status'] == 'active':
-            title = f"🎲 {event['title']}"
+        if state.status == 'active':
+            title = f"🎲 {state.title}"
             description = "옵션을 선택하고 베팅하세요!"
             color = discord.Color.gold()
-        elif event['status'] == 'closed':
-            title = f"⏸️ {event['title']} - 베팅 마감"
+        elif state.status == 'closed':
+            title = f"⏸️ {state.title} - 베팅 마감"
             description = "베팅이 마감되었습니다. 결과 발표를 기다려주세요!"
             color = discord.Color.orange()
         else:
-            title = f"🏆 {event['title']} - 종료"
+            title = f"🏆 {state.title} - 종료"
             description = "베팅이 종료되었습니다!"
             color = discord.Color.green()
 
@@ -306,29 +457,14 @@ class SimpleBettingCog(commands.Cog):
         )
 
         # 통계 계산
-        total_pool = sum(stat['total'] or 0 for stat in stats)
-        unique_bettors = await self.bot.pool.fetchval("""
-            SELECT COUNT(DISTINCT user_id) FROM betting_bets_v2 WHERE event_id = $1
-        """, event_id) or 0
-
-        # 옵션별 플레이어 목록 정리
-        players_by_option = {}
-        for bet in player_bets:
-            option_idx = bet['option_index']
-            if option_idx not in players_by_option:
-                players_by_option[option_idx] = []
-            players_by_option[option_idx].append({
-                'user_id': bet['user_id'],
-                'amount': bet['amount']
-            })
+        total_pool = state.total_pool
+        unique_bettors = state.unique_bettors
 
         # 옵션별 정보 표시
         option_text = ""
         for i, option in enumerate(options):
-            # 해당 옵션의 통계 찾기
-            option_stats = next((s for s in stats if s['option_index'] == i), None)
-            bets_count = option_stats['bets'] if option_stats else 0
-            amount = option_stats['total'] if option_stats else 0
+            bets_count = state.bettors[i]
+            amount = state.pools[i]
 
             percentage = (amount / total_pool * 100) if total_pool > 0 else 0
 
@@ -344,30 +480,29 @@ class SimpleBettingCog(commands.Cog):
             option_text += f"💰 **{amount:,}** 코인 ({bets_count}명) - **{percentage:.1f}%**\n"
             option_text += f"📊 {bar} **{percentage:.1f}%**\n"
 
-            if event['status'] in ['active', 'closed']:
+            if state.status in ['active', 'closed']:
                 option_text += f"💸 예상 배당률: **x{payout_ratio:.2f}**\n"
 
             # 플레이어 목록 추가
-            if i in players_by_option:
-                players = players_by_option[i]
+            if state.top_players[i]:
+                players = sorted(state.top_players[i].items(), key=lambda p: p[1], reverse=True)
                 player_list = []
 
                 # 최대 5명까지만 표시 (너무 길어지지 않도록)
-                display_limit = 5
-                for j, player in enumerate(players[:display_limit]):
+                for user_id, player_amount in players:
                     try:
-                        user = self.bot.get_user(player['user_id'])
-                        username = user.display_name if user else f"User#{player['user_id']}"
+                        user = self.bot.get_user(user_id)
+                        username = user.display_name if user else f"User#{user_id}"
                         # 사용자명이 너무 길면 줄임
                         if len(username) > 12:
                             username = username[:10] + ".."
-                        player_list.append(f"{username}({player['amount']:,})")
+                        player_list.append(f"{username}({player_amount:,})")
                     except:
-                        player_list.append(f"User#{player['user_id']}({player['amount']:,})")
+                        player_list.append(f"User#{user_id}({player_amount:,})")
 
                 # 더 많은 플레이어가 있으면 표시
-                if len(players) > display_limit:
-                    player_list.append(f"외 {len(players) - display_limit}명")
+                if bets_count > len(players):
+                    player_list.append(f"외 {bets_count - len(players)}명")
 
                 if player_list:
                     option_text += f"👥 **베팅한 플레이어**: {', '.join(player_list)}\n"
@@ -386,12 +521,12 @@ class SimpleBettingCog(commands.Cog):
                         value=f"총 베팅액: **{total_pool:,}** 코인\n참여자: **{unique_bettors}**명",
                         inline=True)
 
-        if event['status'] == 'active':
+        if state.status == 'active':
             embed.add_field(name="⏰ 종료 시간",
-                            value=f"<t:{int(event['ends_at'].timestamp())}:R>",
+                            value=f"<t:{int(state.ends_at.timestamp())}:R>",
                             inline=True)
             embed.set_footer(text="아래 버튼을 클릭하여 베팅하세요 | 한 사람당 하나의 옵션에만 베팅 가능")
-        elif event['status'] == 'closed':
+        elif state.status == 'closed':
             embed.set_footer(text="베팅이 마감되어 더 이상 새로운 베팅을 받지 않습니다")
         else:
             embed.set_footer(text="베팅이 종료되었습니다")
@@ -483,21 +618,39 @@ class SimpleBettingCog(commands.Cog):
             # 기존 베팅이 있으면 업데이트, 없으면 새로 생성
             options = json.loads(event['options'])
 
-            if existing_bet:
-                self.logger.info(
-                    f"Updating existing bet from {existing_bet['amount']} to {existing_bet['amount'] + amount}")
-                # 기존 베팅에 추가
-                new_total_amount = existing_bet['amount'] + amount
-
-                # Check if the update actually happens
-                update_result = await self.bot.pool.execute("""
-                    UPDATE betting_bets_v2 
-                    SET amount = $1, placed_at = NOW()
-                    WHERE user_id = $2 AND event_id = $3
-                """, new_total_amount, user_id, event_id)
-
-                self.logger.info(f"Update result: {update_result}")
+            # 베팅 기록과 옵션별 집계를 같은 트랜잭션에서 갱신
+            async with self.bot.pool.acquire() as conn:
+                async with conn.transaction():
+                    if existing_bet:
+                        # 기존 베팅에 추가
+                        new_total_amount = await conn.fetchval("""
+                            UPDATE betting_bets_v2 
+                            SET amount = amount + $1, placed_at = NOW()
+                            WHERE user_id = $2 AND event_id = $3
+                            RETURNING amount
+                        """, amount, user_id, event_id)
+                    else:
+                        # 새 베팅 기록
+                        await conn.execute("""
+                            INSERT INTO betting_bets_v2 (event_id, user_id, guild_id, option_index, amount)
+                            VALUES ($1, $2, $3, $4, $5)
+                        """, event_id, user_id, guild_id, option_index, amount)
+                        new_total_amount = amount
+
+                    await conn.execute("""
+                        INSERT INTO betting_option_totals (event_id, option_index, pool, bettors)
+                        VALUES ($1, $2, $3, $4)
+                        ON CONFLICT (event_id, option_index)
+                        DO UPDATE SET pool = betting_option_totals.pool + EXCLUDED.pool,
+                                      bettors = betting_option_totals.bettors + EXCLUDED.bettors
+                    """, event_id, option_index, amount, 0 if existing_bet else 1)
+
+            state = self.event_states.get(event_id)
+            if state:
+                state.apply_bet(user_id, option_index, amount, new_total_amount, not existing_bet)
 
+            if existing_bet:
+                self.logger.info(f"Updated existing bet to {new_total_amount}")
                 result = {
                     'success': True,
                     'option_name': options[option_index],
@@ -507,13 +660,7 @@ class SimpleBettingCog(commands.Cog):
                     'is_additional_bet': True
                 }
             else:
-                self.logger.info("Creating new bet")
-                # 새 베팅 기록
-                await self.bot.pool.execute("""
-                    INSERT INTO betting_bets_v2 (event_id, user_id, guild_id, option_index, amount)
-                    VALUES ($1, $2, $3, $4, $5)
-                """, event_id, user_id, guild_id, option_index, amount)
-
+                self.logger.info("Created new bet")
                 result = {
                     'success': True,
                     'option_name': options[option_index],
@@ -524,9 +671,7 @@ class SimpleBettingCog(commands.Cog):
                 }
 
             # 베팅 디스플레이 업데이트 (중요: 두 경우 모두에서 실행되어야 함)
-            self.logger.info("About to update betting display")
-            await self.update_betting_display(event_id)
-            self.logger.info("Betting display update completed")
+            self.request_display_update(event_id)
 
             return result
 
@@ -536,35 +681,40 @@ class SimpleBettingCog(commands.Cog):
             self.logger.error(f"베팅 실패 스택트레이스: {traceback.format_exc()}")
             return {'success': False, 'reason': '내부 오류가 발생했습니다'}
 
+    def request_display_update(self, event_id: int):
+        """디스플레이 갱신 요청 병합: 이벤트당 대기 중인 갱신은 최대 하나"""
+        if self.pending_display_updates.get(event_id, False):
+            return
+
+        self.pending_display_updates[event_id] = True
+        self.bot.loop.create_task(self._run_display_update(event_id))
+
+    async def _run_display_update(self, event_id: int):
+        """디바운스 후 최신 집계로 한 번만 갱신"""
+        await asyncio.sleep(self.display_update_delay)
+        # 갱신 중 들어온 베팅은 다음 갱신을 예약하도록 먼저 해제
+        self.pending_display_updates[event_id] = False
+        await self.update_betting_display(event_id)
+
     async def update_betting_display(self, event_id: int):
         """베팅 디스플레이 업데이트"""
         try:
-            # 이벤트 가져오기
-            event = await self.bot.pool.fetchrow("""
-                SELECT * FROM betting_events_v2 WHERE id = $1
-            """, event_id)
-
-            if not event or not event['message_id']:
+            state = await self.get_event_state(event_id)
+            if not state or not state.message_id:
                 return
 
             # 채널과 메시지 가져오기
-            channel = self.bot.get_channel(event['channel_id'])
+            channel = self.bot.get_channel(state.channel_id)
             if not channel:
                 return
 
+            # 업데이트된 임베드 생성 후 메시지를 다시 불러오지 않고 바로 수정
+            embed = self.render_betting_embed(state)
             try:
-                message = await channel.fetch_message(event['message_id'])
+                await channel.get_partial_message(state.message_id).edit(embed=embed)
             except discord.NotFound:
                 return
 
-            options = json.loads(event['options'])
-
-            # 업데이트된 임베드 생성
-            embed = await self.create_betting_embed(event_id, options, event)
-
-            # 메시지 업데이트
-            await message.edit(embed=embed)
-
         except Exception as e:
             self.logger.error(f"베팅 디스플레이 업데이트 실패: {e}")
 
@@ -581,6 +731,15 @@ class SimpleBettingCog(commands.Cog):
             if result == "UPDATE 0":
                 return {'success': False, 'reason': '활성화된 이벤트를 찾을 수 없습니다'}
 
+            state = self.event_states.get(event_id)
+            if state:
+                state.status = 'closed'
+
+            # 수동 마감된 경우 예약된 자동 마감 취소
+            scheduler = get_scheduler(self.bot)
+            if scheduler:
+                await scheduler.cancel(f"betting_close:{event_id}")
+
             # 디스플레이 업데이트
             await self.update_betting_display(event_id)
 
@@ -604,56 +763,32 @@ class SimpleBettingCog(commands.Cog):
             if event['status'] not in ['active', 'closed']:
                 return {'success': False, 'reason': '이미 종료된 이벤트입니다'}
 
-            # 이벤트 상태 업데이트
-            await self.bot.pool.execute("""
-                UPDATE betting_events_v2 
-                SET status = 'ended', winner_option = $1 
-                WHERE id = $2
-            """, winner_index, event_id)
-
-            # 모든 베팅 가져오기
-            all_bets = await self.bot.pool.fetch("""
-                SELECT * FROM betting_bets_v2 WHERE event_id = $1
-            """, event_id)
+            settlement = await self.settle_event(event_id, winner_index)
+            if settlement is None:
+                return {'success': False, 'reason': '이미 종료된 이벤트입니다'}
 
-            # 배당금 계산
-            total_pool = sum(bet['amount'] for bet in all_bets)
-            winning_bets = [bet for bet in all_bets if bet['option_index'] == winner_index]
-            winning_pool = sum(bet['amount'] for bet in winning_bets)
-
-            if winning_pool > 0 and total_pool > 0:
-                coins_cog = self.bot.get_cog('CoinsCog')
-                if coins_cog:
-                    for bet in winning_bets:
-                        # 배당금 계산 (전체 풀에서 비례 분배)
-                        payout = int((bet['amount'] / winning_pool) * total_pool)
-
-                        # 배당금 지급
-                        await coins_cog.add_coins(
-                            bet['user_id'],
-                            bet['guild_id'],
-                            payout,
-                            "betting_win",
-                            f"베팅 승리: {event['title']}"
-                        )
-
-                        # 베팅 기록 업데이트
-                        await self.bot.pool.execute("""
-                            UPDATE betting_bets_v2 SET payout = $1 WHERE id = $2
-                        """, payout, bet['id'])
+            # 종료된 이벤트는 실시간 집계가 더 이상 필요 없음
+            self.event_states.pop(event_id, None)
 
             # 최종 디스플레이 업데이트
             await self.update_final_display(event_id, winner_index)
 
-            # 10분 후 채널 삭제 스케줄
-            channel_id = event['channel_id']
-            if channel_id:
-                asyncio.create_task(self.schedule_channel_deletion(channel_id, event_id))
+            # 자동 마감 취소 후 10분 뒤 채널 삭제 예약 (재시작해도 유지됨)
+            scheduler = get_scheduler(self.bot)
+            if scheduler:
+                await scheduler.cancel(f"betting_close:{event_id}")
+                channel_id = event['channel_id']
+                if channel_id:
+                    await scheduler.schedule(
+                        'betting_channel_delete', f"betting_channel_delete:{event_id}",
+                        datetime.now(timezone.utc) + timedelta(minutes=10),
+                        {'channel_id': channel_id, 'event_id': event_id}, event['guild_id']
+                    )
 
             return {
                 'success': True,
-                'winners': len(winning_bets),
-                'total_payout': total_pool,
+                'winners': settlement['winners'],
+                'total_payout': settlement['total_pool'],
                 'winner_option': json.loads(event['options'])[winner_index]
             }
 
@@ -661,22 +796,80 @@ class SimpleBettingCog(commands.Cog):
             self.logger.error(f"베팅 종료 실패: {e}")
             return {'success': False, 'reason': str(e)}
 
-    async def schedule_channel_deletion(self, channel_id: int, event_id: int):
-        """10분 후 채널 삭제 스케줄"""
-        try:
-            # 10분 대기
-            await asyncio.sleep(600)  # 600초 = 10분
-
-            channel = self.bot.get_channel(channel_id)
-            if channel:
-                try:
-                    await channel.delete(reason=f"베팅 이벤트 {event_id} 종료 후 자동 삭제")
-                    self.logger.info(f"베팅 채널 {channel_id} 자동 삭제 완료")
-                except discord.HTTPException as e:
-                    self.logger.error(f"채널 삭제 실패: {e}")
+    async def settle_event(self, event_id: int, winner_index: int) -> Optional[Dict]:
+        """이벤트 정산: 상태 변경, 배당금 지급, 거래 기록, 베팅 기록을 하나의 트랜잭션으로 처리
+
+        이미 종료된 이벤트라면 (동시 호출 포함) None을 반환합니다.
+        """
+        async with self.bot.pool.acquire() as conn:
+            async with conn.transaction():
+                # Only one caller can move the event to 'ended', so payouts are never applied twice
+                event = await conn.fetchrow("""
+                    UPDATE betting_events_v2
+                    SET status = 'ended', winner_option = $1
+                    WHERE id = $2 AND status IN ('active', 'closed')
+                    RETURNING id, guild_id, title
+                """, winner_index, event_id)
+                if not event:
+                    return None
+
+                bets = await conn.fetch("""
+                    SELECT id, user_id, guild_id, option_index, amount
+                    FROM betting_bets_v2 WHERE event_id = $1
+                """, event_id)
+
+                # 배당금 계산 (전체 풀에서 비례 분배)
+                total_pool = sum(bet['amount'] for bet in bets)
+                winning_bets = [bet for bet in bets if bet['option_index'] == winner_index]
+                winning_pool = sum(bet['amount'] for bet in winning_bets)
+
+                payouts = []
+                if winning_pool > 0:
+                    payouts = [(bet, bet['amount'] * total_pool // winning_pool) for bet in winning_bets]
+
+                if payouts:
+                    bet_ids = [bet['id'] for bet, _ in payouts]
+                    user_ids = [bet['user_id'] for bet, _ in payouts]
+                    guild_ids = [bet['guild_id'] for bet, _ in payouts]
+                    amounts = [payout for _, payout in payouts]
+                    description = f"베팅 승리: {event['title']}"
+
+                    await conn.execute("""
+                        UPDATE betting_bets_v2 AS b SET payout = p.payout
+                        FROM UNNEST($1::int[], $2::int[]) AS p(id, payout)
+                        WHERE b.id = p.id
+                    """, bet_ids, amounts)
+
+                    await conn.execute("""
+                        INSERT INTO user_coins (user_id, guild_id, coins, total_earned)
+                        SELECT user_id, guild_id, SUM(payout), SUM(payout)
+                        FROM UNNEST($1::bigint[], $2::bigint[], $3::int[]) AS p(user_id, guild_id, payout)
+                        GROUP BY user_id, guild_id
+                        ON CONFLICT (user_id, guild_id)
+                        DO UPDATE SET
+                            coins = user_coins.coins + EXCLUDED.coins,
+                            total_earned = user_coins.total_earned + EXCLUDED.coins
+                    """, user_ids, guild_ids, amounts)
+
+                    await conn.execute("""
+                        INSERT INTO coin_transactions (user_id, guild_id, amount, transaction_type, description)
+                        SELECT user_id, guild_id, payout, 'betting_win', $4
+                        FROM UNNEST($1::bigint[], $2::bigint[], $3::int[]) AS p(user_id, guild_id, payout)
+                    """, user_ids, guild_ids, amounts, description)
+
+        # 리더보드는 정산이 끝난 뒤 한 번만 갱신
+        coins_cog = self.bot.get_cog('CoinsCog')
+        if coins_cog and payouts:
+            for guild_id in {bet['guild_id'] for bet, _ in payouts}:
+                coins_cog.request_leaderboard_update(guild_id)
+
+        total_paid = sum(payout for _, payout in payouts)
+        self.logger.info(
+            f"베팅 이벤트 {event_id} 정산 완료: 승자 {len(payouts)}명, 총 {total_paid:,} 코인 지급",
+            extra={'guild_id': event['guild_id']}
+        )
 
-        except Exception as e:
-            self.logger.error(f"채널 삭제 스케줄 오류: {e}")
+        return {'winners': len(winning_bets), 'total_pool': total_pool, 'total_paid': total_paid}
 
     async def update_final_display(self, event_id: int, winner_index: int):
         """최종 결과로 디스플레이 업데이트"""
@@ -745,25 +938,6 @@ class SimpleBettingCog(commands.Cog):
         except Exception as e:
             self.logger.error(f"최종 디스플레이 업데이트 실패: {e}")
 
-    @tasks.loop(minutes=1)
-    async def cleanup_task(self):
-        """만료된 이벤트를 자동으로 마감합니다."""
-        try:
-            # Find active events where the end time has passed.
-            expired_events = await self.bot.pool.fetch("""
-                    SELECT id FROM betting_events_v2
-                    WHERE status = 'active' AND ends_at < NOW()
-                """)
-
-            for event in expired_events:
-                event_id = event['id']
-                self.logger.info(f"Event ID {event_id} has expired. Automatically closing betting.")
-                # Call the close_betting function to handle closing and display updates.
-                await self.close_betting(event_id)
-
-        except Exception as e:
-            self.logger.error(f"An error occurred in the betting cleanup task: {e}")
-
     # 슬래시 명령어들
     @app_commands.command(name="베팅마감", description="베팅을 마감하여 새로운 베팅을 받지 않습니다 (관리자 전용)")
     @app_commands.describe(event_id="마감할 이벤트 ID")
@@ -2,16 +2,18 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
 import random
+from functools import partial
 from typing import Dict, List, Optional
 
 from utils.logger import get_logger
+from utils.lobby import RoundLobby
 from utils.config import (
     is_feature_enabled,
     is_server_configured
 )
 from cogs.coins import check_user_casino_eligibility # <--- ADD THIS LINE
+from cogs.game_sessions import get_session_cog
 
 
 class BingoCard:
@@ -23,6 +25,21 @@ class BingoCard:
         # Mark the center space as free
         self.marked[2][2] = True
 
+        # number -> (row, col), so marking a called number is a dict lookup
+        self.positions = {
+            cell: (i, j)
+            for i, row in enumerate(self.card)
+            for j, cell in enumerate(row)
+            if cell != 'FREE'
+        }
+
+        # Marked cells per row, column and diagonal; the free center counts toward
+        # row 2, column 2 and both diagonals
+        self.row_hits = [0, 0, 1, 0, 0]
+        self.col_hits = [0, 0, 1, 0, 0]
+        self.diag_hits = [1, 1]  # [main (i == j), anti (i + j == 4)]
+        self.has_line = False
+
     def generate_card(self):
         """Generate a 5x5 bingo card"""
         card = []
@@ -47,33 +64,35 @@ class BingoCard:
         return card
 
     def mark_number(self, number):
-        """Mark a number on the card if it exists"""
-        for i in range(5):
-            for j in range(5):
-                if self.card[i][j] == number:
-                    self.marked[i][j] = True
-                    return True
-        return False
+        """Mark a number on the card if it exists, updating line counters in O(1)"""
+        position = self.positions.get(number)
+        if position is None:
+            return False
+
+        i, j = position
+        if self.marked[i][j]:
+            return False
+        self.marked[i][j] = True
+
+        self.row_hits[i] += 1
+        self.col_hits[j] += 1
+        if self.row_hits[i] == 5 or self.col_hits[j] == 5:
+            self.has_line = True
+
+        if i == j:
+            self.diag_hits[0] += 1
+            if self.diag_hits[0] == 5:
+                self.has_line = True
+        if i + j == 4:
+            self.diag_hits[1] += 1
+            if self.diag_hits[1] == 5:
+                self.has_line = True
+
+        return True
 
     def check_bingo(self):
         """Check if there's a bingo (line, column, or diagonal)"""
-        # Check rows
-        for row in self.marked:
-            if all(row):
-                return True
-
-        # Check columns
-        for j in range(5):
-            if all(self.marked[i][j] for i in range(5)):
-                return True
-
-        # Check diagonals
-        if all(self.marked[i][i] for i in range(5)):
-            return True
-        if all(self.marked[i][4 - i] for i in range(5)):
-            return True
-
-        return False
+        return self.has_line
 
     def format_card_compact(self):
         """Format the card in a more compact, readable way"""
@@ -129,6 +148,11 @@ class MultiBingoView(discord.ui.View):
         self.max_calls = 75  # All possible numbers
         self.join_phase = True
         self.game_message = None
+        # Every number is called at most once, so the whole call order is drawn up front
+        self.call_sequence = random.sample(range(1, 76), 75)
+        self.session_id: Optional[str] = None
+        # Join bookkeeping plus the auto-start and number-calling timers
+        self.lobby = RoundLobby(min_players=2, max_players=4)
         self.logger = get_logger("빙고")
 
         # Add the initial player
@@ -136,18 +160,26 @@ class MultiBingoView(discord.ui.View):
 
     def add_player(self, user_id: int, username: str, bet: int):
         """Add a player to the game"""
-        if user_id not in self.players and len(self.players) < 4:  # Max 4 players for better display
+        if self.lobby.join(user_id):  # Max 4 players for better display
             self.players[user_id] = BingoPlayer(user_id, username, bet)
             return True
         return False
 
     def remove_player(self, user_id: int):
         """Remove a player from the game"""
-        if user_id in self.players and not self.game_started:
+        if self.lobby.leave(user_id):
             del self.players[user_id]
             return True
         return False
 
+    def snapshot(self) -> dict:
+        """Serializable checkpoint of the round"""
+        return {
+            'players': {str(uid): p.bet for uid, p in self.players.items()},
+            'called_numbers': self.called_numbers,
+            'game_started': self.game_started,
+        }
+
     def create_bingo_display(self, last_called=None):
         """Create standardized bingo display"""
         if last_called:
@@ -179,8 +211,16 @@ class MultiBingoView(discord.ui.View):
 
         return display
 
+    async def auto_start(self, interaction: discord.Interaction):
+        """Auto-start timer: begin the round if enough players joined"""
+        if self.lobby.has_enough_players:
+            await self.start_game(interaction)
+
     async def start_game(self, interaction: discord.Interaction):
         """Start the bingo game"""
+        if not self.lobby.start():
+            return
+
         self.join_phase = False
         self.game_started = True
 
@@ -190,35 +230,28 @@ class MultiBingoView(discord.ui.View):
                 if item.custom_id in ['join_game', 'leave_game', 'start_now']:
                     item.disabled = True
 
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.checkpoint(self.session_id, self.snapshot())
+
         # Show initial game state with all cards
         embed = self.create_game_embed()
         await interaction.edit_original_response(embed=embed, view=self)
 
-        # Auto-call numbers every 4 seconds
-        while not self.game_over and self.numbers_called < self.max_calls:
-            await asyncio.sleep(4)
-
-            if self.game_over:
-                break
-
-            await self.call_next_number(interaction)
-
-        # Game timeout
-        if not self.game_over:
-            await self.end_game(interaction, "모든 번호 호출됨 - 승자 없음!")
+        # Auto-call numbers every 4 seconds; each call schedules the next one
+        self.lobby.schedule(4, partial(self.call_next_number, interaction))
 
     async def call_next_number(self, interaction: discord.Interaction):
         """Call the next bingo number and update ALL cards publicly"""
-        # Generate list of uncalled numbers
-        all_numbers = list(range(1, 76))
-        available_numbers = [n for n in all_numbers if n not in self.called_numbers]
+        if self.game_over:
+            return
 
-        if not available_numbers:
-            await self.end_game(interaction, "모든 번호가 호출되었습니다!")
+        if self.numbers_called >= self.max_calls:
+            await self.end_game(interaction, "모든 번호 호출됨 - 승자 없음!")
             return
 
-        # Call a random number
-        called_number = random.choice(available_numbers)
+        # Take the next number from the pre-shuffled sequence
+        called_number = self.call_sequence[self.numbers_called]
         self.called_numbers.append(called_number)
         self.numbers_called += 1
 
@@ -226,8 +259,7 @@ class MultiBingoView(discord.ui.View):
         new_winners = []
         for player in self.players.values():
             if not player.has_bingo:
-                player.card.mark_number(called_number)
-                if player.card.check_bingo():
+                if player.card.mark_number(called_number) and player.card.check_bingo():
                     player.has_bingo = True
                     player.bingo_achieved_at = self.numbers_called
                     new_winners.append(player)
@@ -246,6 +278,8 @@ class MultiBingoView(discord.ui.View):
             # If Discord edit fails, log but continue game
             print(f"Failed to update bingo display: {e}")
 
+        self.lobby.schedule(4, partial(self.call_next_number, interaction))
+
     def create_game_embed(self, last_called=None):
         """Create the game display embed with standardized format"""
         if self.join_phase:
@@ -374,7 +408,11 @@ class MultiBingoView(discord.ui.View):
 
     async def end_game(self, interaction: discord.Interaction, reason: str):
         """End the bingo game"""
+        if self.game_over:
+            return
         self.game_over = True
+        self.lobby.close()
+        self.release_channel()
 
         # Disable all buttons
         for item in self.children:
@@ -400,6 +438,11 @@ class MultiBingoView(discord.ui.View):
                         extra={'guild_id': interaction.guild.id}
                     )
 
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.close_session(self.session_id)
+        self.session_id = None
+
         embed = self.create_game_embed()
 
         try:
@@ -407,6 +450,12 @@ class MultiBingoView(discord.ui.View):
         except discord.NotFound:
             pass
 
+    def release_channel(self):
+        """Let a new game start in this channel"""
+        cog = self.bot.get_cog('BingoCog')
+        if cog and cog.active_games.get(self.channel_id) is self:
+            del cog.active_games[self.channel_id]
+
     @discord.ui.button(label="🎲 게임 참가", style=discord.ButtonStyle.green, custom_id="join_game")
     async def join_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not self.join_phase:
@@ -417,7 +466,7 @@ class MultiBingoView(discord.ui.View):
             await interaction.response.send_message("❌ 이미 이 게임에 참가하셨습니다!", ephemeral=True)
             return
 
-        if len(self.players) >= 4:
+        if self.lobby.is_full:
             await interaction.response.send_message("❌ 게임이 가득 찼습니다! (최대 4명)", ephemeral=True)
             return
 
@@ -453,12 +502,22 @@ class MultiBingoView(discord.ui.View):
             await interaction.response.send_message("❌ 베팅 처리에 실패했습니다!", ephemeral=True)
             return
 
-        # Add player
-        self.add_player(interaction.user.id, interaction.user.display_name, required_bet)
+        # Add player; the round may have started or filled up while the bet was being taken
+        if not self.add_player(interaction.user.id, interaction.user.display_name, required_bet):
+            await coins_cog.add_coins(interaction.user.id, interaction.guild.id, required_bet, "bingo_refund",
+                                      "빙고 게임 참가 실패 환불")
+            await interaction.response.send_message("❌ 게임이 이미 시작되었거나 가득 찼습니다! 베팅이 환불되었습니다.",
+                                                    ephemeral=True)
+            return
 
         embed = self.create_game_embed()
         await interaction.response.edit_message(embed=embed, view=self)
 
+        # Escrow write happens after responding so DB latency can't push the click past the interaction deadline
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.add_stake(self.session_id, interaction.user.id, interaction.guild.id, required_bet)
+
     @discord.ui.button(label="❌ 게임 나가기", style=discord.ButtonStyle.red, custom_id="leave_game")
     async def leave_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not self.join_phase:
@@ -488,10 +547,19 @@ class MultiBingoView(discord.ui.View):
         # Remove player
         self.remove_player(interaction.user.id)
 
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.release_stake(self.session_id, interaction.user.id)
+
         # If no players left, disable the view
         if not self.players:
             for item in self.children:
                 item.disabled = True
+            if sessions:
+                await sessions.close_session(self.session_id)
+            self.session_id = None
+            self.lobby.close()
+            self.release_channel()
 
         embed = self.create_game_embed()
         await interaction.response.edit_message(embed=embed, view=self)
@@ -588,23 +656,18 @@ class BingoCog(commands.Cog):
         # Update the first player with the actual username
         game_view.players[interaction.user.id].username = interaction.user.display_name
 
+        # Escrow bets until the round is paid out
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            game_view.session_id = await sessions.open_session(
+                'bingo', interaction.guild.id, channel_id, {interaction.user.id: bet}, game_view.snapshot()
+            )
+
         embed = game_view.create_game_embed()
         await interaction.response.send_message(embed=embed, view=game_view)
 
-        # Auto-start after 30 seconds if enough players
-        await asyncio.sleep(30)
-
-        if (channel_id in self.active_games and
-                self.active_games[channel_id].join_phase and
-                len(self.active_games[channel_id].players) >= 2):
-            try:
-                await self.active_games[channel_id].start_game(interaction)
-            except:
-                pass  # Game might have been manually started or cancelled
-
-        # Clean up finished games
-        if channel_id in self.active_games and self.active_games[channel_id].game_over:
-            del self.active_games[channel_id]
+        # Auto-start after 30 seconds if enough players; "지금 시작" cancels this timer
+        game_view.lobby.schedule(30, partial(game_view.auto_start, interaction))
 
         self.logger.info(
             f"{interaction.user}가 {bet}코인으로 멀티플레이어 빙고 게임을 시작했습니다",
@@ -2,20 +2,22 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import random
-from typing import List, Dict
+import uuid
+from typing import List, Dict, Optional
 
 from utils.logger import get_logger
+from utils.cards import Shoe, BJ_POINTS, IS_ACE, RANKS, blackjack_value, is_soft, card_str, cards_str, rank_label
 from utils.config import (
     is_feature_enabled,
     get_server_setting
 )
 from cogs.coins import check_user_casino_eligibility
+from cogs.game_sessions import get_session_cog
 
 class BlackjackView(discord.ui.View):
     """Enhanced Blackjack with double down, insurance, and split"""
 
-    def __init__(self, bot, user_id: int, bet: int):
+    def __init__(self, bot, user_id: int, bet: int, state: Optional[dict] = None, shoe: Optional[Shoe] = None):
         super().__init__(timeout=180)
         self.bot = bot
         self.user_id = user_id
@@ -26,17 +28,24 @@ class BlackjackView(discord.ui.View):
         self.is_split = False
         self.current_hand = 0
         self.split_hands = []
+        self.session_id: Optional[str] = None
+        self.round_id = f"blackjack:{uuid.uuid4().hex}"
 
-        # Create and shuffle deck
-        self.deck = self.create_deck()
-        random.shuffle(self.deck)
+        # Deal from the table's shared shoe (4 decks, reshuffled past the cut card once no hand is in play)
+        self.shoe = shoe or Shoe(decks=4)
+        self.shoe.start_round()
+        self.round_open = True
+
+        if state:
+            self.load_state(state)
+            return
 
         # Deal initial hands
         self.player_hand = [self.draw_card(), self.draw_card()]
         self.dealer_hand = [self.draw_card(), self.draw_card()]
 
         # Check for dealer ace (insurance option)
-        self.can_insure = self.dealer_hand[0]['rank'] == 'A'
+        self.can_insure = IS_ACE[self.dealer_hand[0]]
 
         # Check for natural blackjack
         self.player_blackjack = self.calculate_hand_value(self.player_hand) == 21
@@ -46,44 +55,77 @@ class BlackjackView(discord.ui.View):
         if self.player_blackjack:
             self.game_over = True
 
-    def create_deck(self) -> List[Dict]:
-        """Create multiple decks for more realistic play"""
-        suits = ['♠️', '♥️', '♦️', '♣️']
-        ranks = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
-
-        deck = []
-        # Use 4 decks for more realistic casino experience
-        for _ in range(4):
-            for suit in suits:
-                for rank in ranks:
-                    value = 11 if rank == 'A' else (10 if rank in ['J', 'Q', 'K'] else int(rank))
-                    deck.append({'rank': rank, 'suit': suit, 'value': value})
-
-        return deck
-
-    def draw_card(self) -> Dict:
-        """Draw a card from deck"""
-        if len(self.deck) < 10:  # Reshuffle if running low
-            self.deck = self.create_deck()
-            random.shuffle(self.deck)
-        return self.deck.pop()
-
-    def calculate_hand_value(self, hand: List[Dict]) -> int:
-        """Calculate hand value with proper ace handling"""
-        total = sum(card['value'] for card in hand)
-        aces = sum(1 for card in hand if card['rank'] == 'A')
-
-        while total > 21 and aces > 0:
-            total -= 10
-            aces -= 1
+    def snapshot(self) -> dict:
+        """Serializable checkpoint of the hand. The shoe is reshuffled on restore."""
+        return {
+            'user_id': self.user_id,
+            'bet': self.bet,
+            'player_hand': self.player_hand,
+            'dealer_hand': self.dealer_hand,
+            'split_hands': self.split_hands,
+            'is_split': self.is_split,
+            'current_hand': self.current_hand,
+            'doubled_down': self.doubled_down,
+            'insurance_bet': self.insurance_bet,
+        }
+
+    def load_state(self, state: dict):
+        """Rebuild the hand from a checkpoint"""
+        self.player_hand = state['player_hand']
+        self.dealer_hand = state['dealer_hand']
+        self.split_hands = state.get('split_hands', [])
+        self.is_split = state.get('is_split', False)
+        self.current_hand = state.get('current_hand', 0)
+        self.doubled_down = state.get('doubled_down', False)
+        self.insurance_bet = state.get('insurance_bet', 0)
+
+        self.can_insure = IS_ACE[self.dealer_hand[0]]
+        self.player_blackjack = not self.is_split and self.calculate_hand_value(self.player_hand) == 21 and len(self.player_hand) == 2
+        self.dealer_blackjack = self.calculate_hand_value(self.dealer_hand) == 21
 
-        return total
+        # Buttons mirror what the player could still do at the checkpoint
+        for item in self.children:
+            if getattr(item, 'custom_id', None) == "double_down":
+                item.disabled = not self.can_double_down()
+            elif getattr(item, 'custom_id', None) == "split":
+                item.disabled = not self.can_split()
+            elif getattr(item, 'custom_id', None) == "insurance":
+                item.disabled = not self.can_insure or self.insurance_bet > 0
+
+    async def checkpoint(self):
+        """Persist the current decision point to the session registry"""
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.checkpoint(self.session_id, self.snapshot())
+
+    async def close_session(self):
+        """Mark the session settled so its escrow is not refunded on restart"""
+        if self.round_open:
+            # The hand is finished, so it no longer holds off a reshuffle of the shared shoe
+            self.round_open = False
+            self.shoe.end_round()
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.close_session(self.session_id)
+        self.session_id = None
+
+    async def on_timeout(self):
+        """An abandoned hand forfeits the bet, so the escrow is dropped too"""
+        await self.close_session()
+
+    def draw_card(self) -> int:
+        """Draw a card from the shoe"""
+        return self.shoe.draw()
+
+    def calculate_hand_value(self, hand: List[int]) -> int:
+        """Calculate hand value with proper ace handling"""
+        return blackjack_value(hand)
 
-    def hand_to_string(self, hand: List[Dict], hide_first: bool = False) -> str:
+    def hand_to_string(self, hand: List[int], hide_first: bool = False) -> str:
         """Convert hand to display string"""
         if hide_first:
-            return f"🔒 {hand[0]['rank']}{hand[0]['suit']}"
-        return ' '.join(f"{card['rank']}{card['suit']}" for card in hand)
+            return f"🔒 {card_str(hand[0])}"
+        return cards_str(hand)
 
     def can_double_down(self) -> bool:
         """Check if player can double down"""
@@ -97,8 +139,8 @@ class BlackjackView(discord.ui.View):
 
         # Can split if both cards have same rank or both are 10-value cards
         card1, card2 = self.player_hand
-        return (card1['rank'] == card2['rank'] or
-                (card1['value'] == 10 and card2['value'] == 10))
+        return (RANKS[card1] == RANKS[card2] or
+                (BJ_POINTS[card1] == 10 and BJ_POINTS[card2] == 10))
 
     async def create_embed(self, final: bool = False) -> discord.Embed:
         """Create standardized game state embed"""
@@ -148,7 +190,7 @@ class BlackjackView(discord.ui.View):
 
         if self.player_blackjack:
             game_display += " (Blackjack)"
-        elif any(c['rank'] == 'A' for c in self.player_hand) and player_value <= 21:
+        elif is_soft(self.player_hand):
             game_display += " (Soft)"
 
         embed.add_field(name="🎯 게임 현황", value=game_display, inline=False)
@@ -270,10 +312,10 @@ class BlackjackView(discord.ui.View):
             from cogs.lottery import add_casino_fee_to_lottery
             await add_casino_fee_to_lottery(self.bot, interaction.guild.id, loss_contribution)
 
-        # Only add coins if there's actually a payout
-        if total_payout > 0:
-            await coins_cog.add_coins(self.user_id, interaction.guild.id, total_payout, "blackjack_win",
-                                      "Blackjack payout")
+        # Stakes were taken as the hand was played; settle records the round and pays out exactly once
+        await coins_cog.settle(self.round_id, self.user_id, interaction.guild.id, 0, total_payout, "blackjack",
+                               "Blackjack payout")
+        await self.close_session()
 
         embed = await self.create_embed(final=True)
 
@@ -330,9 +372,9 @@ class BlackjackView(discord.ui.View):
         total_bet = self.bet * 2
         net_result = total_payout - total_bet
 
-        if total_payout > 0:
-            await coins_cog.add_coins(self.user_id, interaction.guild.id, total_payout, "blackjack_split_win",
-                                      "Blackjack split payout")
+        await coins_cog.settle(self.round_id, self.user_id, interaction.guild.id, 0, total_payout, "blackjack_split",
+                               "Blackjack split payout")
+        await self.close_session()
 
         embed = await self.create_split_embed(final=True)
 
@@ -395,6 +437,7 @@ class BlackjackView(discord.ui.View):
                 if hasattr(item, 'custom_id') and item.custom_id in ["double_down", "split"]:
                     item.disabled = True
 
+        await self.checkpoint()
         embed = await self.create_embed()
         await interaction.edit_original_response(embed=embed, view=self)
 
@@ -409,6 +452,7 @@ class BlackjackView(discord.ui.View):
         if self.is_split:
             if self.current_hand < len(self.split_hands) - 1:
                 self.current_hand += 1
+                await self.checkpoint()
                 embed = await self.create_embed()
                 await interaction.edit_original_response(embed=embed, view=self)
                 return
@@ -449,6 +493,9 @@ class BlackjackView(discord.ui.View):
             return
 
         self.doubled_down = True
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.add_stake(self.session_id, self.user_id, interaction.guild.id, self.bet)
 
         # Hit exactly one card and stand
         current_hand = self.split_hands[self.current_hand] if self.is_split else self.player_hand
@@ -458,6 +505,7 @@ class BlackjackView(discord.ui.View):
         if self.is_split:
             if self.current_hand < len(self.split_hands) - 1:
                 self.current_hand += 1
+                await self.checkpoint()
                 embed = await self.create_embed()
                 await interaction.edit_original_response(embed=embed, view=self)
                 return
@@ -498,6 +546,10 @@ class BlackjackView(discord.ui.View):
             await interaction.followup.send("❌ 스플릿 처리 실패!", ephemeral=True)
             return
 
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.add_stake(self.session_id, self.user_id, interaction.guild.id, self.bet)
+
         # Create split hands
         self.is_split = True
         self.split_hands = [[self.player_hand[0]], [self.player_hand[1]]]
@@ -511,6 +563,7 @@ class BlackjackView(discord.ui.View):
         # Disable split button after splitting
         button.disabled = True
 
+        await self.checkpoint()
         embed = await self.create_embed()
         await interaction.edit_original_response(embed=embed, view=self)
 
@@ -546,6 +599,11 @@ class BlackjackView(discord.ui.View):
             self.insurance_bet = insurance_amount
             button.disabled = True
 
+            sessions = get_session_cog(self.bot)
+            if sessions:
+                await sessions.add_stake(self.session_id, self.user_id, interaction.guild.id, insurance_amount)
+                await sessions.checkpoint(self.session_id, self.snapshot())
+
             embed = await self.create_embed()
             await interaction.edit_original_response(embed=embed, view=self)
 
@@ -556,8 +614,42 @@ class BlackjackCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = get_logger("블랙잭")
+        self.shoes: Dict[int, Shoe] = {}  # guild_id -> shared shoe
+
+        sessions = get_session_cog(bot)
+        if sessions:
+            sessions.register_restorer('blackjack', self.restore_session)
+
         self.logger.info("블랙잭 시스템이 초기화되었습니다.")
 
+    def get_shoe(self, guild_id: int) -> Shoe:
+        """Each server plays from its own persistent 4-deck shoe"""
+        shoe = self.shoes.get(guild_id)
+        if shoe is None:
+            shoe = self.shoes[guild_id] = Shoe(decks=4)
+        return shoe
+
+    async def restore_session(self, session: dict, stakes: Dict[int, int]) -> bool:
+        """Resume a hand interrupted by a restart from its last checkpoint"""
+        state = session.get('state')
+        channel = self.bot.get_channel(session['channel_id']) if session.get('channel_id') else None
+        if not state or not channel:
+            return False
+
+        view = BlackjackView(self.bot, state['user_id'], state['bet'], state=state,
+                             shoe=self.get_shoe(session['guild_id']))
+        view.session_id = session['session_id']
+
+        embed = await view.create_embed()
+        await channel.send(
+            content=f"<@{state['user_id']}> ♻️ 봇 재시작으로 중단된 블랙잭 게임을 이어서 진행합니다.",
+            embed=embed,
+            view=view
+        )
+        self.logger.info(f"Restored blackjack session {session['session_id']} for user {state['user_id']}",
+                         extra={'guild_id': session['guild_id']})
+        return True
+
     @app_commands.command(name="블랙잭", description="전문적인 블랙잭 게임 (더블다운, 보험, 스플릿 포함)")
     @app_commands.describe(bet="베팅할 코인 수")
     async def blackjack(self, interaction: discord.Interaction, bet: int):
@@ -613,7 +705,7 @@ class BlackjackCog(commands.Cog):
             await interaction.response.send_message("❌ 베팅 처리 실패!", ephemeral=True)
             return
 
-        view = BlackjackView(self.bot, interaction.user.id, bet)
+        view = BlackjackView(self.bot, interaction.user.id, bet, shoe=self.get_shoe(interaction.guild.id))
 
         # Disable buttons based on game state
         for item in view.children:
@@ -635,7 +727,7 @@ class BlackjackCog(commands.Cog):
         # Add strategy hints as a separate field
         if not view.game_over:
             player_val = view.calculate_hand_value(view.player_hand)
-            dealer_up = view.dealer_hand[0]['rank']
+            dealer_up = rank_label(view.dealer_hand[0])
 
             hints = []
             if view.can_double_down():
@@ -656,6 +748,16 @@ class BlackjackCog(commands.Cog):
                 embed.add_field(name="🎯 전략 힌트", value="\n".join(hints), inline=False)
 
         await interaction.response.send_message(embed=embed, view=view)
+
+        # Escrow the bet until the hand settles (a natural blackjack settles immediately above).
+        # The write happens after responding so DB latency can't push the command past the interaction deadline
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            view.session_id = await sessions.open_session(
+                'blackjack', interaction.guild.id, interaction.channel.id,
+                {interaction.user.id: bet}, view.snapshot()
+            )
+
         self.logger.info(
             f"{interaction.user}가 {bet} 코인으로 블랙잭 시작",
             extra={'guild_id': interaction.guild.id}
@@ -2,69 +2,17 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import asyncio
-import random
 from typing import Dict, List, Optional, Tuple
-from enum import Enum
 
 from utils.logger import get_logger
+from utils.cards import Shoe, RANKS, card_str
+from utils.lobby import RoundLobby
 from utils.config import (
     is_feature_enabled,
     is_server_configured
 )
 from cogs.coins import check_user_casino_eligibility # <--- ADD THIS LINE
-
-
-class CardSuit(Enum):
-    HEARTS = "♥️"
-    DIAMONDS = "♦️"
-    CLUBS = "♣️"
-    SPADES = "♠️"
-
-
-class DrawCard:
-    """Represents a playing card for draw battle"""
-
-    def __init__(self, rank: int, suit: CardSuit):
-        self.rank = rank  # 2-14 (11=J, 12=Q, 13=K, 14=A)
-        self.suit = suit
-        self.value = rank  # For comparison (Ace high)
-
-    def __str__(self):
-        rank_names = {11: "J", 12: "Q", 13: "K", 14: "A"}
-        rank_str = rank_names.get(self.rank, str(self.rank))
-        return f"{rank_str}{self.suit.value}"
-
-    def __eq__(self, other):
-        return self.value == other.value
-
-    def __lt__(self, other):
-        return self.value < other.value
-
-    def __gt__(self, other):
-        return self.value > other.value
-
-
-class CardDrawDeck:
-    """Deck for card draw battles"""
-
-    def __init__(self):
-        self.cards = []
-        self.reset()
-
-    def reset(self):
-        """Reset and shuffle deck"""
-        self.cards = []
-        for suit in CardSuit:
-            for rank in range(2, 15):  # 2-14 (A)
-                self.cards.append(DrawCard(rank, suit))
-        random.shuffle(self.cards)
-
-    def draw_card(self) -> DrawCard:
-        """Draw one card"""
-        if not self.cards:
-            self.reset()
-        return self.cards.pop()
+from cogs.game_sessions import get_session_cog
 
 
 class CardDrawPlayer:
@@ -74,7 +22,7 @@ class CardDrawPlayer:
         self.user_id = user_id
         self.username = username
         self.bet = bet
-        self.card = None
+        self.card: Optional[int] = None  # utils.cards encoding; compared by rank (ace high)
         self.ready = False
 
 
@@ -88,7 +36,7 @@ class CardDrawView(discord.ui.View):
         self.channel_id = channel_id
         self.bet = bet
         self.players: Dict[int, CardDrawPlayer] = {}
-        self.deck = CardDrawDeck()
+        self.deck = Shoe(decks=1)
         self.join_phase = True
         self.battle_phase = False
         self.game_over = False
@@ -97,24 +45,42 @@ class CardDrawView(discord.ui.View):
         self.message = None
         self.logger = get_logger("카드뽑기대결")
         self.cleanup_scheduled = False  # Prevent double cleanup
+        self.session_id: Optional[str] = None
+        # Join/draw bookkeeping and the auto-start, draw-deadline and cleanup timers
+        self.lobby = RoundLobby(min_players=2, max_players=6)
 
         # Add creator as first player
         self.add_player(creator_id, creator_name, bet)
 
     def add_player(self, user_id: int, username: str, bet: int) -> bool:
         """Add player to the battle"""
-        if user_id not in self.players and len(self.players) < 6:  # Max 6 players
+        if self.lobby.join(user_id):  # Max 6 players
             self.players[user_id] = CardDrawPlayer(user_id, username, bet)
             return True
         return False
 
     def remove_player(self, user_id: int) -> bool:
         """Remove player from battle"""
-        if user_id in self.players and self.join_phase:
+        if self.lobby.leave(user_id):
             del self.players[user_id]
             return True
         return False
 
+    def snapshot(self) -> dict:
+        """Serializable checkpoint of the battle"""
+        return {
+            'bet': self.bet,
+            'players': {str(uid): p.bet for uid, p in self.players.items()},
+            'battle_phase': self.battle_phase,
+        }
+
+    async def close_session(self):
+        """Mark the session settled so its escrow is not refunded on restart"""
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.close_session(self.session_id)
+        self.session_id = None
+
     def create_battle_display(self):
         """Create standardized battle display"""
         if self.battle_phase:
@@ -124,7 +90,7 @@ class CardDrawView(discord.ui.View):
             return f"🎲 **카드 뽑기 진행 중**\n\n📊 **진행 상황:** {ready_count}/{total_count}명 완료\n\n아래 버튼을 눌러 카드를 뽑으세요!"
         elif self.game_over:
             if not self.is_tie and self.winner:
-                return f"🏆 **{self.winner.username} 승리!**\n\n🎯 **승리 카드:** {self.winner.card}"
+                return f"🏆 **{self.winner.username} 승리!**\n\n🎯 **승리 카드:** {card_str(self.winner.card)}"
             elif self.is_tie and isinstance(self.winner, list):
                 winner_names = [w.username for w in self.winner]
                 return f"🤝 **무승부!** ({len(self.winner)}명)\n\n🎯 **동점자:** {', '.join(winner_names)}"
@@ -137,6 +103,7 @@ class CardDrawView(discord.ui.View):
             return
 
         self.cleanup_scheduled = True
+        self.lobby.close()
         cog = self.bot.get_cog('CardDrawCog')
         if cog and self.channel_id in cog.active_games:
             del cog.active_games[self.channel_id]
@@ -148,57 +115,45 @@ class CardDrawView(discord.ui.View):
             await interaction.response.send_message("⚠ 최소 2명의 플레이어가 필요합니다!", ephemeral=True)
             return
 
-        self.join_phase = False
-        self.battle_phase = True
-
-        # Clear join/leave buttons and add draw button
-        self.clear_items()
-        self.add_item(DrawCardButton())
+        if not self.begin_battle():
+            await interaction.response.send_message("⚠ 이미 게임이 시작되었습니다!", ephemeral=True)
+            return
 
         embed = self.create_battle_embed()
         await interaction.response.edit_message(embed=embed, view=self)
 
-        # Wait for all players to draw
-        await self.wait_for_all_draws()
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.checkpoint(self.session_id, self.snapshot())
 
     async def start_battle_direct(self):
         """Start battle without interaction (for auto-start)"""
-        if len(self.players) < 2:
+        if not self.lobby.has_enough_players or not self.begin_battle():
             return
 
-        self.join_phase = False
-        self.battle_phase = True
-        self.clear_items()
-        self.add_item(DrawCardButton())
-
         embed = self.create_battle_embed()
         if self.message:
             await self.message.edit(embed=embed, view=self)
 
-        await self.wait_for_all_draws()
-
-    async def wait_for_all_draws(self):
-        """Wait for all players to draw their cards"""
-        timeout_counter = 0
-        max_timeout = 60  # 60 seconds timeout
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.checkpoint(self.session_id, self.snapshot())
 
-        while self.battle_phase and not self.game_over and timeout_counter < max_timeout:
-            all_ready = True
-            for player in self.players.values():
-                if not player.ready:
-                    all_ready = False
-                    break
+    def begin_battle(self) -> bool:
+        """Switch to the draw phase once, whichever of the start button and auto-start comes first"""
+        if not self.lobby.start():
+            return False
 
-            if all_ready:
-                await self.resolve_battle()
-                break
+        self.join_phase = False
+        self.battle_phase = True
 
-            await asyncio.sleep(1)
-            timeout_counter += 1
+        # Clear join/leave buttons and add draw button
+        self.clear_items()
+        self.add_item(DrawCardButton())
 
-        # Auto-resolve after timeout
-        if self.battle_phase and not self.game_over:
-            await self.resolve_battle()
+        # The last player to draw resolves the battle; anyone still undecided gets a card after 60 seconds
+        self.lobby.schedule(60, self.resolve_battle)
+        return True
 
     async def draw_card_for_player(self, interaction: discord.Interaction, user_id: int):
         """Handle player drawing a card"""
@@ -214,18 +169,23 @@ class CardDrawView(discord.ui.View):
             return
 
         # Draw card
-        player.card = self.deck.draw_card()
+        player.card = self.deck.draw()
         player.ready = True
+        all_drawn = self.lobby.mark_ready(user_id)
 
         # Show card to player privately
         embed = discord.Embed(
             title="🃏 당신의 카드",
-            description=f"**뽑은 카드:** {player.card}\n\n다른 플레이어들이 카드를 뽑을 때까지 기다려주세요!",
+            description=f"**뽑은 카드:** {card_str(player.card)}\n\n다른 플레이어들이 카드를 뽑을 때까지 기다려주세요!",
             color=discord.Color.blue()
         )
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
+        if all_drawn:
+            await self.resolve_battle()
+            return
+
         # Update main message
         if self.message:
             embed = self.create_battle_embed()
@@ -233,18 +193,21 @@ class CardDrawView(discord.ui.View):
 
     async def resolve_battle(self):
         """Resolve the card draw battle"""
+        if self.game_over:
+            return
         self.battle_phase = False
         self.game_over = True
+        self.lobby.close()
 
         # Auto-draw for players who didn't draw
         for player in self.players.values():
             if not player.ready:
-                player.card = self.deck.draw_card()
+                player.card = self.deck.draw()
                 player.ready = True
 
         # Find highest card(s)
-        highest_value = max(player.card.value for player in self.players.values())
-        winners = [player for player in self.players.values() if player.card.value == highest_value]
+        highest_value = max(RANKS[player.card] for player in self.players.values())
+        winners = [player for player in self.players.values() if RANKS[player.card] == highest_value]
 
         if len(winners) == 1:
             self.winner = winners[0]
@@ -264,8 +227,7 @@ class CardDrawView(discord.ui.View):
             await self.message.edit(embed=embed, view=self)
 
         # Schedule cleanup after 30 seconds
-        await asyncio.sleep(30)
-        await self.cleanup_game()
+        self.lobby.schedule(30, self.cleanup_game)
 
     async def handle_payouts(self):
         """Handle coin payouts"""
@@ -282,7 +244,7 @@ class CardDrawView(discord.ui.View):
                 self.guild_id,
                 total_pot,
                 "carddraw_win",
-                f"카드 뽑기 대결 승리 - {self.winner.card}"
+                f"카드 뽑기 대결 승리 - {card_str(self.winner.card)}"
             )
         elif self.is_tie and isinstance(self.winner, list):
             # Split pot among winners
@@ -297,9 +259,11 @@ class CardDrawView(discord.ui.View):
                     self.guild_id,
                     share,
                     "carddraw_tie",
-                    f"카드 뽑기 대결 무승부 분할 - {winner.card}"
+                    f"카드 뽑기 대결 무승부 분할 - {card_str(winner.card)}"
                 )
 
+        await self.close_session()
+
     def create_battle_embed(self) -> discord.Embed:
         """Create battle status embed with standardized format"""
         if self.join_phase:
@@ -361,12 +325,12 @@ class CardDrawView(discord.ui.View):
             # STANDARDIZED FIELD 3: Game Results
             if not self.is_tie and self.winner:
                 total_pot = sum(player.bet for player in self.players.values())
-                result_info = f"🏆 **승자:** {self.winner.username}\n🎯 **승리 카드:** {self.winner.card}\n\n💰 **획득 상금:** {total_pot:,}코인"
+                result_info = f"🏆 **승자:** {self.winner.username}\n🎯 **승리 카드:** {card_str(self.winner.card)}\n\n💰 **획득 상금:** {total_pot:,}코인"
             elif self.is_tie and isinstance(self.winner, list):
                 winners = self.winner
                 winner_names = [w.username for w in winners]
                 pot_share = sum(player.bet for player in self.players.values()) // len(winners)
-                result_info = f"🤝 **동점자:** {', '.join(winner_names)}\n🎯 **동점 카드:** {winners[0].card}\n\n💰 **분할 상금:** {pot_share:,}코인 (각자)"
+                result_info = f"🤝 **동점자:** {', '.join(winner_names)}\n🎯 **동점 카드:** {card_str(winners[0].card)}\n\n💰 **분할 상금:** {pot_share:,}코인 (각자)"
             else:
                 result_info = "⚠ 결과 처리 중 오류가 발생했습니다"
 
@@ -374,11 +338,11 @@ class CardDrawView(discord.ui.View):
 
             # Show all cards
             card_results = []
-            sorted_players = sorted(self.players.values(), key=lambda p: p.card.value, reverse=True)
+            sorted_players = sorted(self.players.values(), key=lambda p: RANKS[p.card], reverse=True)
 
             for i, player in enumerate(sorted_players):
                 rank_emoji = "🥇" if i == 0 else "🥈" if i == 1 else "🥉" if i == 2 else "🎴"
-                card_results.append(f"{rank_emoji} **{player.username}:** {player.card}")
+                card_results.append(f"{rank_emoji} **{player.username}:** {card_str(player.card)}")
 
             embed.add_field(name="🃏 모든 카드 결과", value="\n".join(card_results), inline=False)
 
@@ -403,7 +367,7 @@ class CardDrawView(discord.ui.View):
             await interaction.followup.send("⚠ 이미 참가하셨습니다!", ephemeral=True)
             return
 
-        if len(self.players) >= 6:
+        if self.lobby.is_full:
             await interaction.followup.send("⚠ 게임이 가득 찼습니다! (최대 6명)", ephemeral=True)
             return
 
@@ -448,8 +412,16 @@ class CardDrawView(discord.ui.View):
             await interaction.followup.send("⚠ 베팅 처리에 실패했습니다!", ephemeral=True)
             return
 
-        # Add player
-        self.add_player(interaction.user.id, interaction.user.display_name, self.bet)
+        # Add player; the round may have started or filled up while the bet was being taken
+        if not self.add_player(interaction.user.id, interaction.user.display_name, self.bet):
+            await coins_cog.add_coins(interaction.user.id, interaction.guild.id, self.bet, "carddraw_refund",
+                                      "카드 뽑기 대결 참가 실패 환불")
+            await interaction.followup.send("⚠ 게임이 이미 시작되었거나 가득 찼습니다! 베팅이 환불되었습니다.", ephemeral=True)
+            return
+
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.add_stake(self.session_id, interaction.user.id, interaction.guild.id, self.bet)
 
         embed = self.create_battle_embed()
         if self.message:
@@ -482,8 +454,13 @@ class CardDrawView(discord.ui.View):
         # Remove player
         self.remove_player(interaction.user.id)
 
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.release_stake(self.session_id, interaction.user.id)
+
         # Check if no players left - close game
         if not self.players:
+            await self.close_session()
             self.clear_items()
             embed = discord.Embed(
                 title="🃏 카드 뽑기 대결 종료",
@@ -519,6 +496,7 @@ class CardDrawView(discord.ui.View):
                         "carddraw_timeout",
                         "카드 뽑기 대결 시간 초과 환불"
                     )
+            await self.close_session()
 
             # Show timeout message
             if self.message:
@@ -644,20 +622,21 @@ class CardDrawCog(commands.Cog):
         message = await interaction.followup.send(embed=embed, view=game_view)
         game_view.message = message
 
+        # Escrow bets until the battle is paid out or refunded.
+        # The write happens after the followup so DB latency can't hold up the lobby message
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            game_view.session_id = await sessions.open_session(
+                'carddraw', interaction.guild.id, channel_id, {interaction.user.id: bet}, game_view.snapshot()
+            )
+
         self.logger.info(
             f"{interaction.user}가 {bet}코인으로 카드 뽑기 대결을 시작했습니다",
             extra={'guild_id': interaction.guild.id}
         )
 
-        # Auto-start after timeout if enough players
-        await asyncio.sleep(60)  # 1 minute auto-start
-        if (channel_id in self.active_games and
-                self.active_games[channel_id].join_phase and
-                len(self.active_games[channel_id].players) >= 2):
-            try:
-                await self.active_games[channel_id].start_battle_direct()
-            except Exception as e:
-                self.logger.error(f"Auto-start failed: {e}")
+        # Auto-start after 1 minute if enough players; the start button cancels this timer
+        game_view.lobby.schedule(60, game_view.start_battle_direct)
 
 
 async def setup(bot):
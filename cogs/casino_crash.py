@@ -5,20 +5,24 @@ from discord import app_commands
 import asyncio
 import random
 import math
+import uuid
+from functools import partial
 import os
 import io
 import matplotlib
 import matplotlib.pyplot as plt
 from matplotlib import font_manager
-from typing import Dict
+from typing import Dict, Optional
 
 from utils.logger import get_logger
+from utils.lobby import RoundLobby
 from utils.config import (
     is_feature_enabled,
     get_channel_id,
     get_server_setting
 )
 from cogs.coins import check_user_casino_eligibility # <--- ADD THIS LINE
+from cogs.game_sessions import get_session_cog
 
 # Font setup for Korean text
 here = os.path.dirname(os.path.dirname(__file__))
@@ -51,15 +55,25 @@ class CrashGame:
         self.start_time = None
         self.history: list[float] = [1.0]
         self.min_cashout_multiplier = get_server_setting(guild_id, 'crash_min_cashout_multiplier', 1.2)
+        self.session_id: Optional[str] = None
+        self.round_id = uuid.uuid4().hex
+        # Join bookkeeping and the 30 second auto-start timer
+        self.lobby = RoundLobby(min_players=1)
 
     def add_player(self, user_id: int, bet: int):
         """Add a player to the game"""
+        self.lobby.join(user_id)
         self.players[user_id] = {
             'bet': bet,
             'cashed_out': False,
             'cash_out_multiplier': 0.0
         }
 
+    def remove_player(self, user_id: int):
+        """Remove a player before the round starts"""
+        self.lobby.leave(user_id)
+        self.players.pop(user_id, None)
+
     def cash_out_player(self, user_id: int) -> bool:
         """Cash out a player with proper validation"""
         if user_id not in self.players:
@@ -79,6 +93,13 @@ class CrashGame:
         self.players[user_id]['cash_out_multiplier'] = current_mult_rounded
         return True
 
+    def snapshot(self) -> dict:
+        """Serializable checkpoint of the round"""
+        return {
+            'players': {str(uid): p['bet'] for uid, p in self.players.items()},
+            'game_started': self.game_started,
+        }
+
     def get_active_players_count(self) -> int:
         """Get count of players who haven't cashed out"""
         return sum(1 for p in self.players.values() if not p['cashed_out'])
@@ -152,6 +173,10 @@ class JoinBetModal(discord.ui.Modal, title="크래시 게임 참가"):
 
             self.game.add_player(interaction.user.id, bet)
 
+            sessions = get_session_cog(self.cog.bot)
+            if sessions:
+                await sessions.add_stake(self.game.session_id, interaction.user.id, interaction.guild.id, bet)
+
             try:
                 embed = await self.view.create_embed(interaction)
                 chart_file = await self.view.create_chart()
@@ -361,13 +386,17 @@ class CrashView(discord.ui.View):
             return
 
         bet_amount = player_data['bet']
-        del self.game.players[interaction.user.id]
+        self.game.remove_player(interaction.user.id)
 
         coins_cog = self.cog.bot.get_cog('CoinsCog')
         if coins_cog:
             await coins_cog.add_coins(interaction.user.id, interaction.guild.id, bet_amount, "crash_leave",
                                       "Crash game leave refund")
 
+        sessions = get_session_cog(self.cog.bot)
+        if sessions:
+            await sessions.release_stake(self.game.session_id, interaction.user.id)
+
         try:
             embed = await self.create_embed(interaction)
             chart_file = await self.create_chart()
@@ -388,10 +417,9 @@ class CrashView(discord.ui.View):
             await interaction.response.send_message("참가한 플레이어가 없어 게임을 시작할 수 없습니다.", ephemeral=True)
             return
 
-        guild_id = interaction.guild.id
-        start_event = self.cog.start_events.get(guild_id)
-        if start_event:
-            start_event.set()
+        if self.game.lobby.is_joining:
+            # Replace the pending auto-start with an immediate one
+            self.game.lobby.schedule(0, partial(self.cog.start_round, interaction.guild.id))
             await interaction.response.send_message("게임을 곧 시작합니다!", ephemeral=True)
         else:
             await interaction.response.send_message("게임 시작 이벤트를 찾을 수 없습니다.", ephemeral=True)
@@ -433,13 +461,19 @@ class CrashView(discord.ui.View):
 
             coins_cog = self.cog.bot.get_cog('CoinsCog')
             if coins_cog:
-                await coins_cog.add_coins(interaction.user.id, interaction.guild.id, net_payout, "crash_win",
-                                          f"Crash cashout at {multiplier:.2f}x (after 5% fee)")
+                # One cash-out per player per round, even if the button is hit twice
+                round_id = f"crash:{self.game.round_id}:{interaction.user.id}"
+                await coins_cog.settle(round_id, interaction.user.id, interaction.guild.id, 0, net_payout, "crash",
+                                       f"Crash cashout at {multiplier:.2f}x (after 5% fee)")
 
                 # Add house fee to lottery pot
                 from cogs.lottery import add_casino_fee_to_lottery
                 await add_casino_fee_to_lottery(self.cog.bot, interaction.guild.id, house_fee)
 
+            sessions = get_session_cog(self.cog.bot)
+            if sessions:
+                await sessions.release_stake(self.game.session_id, interaction.user.id)
+
             await interaction.followup.send(
                 f"{interaction.user.mention}님이 **{multiplier:.2f}x**에서 캐시아웃!\n💰 받은 금액: {net_payout:,} 코인 (수수료 {house_fee:,} 코인 차감)\n📈 순이익: +{profit:,} 코인",
                 ephemeral=False
@@ -457,7 +491,6 @@ class CrashCog(commands.Cog):
         self.server_games: Dict[int, CrashGame] = {}
         self.server_messages: Dict[int, discord.Message] = {}
         self.server_views: Dict[int, CrashView] = {}
-        self.start_events: Dict[int, asyncio.Event] = {}
         self.logger.info("크래시 게임 시스템이 초기화되었습니다.")
 
     async def validate_game(self, interaction: discord.Interaction, bet: int):
@@ -493,38 +526,37 @@ class CrashCog(commands.Cog):
         else:
             return round(random.uniform(6.0, 15.0), 2)
 
-    async def game_lifecycle_task(self, guild_id: int):
-        """Manages the game lifecycle with responsible gaming considerations"""
+    async def start_round(self, guild_id: int):
+        """Start the round when the lobby timer fires (30 seconds after creation, or at once via the start button)"""
         try:
             current_game = self.server_games.get(guild_id)
-            if not current_game:
+            if not current_game or not current_game.lobby.is_joining:
                 return
 
             game_view = self.server_views.get(guild_id)
             game_message = self.server_messages.get(guild_id)
-            start_event = self.start_events.get(guild_id)
 
-            if not all([game_view, game_message, start_event]):
+            if not all([game_view, game_message]):
                 return
 
-            # Wait for game start
-            try:
-                await asyncio.wait_for(start_event.wait(), timeout=30.0)
-            except asyncio.TimeoutError:
-                pass
-
             if not current_game.players:
                 if game_message:
                     try:
                         await game_message.edit(content="참가자가 없어 게임이 취소되었습니다.", embed=None, view=None, attachments=[])
                     except discord.NotFound:
                         pass
+                await self.close_game_session(current_game)
                 self.cleanup_server_game(guild_id)
                 return
 
+            current_game.lobby.start()
             current_game.game_started = True
             game_view.update_button_states()
 
+            sessions = get_session_cog(self.bot)
+            if sessions:
+                await sessions.checkpoint(current_game.session_id, current_game.snapshot())
+
             # ADD THIS LINE - Send debug info when game starts
             await self.send_debug_info(guild_id, current_game.crash_point)
 
@@ -633,18 +665,25 @@ class CrashCog(commands.Cog):
             except Exception as e:
                 self.logger.error(f"게임 종료 중 메시지 업데이트 실패: {e}")
 
+        await self.close_game_session(current_game)
         self.cleanup_server_game(guild_id)
 
+    async def close_game_session(self, game: CrashGame):
+        """Mark the round settled so its escrow is not refunded on restart"""
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.close_session(game.session_id)
+        game.session_id = None
+
     def cleanup_server_game(self, guild_id: int):
         """Clean up server-specific game data"""
-        if guild_id in self.server_games:
-            del self.server_games[guild_id]
+        game = self.server_games.pop(guild_id, None)
+        if game:
+            game.lobby.close()
         if guild_id in self.server_messages:
             del self.server_messages[guild_id]
         if guild_id in self.server_views:
             del self.server_views[guild_id]
-        if guild_id in self.start_events:
-            del self.start_events[guild_id]
 
     def calculate_payout_with_fee(self, bet: int, multiplier: float, fee_percentage: float = 5.0) -> tuple[int, int]:
         """
@@ -706,7 +745,6 @@ class CrashCog(commands.Cog):
             return
 
         # Create server-specific game
-        self.start_events[guild_id] = asyncio.Event()
         crash_point = self.generate_crash_point()
         self.server_games[guild_id] = CrashGame(self.bot, crash_point, guild_id)
         self.server_games[guild_id].add_player(interaction.user.id, bet)
@@ -718,10 +756,19 @@ class CrashCog(commands.Cog):
         await interaction.response.send_message(embed=embed, view=self.server_views[guild_id], file=chart_file)
         self.server_messages[guild_id] = await interaction.original_response()
 
+        # Escrow bets until each player cashes out or the rocket crashes.
+        # The write happens after responding so DB latency can't push the command past the interaction deadline
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            self.server_games[guild_id].session_id = await sessions.open_session(
+                'crash', guild_id, interaction.channel.id, {interaction.user.id: bet},
+                self.server_games[guild_id].snapshot()
+            )
+
         self.logger.info(f"{interaction.user}가 {bet} 코인으로 크래시 게임 시작", extra={'guild_id': guild_id})
 
-        # Start the game lifecycle
-        asyncio.create_task(self.game_lifecycle_task(guild_id))
+        # Auto-start after 30 seconds; "지금 시작" moves the timer up
+        self.server_games[guild_id].lobby.schedule(30, partial(self.start_round, guild_id))
 
 
 async def setup(bot):
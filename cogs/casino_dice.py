@@ -90,9 +90,21 @@ class DiceGameCog(commands.Cog):
             await interaction.response.send_message(error_msg, ephemeral=True)
             return
 
+        # Roll up front so the bet and payout settle in one round trip
+        die1 = random.randint(1, 6)
+        die2 = random.randint(1, 6)
+        total = die1 + die2
+        won = total == guess
+
+        # Payout calculation (higher multiplier for harder guesses) - server configurable
+        base_multipliers = {2: 35, 3: 17, 4: 11, 5: 8, 6: 6, 7: 5, 8: 6, 9: 8, 10: 11, 11: 17, 12: 35}
+        multiplier_modifier = get_server_setting(interaction.guild.id, 'dice_multiplier_modifier', 1.0)
+        payout_multipliers = {k: max(1, int(v * multiplier_modifier)) for k, v in base_multipliers.items()}
+        payout = bet * payout_multipliers[guess] if won else 0
+
         coins_cog = self.bot.get_cog('CoinsCog')
-        if not await coins_cog.remove_coins(interaction.user.id, interaction.guild.id, bet, "dice_game_bet",
-                                            "Dice game bet"):
+        if not await coins_cog.settle(f"dice:{interaction.id}", interaction.user.id, interaction.guild.id, bet, payout,
+                                      "dice_game", f"Dice roll: {total} (guess {guess})"):
             await interaction.response.send_message("베팅 처리 실패!", ephemeral=True)
             return
 
@@ -145,24 +157,10 @@ class DiceGameCog(commands.Cog):
             await interaction.edit_original_response(embed=embed)
             await asyncio.sleep(0.7)
 
-        # Final roll
-        die1 = random.randint(1, 6)
-        die2 = random.randint(1, 6)
-        total = die1 + die2
-        won = total == guess
+        # Final roll (already settled above)
         total_losses_to_lottery = 0
 
-        # Payout calculation (higher multiplier for harder guesses) - server configurable
-        base_multipliers = {2: 35, 3: 17, 4: 11, 5: 8, 6: 6, 7: 5, 8: 6, 9: 8, 10: 11, 11: 17, 12: 35}
-        multiplier_modifier = get_server_setting(interaction.guild.id, 'dice_multiplier_modifier', 1.0)
-        payout_multipliers = {k: max(1, int(v * multiplier_modifier)) for k, v in base_multipliers.items()}
-
-        payout = 0
-        if won:
-            payout = bet * payout_multipliers[guess]
-            await coins_cog.add_coins(interaction.user.id, interaction.guild.id, payout, "dice_game_win",
-                                      f"Dice win: {total}")
-        else:
+        if not won:
             # Add 50% of loss to lottery pot
             total_losses_to_lottery = int(bet * 0.1)
             from cogs.lottery import add_casino_fee_to_lottery
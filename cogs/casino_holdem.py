@@ -3,63 +3,19 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import asyncio
-import random
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 from itertools import combinations
 
 from utils.logger import get_logger
+from utils.cards import Shoe, RANKS, SUITS, cards_str
 from utils.config import (
     is_feature_enabled,
-    is_server_configured
+    is_server_configured,
+    get_server_setting
 )
 from cogs.coins import check_user_casino_eligibility
-
-
-class Suit(Enum):
-    HEARTS = "♥️"
-    DIAMONDS = "♦️"
-    CLUBS = "♣️"
-    SPADES = "♠️"
-
-
-class Card:
-    """Represents a playing card"""
-
-    def __init__(self, rank: int, suit: Suit):
-        self.rank = rank  # 2-14 (11=J, 12=Q, 13=K, 14=A)
-        self.suit = suit
-
-    def __str__(self):
-        rank_names = {11: "J", 12: "Q", 13: "K", 14: "A"}
-        rank_str = rank_names.get(self.rank, str(self.rank))
-        return f"{rank_str}{self.suit.value}"
-
-    def __eq__(self, other):
-        return self.rank == other.rank and self.suit == other.suit
-
-    def __lt__(self, other):
-        return self.rank < other.rank
-
-
-class Deck:
-    """Standard 52-card deck"""
-
-    def __init__(self):
-        self.cards = []
-        self.reset()
-
-    def reset(self):
-        """Reset and shuffle deck"""
-        self.cards = []
-        for suit in Suit:
-            for rank in range(2, 15):  # 2-14 (A)
-                self.cards.append(Card(rank, suit))
-        random.shuffle(self.cards)
-
-    def deal(self) -> Card:
-        """Deal one card"""
-        return self.cards.pop() if self.cards else None
+from cogs.game_sessions import get_session_cog
 
 
 class HandRank(Enum):
@@ -79,7 +35,7 @@ class PokerHand:
     """Fixed poker hand evaluation"""
 
     @staticmethod
-    def evaluate_hand(cards: List[Card]) -> Tuple[HandRank, List[int]]:
+    def evaluate_hand(cards: List[int]) -> Tuple[HandRank, List[int]]:
         """Evaluate 7 cards and return best 5-card hand rank and tiebreakers"""
         if len(cards) != 7:
             raise ValueError("Must have exactly 7 cards")
@@ -110,12 +66,11 @@ class PokerHand:
         return 0
 
     @staticmethod
-    def _evaluate_5_cards(cards: List[Card]) -> Tuple[HandRank, List[int]]:
+    def _evaluate_5_cards(cards: List[int]) -> Tuple[HandRank, List[int]]:
         """Evaluate exactly 5 cards with fixed logic"""
-        # Sort cards by rank (highest first)
-        cards.sort(key=lambda x: x.rank, reverse=True)
-        ranks = [card.rank for card in cards]
-        suits = [card.suit for card in cards]
+        # Ranks highest first
+        ranks = sorted((RANKS[card] for card in cards), reverse=True)
+        suits = [SUITS[card] for card in cards]
 
         # Count each rank
         rank_counts = {}
@@ -232,6 +187,7 @@ class RaiseModal(discord.ui.Modal):
         super().__init__(title="레이즈 금액 선택", timeout=30)
         self.view = view
         self.player_idx = player_idx
+        self.turn = view.turn  # The raise is only valid for the turn the modal was opened in
 
         player = view.game.players[player_idx]
         min_raise_total = view.game.current_bet + view.game.big_blind
@@ -281,19 +237,9 @@ class RaiseModal(discord.ui.Modal):
                 await interaction.response.send_message(f"❌ 보유 칩이 부족합니다! 최대: {max_total:,}칩", ephemeral=True)
                 return
 
-            # Make the raise
-            success = self.view.game.make_raise(self.player_idx, total_bet)
-            if not success:
-                await interaction.response.send_message("❌ 레이즈 처리에 실패했습니다!", ephemeral=True)
-                return
-
-            # FIXED: Atomic state update
-            self.view.waiting_for_action = False
-            next_player = self.view.game.get_next_active_player(self.view.game.current_player)
-            self.view.game.current_player = next_player
-
-            embed = self.view.create_game_embed()
-            await interaction.response.edit_message(embed=embed, view=self.view)
+            # Hand the raise to the table actor, which applies it and redraws the table
+            await interaction.response.defer()
+            self.view.submit_action(self.player_idx, "raise", total_bet, turn=self.turn)
 
         except ValueError:
             await interaction.response.send_message("❌ 유효한 숫자를 입력해주세요!", ephemeral=True)
@@ -311,7 +257,7 @@ class HoldemGame:
         self.channel_id = channel_id
         self.buy_in = buy_in
         self.players: List[HoldemPlayer] = []
-        self.deck = Deck()
+        self.deck = Shoe(decks=1)
         self.community_cards = []
         self.pot = 0
         self.current_bet = 0
@@ -492,7 +438,7 @@ class HoldemGame:
             return False
 
         # Reset for new hand
-        self.deck.reset()
+        self.deck.shuffle()
         self.community_cards = []
         self.pot = 0
         self.current_bet = 0
@@ -517,7 +463,7 @@ class HoldemGame:
         # Deal hole cards
         for _ in range(2):
             for player in self.players:
-                player.hole_cards.append(self.deck.deal())
+                player.hole_cards.append(self.deck.draw())
 
         # Post blinds
         self.post_blinds()
@@ -706,9 +652,9 @@ class HoldemGame:
         # Deal community cards
         if self.betting_round == 1:  # Flop
             for _ in range(3):
-                self.community_cards.append(self.deck.deal())
+                self.community_cards.append(self.deck.draw())
         elif self.betting_round in [2, 3]:  # Turn, River
-            self.community_cards.append(self.deck.deal())
+            self.community_cards.append(self.deck.draw())
 
         # Set first active player to act (starting from dealer+1)
         self.current_player = self.get_next_active_player(self.dealer_pos)
@@ -810,19 +756,87 @@ class HoldemView(discord.ui.View):
         self.join_phase = True
         self.waiting_for_action = False
         self.current_message = None
+        self.table_id = 0  # Assigned by HoldemCog when the table opens
+
+        # Table actor: player actions are queued and applied by a single task
+        self.actions: asyncio.Queue = asyncio.Queue()
+        self.turn = 0  # Sequence number of the turn being waited on; actions carry the turn they were made for
+        self.actor_task: Optional[asyncio.Task] = None
+        self.turn_timeout = get_server_setting(guild_id, 'holdem_turn_timeout', 30)
+
+        # Action latency (button press -> action applied), in seconds
+        self.latency_count = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.session_id: Optional[str] = None
         self.logger = get_logger("텍사스홀덤")
 
         # Add creator as first player
         self.game.add_player(creator_id, creator_name)
 
+    def snapshot(self) -> dict:
+        """Serializable checkpoint of the table"""
+        return {
+            'buy_in': self.game.buy_in,
+            'betting_round': self.game.betting_round,
+            'pot': self.game.pot,
+            'players': {
+                str(p.user_id): {'chips': p.chips, 'total_bet': p.total_bet, 'folded': p.folded}
+                for p in self.game.players
+            },
+        }
+
+    async def _run_table_actor(self):
+        """Drive the table; if the actor crashes, refund the escrow instead of leaving the table hung"""
+        try:
+            await self.handle_player_turn()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.error(f"Hold'em table {self.table_id} actor crashed: {e}", exc_info=True)
+            await self.abort_table()
+
+    async def abort_table(self):
+        """Refund every buy-in still in escrow and close the table"""
+        self.game.game_over = True
+        self.waiting_for_action = False
+
+        sessions = get_session_cog(self.bot)
+        if sessions and self.session_id:
+            await sessions.refund_sessions([self.session_id])
+        self.session_id = None
+
+        holdem_cog = self.bot.get_cog('HoldemCog')
+        if holdem_cog:
+            holdem_cog.remove_table(self)
+
+        self.clear_items()
+        self.stop()
+        if self.current_message:
+            try:
+                embed = discord.Embed(
+                    title="⚠️ 게임 오류",
+                    description="게임 진행 중 오류가 발생하여 테이블이 종료되었습니다. 바이인은 환불되었습니다.",
+                    color=discord.Color.red()
+                )
+                await self.current_message.edit(embed=embed, view=self)
+            except discord.HTTPException:
+                pass
+
+    async def close_session(self):
+        """Mark the session settled so its escrow is not refunded on restart"""
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.close_session(self.session_id)
+        self.session_id = None
+
     async def show_hole_cards(self):
         """Send hole cards privately to each player"""
         for player in self.game.players:
             if player.hole_cards:
-                cards_str = " ".join(str(card) for card in player.hole_cards)
                 embed = discord.Embed(
                     title="🃏 Your Hole Cards",
-                    description=f"**Your Cards:** {cards_str}",
+                    description=f"**Your Cards:** {cards_str(player.hole_cards)}",
                     color=discord.Color.blue()
                 )
                 embed.add_field(
@@ -862,8 +876,71 @@ class HoldemView(discord.ui.View):
         embed = self.create_game_embed()
         await interaction.response.edit_message(embed=embed, view=self)
 
-        # Start action handling
-        await self.handle_player_turn()
+        # Run the table as its own actor so the button callback returns immediately
+        self.actor_task = self.bot.loop.create_task(self._run_table_actor())
+
+    def submit_action(self, player_idx: int, action: str, amount: int = 0, turn: Optional[int] = None):
+        """Queue a player action for the table actor, tagged with the turn it was made in"""
+        turn = self.turn if turn is None else turn
+        self.actions.put_nowait((turn, player_idx, action, amount, asyncio.get_running_loop().time()))
+
+    def start_turn(self):
+        """Begin a new turn: bump the turn number and drop actions left over from earlier turns"""
+        self.turn += 1
+        while not self.actions.empty():
+            self.actions.get_nowait()
+
+    def apply_action(self, player_idx: int, action: str, amount: int) -> bool:
+        """Apply a queued action if it is still valid for the current turn"""
+        if not self.waiting_for_action or player_idx != self.game.current_player:
+            return False
+        if action not in self.game.get_valid_actions(player_idx):
+            return False
+
+        if action == "raise":
+            success = self.game.make_raise(player_idx, amount)
+        else:
+            success = self.game.make_action(player_idx, action)
+        if not success:
+            return False
+
+        self.waiting_for_action = False
+        self.game.current_player = self.game.get_next_active_player(self.game.current_player)
+        return True
+
+    async def wait_for_action(self) -> bool:
+        """Wait for the current player's action; the turn timer is the queue timeout"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.turn_timeout
+
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                turn, player_idx, action, amount, queued_at = await asyncio.wait_for(self.actions.get(),
+                                                                                     timeout=remaining)
+            except asyncio.TimeoutError:
+                return False
+
+            if turn != self.turn:
+                # Double click or a modal submitted after its turn ended
+                continue
+            if self.apply_action(player_idx, action, amount):
+                self.record_latency(loop.time() - queued_at)
+                return True
+            # Stale action (turn already moved on) - keep waiting for a valid one
+
+    def record_latency(self, latency: float):
+        self.latency_count += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+
+    def latency_summary(self) -> str:
+        if not self.latency_count:
+            return "-"
+        avg_ms = self.latency_total / self.latency_count * 1000
+        return f"평균 {avg_ms:.0f}ms / 최대 {self.latency_max * 1000:.0f}ms"
 
     def add_action_buttons(self):
         """Add poker action buttons"""
@@ -910,6 +987,10 @@ class HoldemView(discord.ui.View):
 
                 self.game.log_game_state("after_recovery")
 
+            sessions = get_session_cog(self.bot)
+            if sessions:
+                await sessions.checkpoint(self.session_id, self.snapshot())
+
             # Check if betting round is complete
             if self.game.is_betting_round_complete():
                 if self.game.betting_round >= 3:  # River completed
@@ -952,6 +1033,7 @@ class HoldemView(discord.ui.View):
                 self.game.current_player = next_player
 
             # ENHANCED: Atomic state update before waiting
+            self.start_turn()
             self.waiting_for_action = True
 
             try:
@@ -962,13 +1044,10 @@ class HoldemView(discord.ui.View):
                 self.logger.error(f"Error updating embed before player turn: {e}")
 
             # Wait for action with timeout
-            for _ in range(30):  # 30 second timer
-                if not self.waiting_for_action or self.game.game_over:
-                    break
-                await asyncio.sleep(1)
+            acted = await self.wait_for_action()
 
             # Auto-fold if no action taken and game still active
-            if self.waiting_for_action and not self.game.game_over:
+            if not acted and self.waiting_for_action and not self.game.game_over:
                 self.logger.info(
                     f"Player {self.game.players[self.game.current_player].username} auto-folded due to timeout")
                 self.game.make_action(self.game.current_player, "fold")
@@ -1003,6 +1082,7 @@ class HoldemView(discord.ui.View):
                         "holdem_payout",
                         f"텍사스 홀덤 정산 ({result['final_chips']}칩)"
                     )
+        await self.close_session()
 
         # Create results embed
         embed = discord.Embed(
@@ -1030,8 +1110,7 @@ class HoldemView(discord.ui.View):
 
         # Show final community cards
         if self.game.community_cards:
-            cards_str = " ".join(str(card) for card in self.game.community_cards)
-            embed.add_field(name="🃏 최종 커뮤니티 카드", value=cards_str, inline=False)
+            embed.add_field(name="🃏 최종 커뮤니티 카드", value=cards_str(self.game.community_cards), inline=False)
 
         # Player results breakdown
         results_text = []
@@ -1102,22 +1181,26 @@ class HoldemView(discord.ui.View):
             except:
                 pass
 
-        # FIXED: Clean up the game from active games (proper indentation)
-        if hasattr(self.bot, 'get_cog'):
-            holdem_cog = self.bot.get_cog('HoldemCog')
-            if holdem_cog and self.game.channel_id in holdem_cog.active_games:
-                del holdem_cog.active_games[self.game.channel_id]
+        self.logger.info(
+            f"Table {self.table_id} finished: {self.latency_count} actions, latency {self.latency_summary()}",
+            extra={'guild_id': self.game.guild_id}
+        )
+
+        # Clean up the table from the lobby
+        holdem_cog = self.bot.get_cog('HoldemCog')
+        if holdem_cog:
+            holdem_cog.remove_table(self)
 
     def create_game_embed(self) -> discord.Embed:
         """Create game status embed with standardized format"""
         if self.join_phase:
-            title = "🃏 텍사스 홀덤"
+            title = f"🃏 텍사스 홀덤 #{self.table_id}"
             color = discord.Color.blue()
         elif self.game.game_over:
-            title = "🃏 텍사스 홀덤 - 🎉 게임 완료!"
+            title = f"🃏 텍사스 홀덤 #{self.table_id} - 🎉 게임 완료!"
             color = discord.Color.gold()
         else:
-            title = "🃏 텍사스 홀덤 - 진행 중"
+            title = f"🃏 텍사스 홀덤 #{self.table_id} - 진행 중"
             color = discord.Color.green()
 
         embed = discord.Embed(title=title, color=color, timestamp=discord.utils.utcnow())
@@ -1166,8 +1249,7 @@ class HoldemView(discord.ui.View):
 
             # Community cards
             if self.game.community_cards:
-                cards_str = " ".join(str(card) for card in self.game.community_cards)
-                embed.add_field(name="🃏 커뮤니티 카드", value=cards_str, inline=False)
+                embed.add_field(name="🃏 커뮤니티 카드", value=cards_str(self.game.community_cards), inline=False)
 
             # Player info
             player_info = []
@@ -1265,6 +1347,11 @@ class HoldemView(discord.ui.View):
         embed = self.create_game_embed()
         await interaction.response.edit_message(embed=embed, view=self)
 
+        # Escrow write happens after responding so DB latency can't push the click past the interaction deadline
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.add_stake(self.session_id, interaction.user.id, interaction.guild.id, self.game.buy_in)
+
     @discord.ui.button(label="❌ 나가기", style=discord.ButtonStyle.red)
     async def leave_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         if not self.join_phase:
@@ -1299,8 +1386,16 @@ class HoldemView(discord.ui.View):
             # Remove player
             self.game.remove_player(interaction.user.id)
 
+            sessions = get_session_cog(self.bot)
+            if sessions:
+                await sessions.release_stake(self.session_id, interaction.user.id)
+
         # Check if no players left - close game
         if not self.game.players:
+            await self.close_session()
+            holdem_cog = self.bot.get_cog('HoldemCog')
+            if holdem_cog:
+                holdem_cog.remove_table(self)
             self.clear_items()
             embed = discord.Embed(
                 title="🃏 텍사스 홀덤 종료",
@@ -1321,11 +1416,16 @@ class HoldemView(discord.ui.View):
 
     async def on_timeout(self):
         """Clean up when view times out"""
-        # Clean up the game from active games
-        if hasattr(self.bot, 'get_cog'):
-            holdem_cog = self.bot.get_cog('HoldemCog')
-            if holdem_cog and self.game.channel_id in holdem_cog.active_games:
-                del holdem_cog.active_games[self.game.channel_id]
+        # Timed-out tables forfeit their buy-ins, so the escrow is dropped too
+        await self.close_session()
+
+        if self.actor_task and not self.actor_task.done():
+            self.actor_task.cancel()
+
+        # Clean up the table from the lobby
+        holdem_cog = self.bot.get_cog('HoldemCog')
+        if holdem_cog:
+            holdem_cog.remove_table(self)
 
         # Disable all buttons
         self.clear_items()
@@ -1403,19 +1503,10 @@ class ActionButton(discord.ui.Button):
             await interaction.response.send_modal(modal)
             return
 
-        # Handle other actions
-        success = game.make_action(player_idx, self.action)
-        if not success:
-            await interaction.response.send_message("❌ 액션 처리에 실패했습니다!", ephemeral=True)
-            return
-
-        # FIXED: Update state atomically
-        view.waiting_for_action = False
-        next_player = game.get_next_active_player(game.current_player)
-        game.current_player = next_player
-
-        embed = view.create_game_embed()
-        await interaction.response.edit_message(embed=embed, view=view)
+        # Hand the action to the table actor, which applies it and redraws the table
+        turn = view.turn
+        await interaction.response.defer()
+        view.submit_action(player_idx, self.action, turn=turn)
 
 
 class HoldemCog(commands.Cog):
@@ -1424,9 +1515,62 @@ class HoldemCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = get_logger("텍사스홀덤")
-        self.active_games: Dict[int, HoldemView] = {}  # channel_id -> game
+        self.tables: Dict[int, Dict[int, HoldemView]] = {}  # guild_id -> {table_id: table}
+        self.next_table_id: Dict[int, int] = {}  # guild_id -> next table number
         self.logger.info("텍사스 홀덤 게임 시스템이 초기화되었습니다.")
 
+    def add_table(self, guild_id: int, table: HoldemView) -> int:
+        """Register a table in the guild lobby and return its table number"""
+        table_id = self.next_table_id.get(guild_id, 1)
+        self.next_table_id[guild_id] = table_id + 1
+        table.table_id = table_id
+        self.tables.setdefault(guild_id, {})[table_id] = table
+        return table_id
+
+    def remove_table(self, table: HoldemView):
+        """Drop a finished or abandoned table from the lobby"""
+        guild_tables = self.tables.get(table.game.guild_id)
+        if guild_tables and guild_tables.get(table.table_id) is table:
+            del guild_tables[table.table_id]
+            if not guild_tables:
+                del self.tables[table.game.guild_id]
+
+    def create_lobby_embed(self, guild: discord.Guild) -> discord.Embed:
+        """List every open table in the guild with its seats"""
+        guild_tables = self.tables.get(guild.id, {})
+        embed = discord.Embed(
+            title="🃏 텍사스 홀덤 로비",
+            color=discord.Color.dark_green(),
+            timestamp=discord.utils.utcnow()
+        )
+
+        if not guild_tables:
+            embed.description = "열려 있는 테이블이 없습니다. `/홀덤`으로 새 테이블을 만드세요!"
+        for table_id, table in sorted(guild_tables.items()):
+            game = table.game
+            status = "🟢 모집 중" if table.join_phase else "🔴 진행 중"
+            seats = ", ".join(p.username for p in game.players) or "-"
+            embed.add_field(
+                name=f"테이블 #{table_id} · {status}",
+                value=(
+                    f"📍 <#{game.channel_id}> | 💳 바이인 {game.buy_in:,}코인\n"
+                    f"💺 좌석 {len(game.players)}/8: {seats}\n"
+                    f"⏱️ 액션 지연: {table.latency_summary()}"
+                ),
+                inline=False
+            )
+
+        embed.set_footer(text=f"Server: {guild.name}")
+        return embed
+
+    @app_commands.command(name="홀덤로비", description="이 서버의 홀덤 테이블 목록을 확인합니다")
+    async def holdem_lobby(self, interaction: discord.Interaction):
+        if not interaction.guild or not is_feature_enabled(interaction.guild.id, 'casino_games'):
+            await interaction.response.send_message("❌ 이 서버에서는 카지노 게임이 비활성화되어 있습니다!", ephemeral=True)
+            return
+
+        await interaction.response.send_message(embed=self.create_lobby_embed(interaction.guild), ephemeral=True)
+
     @app_commands.command(name="홀덤", description="텍사스 홀덤 포커 게임을 시작합니다")
     @app_commands.describe(buy_in="바이인 금액 (100-1000코인)")
     async def holdem(self, interaction: discord.Interaction, buy_in: int = 100):
@@ -1461,15 +1605,14 @@ class HoldemCog(commands.Cog):
 
             channel_id = interaction.channel.id
 
-            # Check for existing game
-            if channel_id in self.active_games:
-                existing = self.active_games[channel_id]
-                if existing.join_phase:
-                    await interaction.response.send_message("❌ 이 채널에서 이미 홀덤 게임 모집 중입니다!", ephemeral=True)
-                    return
-                elif not existing.game.game_over:
-                    await interaction.response.send_message("❌ 이 채널에서 홀덤 게임이 진행 중입니다!", ephemeral=True)
-                    return
+            # Several tables may run at once; only the per-server table count is limited
+            max_tables = get_server_setting(interaction.guild.id, 'holdem_max_tables', 5)
+            if len(self.tables.get(interaction.guild.id, {})) >= max_tables:
+                await interaction.response.send_message(
+                    f"❌ 이 서버에는 이미 {max_tables}개의 홀덤 테이블이 열려 있습니다! `/홀덤로비`에서 빈 좌석을 찾아보세요.",
+                    ephemeral=True
+                )
+                return
 
             # Deduct creator's buy-in
             coins_cog = self.bot.get_cog('CoinsCog')
@@ -1494,7 +1637,14 @@ class HoldemCog(commands.Cog):
                 interaction.user.id,
                 interaction.user.display_name
             )
-            self.active_games[channel_id] = game_view
+            table_id = self.add_table(interaction.guild.id, game_view)
+
+            # Escrow buy-ins until the table settles
+            sessions = get_session_cog(self.bot)
+            if sessions:
+                game_view.session_id = await sessions.open_session(
+                    'holdem', interaction.guild.id, channel_id, {interaction.user.id: buy_in}, game_view.snapshot()
+                )
 
             embed = game_view.create_game_embed()
             await interaction.response.send_message(embed=embed, view=game_view)
@@ -1503,7 +1653,7 @@ class HoldemCog(commands.Cog):
             game_view.current_message = await interaction.original_response()
 
             self.logger.info(
-                f"{interaction.user}가 {buy_in}코인 바이인으로 텍사스 홀덤을 시작했습니다",
+                f"{interaction.user}가 {buy_in}코인 바이인으로 텍사스 홀덤 테이블 #{table_id}을 열었습니다",
                 extra={'guild_id': interaction.guild.id}
             )
 
@@ -3,7 +3,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import random
-from typing import List, Tuple
+import uuid
+from typing import List, Optional, Tuple
 
 from utils.logger import get_logger
 from utils.config import (
@@ -11,6 +12,7 @@ from utils.config import (
     get_server_setting
 )
 from cogs.coins import check_user_casino_eligibility
+from cogs.game_sessions import get_session_cog
 
 class MinesweeperView(discord.ui.View):
     """Interactive Minesweeper game with dropdown selection and standardized embeds"""
@@ -26,15 +28,21 @@ class MinesweeperView(discord.ui.View):
         self.game_won = False
         self.revealed_gems = 0
         self.current_multiplier = 1.0
+        self.session_id: Optional[str] = None
+        self.round_id = f"minesweeper:{uuid.uuid4().hex}"
 
         # 5x5 grid
         self.grid_size = 5
         self.total_cells = self.grid_size * self.grid_size
         self.total_gems = self.total_cells - self.mines_count
 
-        # Initialize grid (True = mine, False = gem)
-        self.grid = self.generate_minefield()
-        self.revealed = [[False for _ in range(self.grid_size)] for _ in range(self.grid_size)]
+        # Board as bitmasks: bit (row * grid_size + col) is set for mines / revealed cells
+        self.mine_mask = self.generate_minefield()
+        self.revealed_mask = 0
+        self.all_cells_mask = (1 << self.total_cells) - 1
+
+        # Multiplier for every possible gem count, computed once from the guild settings
+        self.multipliers = self.build_multiplier_schedule()
 
         # Selection state
         self.selected_position = None
@@ -42,21 +50,50 @@ class MinesweeperView(discord.ui.View):
         # Create UI components
         self.create_components()
 
-    def generate_minefield(self) -> List[List[bool]]:
-        """Generate minefield with specified number of mines"""
-        # Create flat list with mines
-        cells = [True] * self.mines_count + [False] * (self.total_cells - self.mines_count)
-        random.shuffle(cells)
-
-        # Convert to 2D grid
-        grid = []
-        for i in range(self.grid_size):
-            row = []
-            for j in range(self.grid_size):
-                row.append(cells[i * self.grid_size + j])
-            grid.append(row)
-
-        return grid
+    def generate_minefield(self) -> int:
+        """Generate minefield with specified number of mines as a bitmask"""
+        mask = 0
+        for cell in random.sample(range(self.total_cells), self.mines_count):
+            mask |= 1 << cell
+        return mask
+
+    def cell_bit(self, row: int, col: int) -> int:
+        return 1 << (row * self.grid_size + col)
+
+    def is_mine(self, row: int, col: int) -> bool:
+        return bool(self.mine_mask & self.cell_bit(row, col))
+
+    def is_revealed(self, row: int, col: int) -> bool:
+        return bool(self.revealed_mask & self.cell_bit(row, col))
+
+    def next_multiplier(self) -> Optional[float]:
+        """Multiplier after one more gem, or None if every gem is already found"""
+        if self.revealed_gems >= self.total_gems:
+            return None
+        return self.multipliers[self.revealed_gems + 1]
+
+    def snapshot(self) -> dict:
+        """Serializable checkpoint of the board"""
+        return {
+            'user_id': self.user_id,
+            'bet': self.bet,
+            'mines': self.mines_count,
+            'mine_mask': self.mine_mask,
+            'revealed_mask': self.revealed_mask,
+            'revealed_gems': self.revealed_gems,
+            'multiplier': self.current_multiplier,
+        }
+
+    async def close_session(self):
+        """Mark the session settled so its escrow is not refunded on restart"""
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            await sessions.close_session(self.session_id)
+        self.session_id = None
+
+    async def on_timeout(self):
+        """An abandoned board forfeits the bet, so the escrow is dropped too"""
+        await self.close_session()
 
     def create_components(self):
         """Create UI components for the game"""
@@ -92,7 +129,7 @@ class MinesweeperView(discord.ui.View):
             return
 
         row, col = self.selected_position
-        if self.revealed[row][col]:
+        if self.is_revealed(row, col):
             await interaction.response.send_message("❌ 이미 공개된 칸입니다!", ephemeral=True)
             return
 
@@ -112,44 +149,47 @@ class MinesweeperView(discord.ui.View):
         await interaction.response.defer()
         await self.end_game(interaction, True)
 
-    def calculate_multiplier(self) -> float:
-        """Calculate current multiplier based on revealed gems and mine count - BALANCED VERSION"""
-        if self.revealed_gems == 0:
-            return 1.0
+    def build_multiplier_schedule(self) -> List[float]:
+        """Precompute the multiplier for 0..total_gems revealed gems - BALANCED VERSION
 
+        A game only continues while gems are being found, so after k gems exactly k
+        cells are revealed and the whole curve depends on k alone.
+        """
         # Get server-specific multiplier settings with much more conservative defaults
         base_multiplier = get_server_setting(self.guild_id, 'minesweeper_base_multiplier', 0.95)
         multiplier_per_gem = get_server_setting(self.guild_id, 'minesweeper_gem_multiplier', 0.08)
         mine_bonus = get_server_setting(self.guild_id, 'minesweeper_mine_bonus', 0.01)
+        max_multiplier = get_server_setting(self.guild_id, 'minesweeper_max_multiplier', 3.0)
 
-        # Calculate remaining gems and total revealed cells
-        remaining_gems = self.total_gems - self.revealed_gems
-        total_revealed = sum(sum(row) for row in self.revealed)
-        remaining_cells = self.total_cells - total_revealed
+        gem_value = multiplier_per_gem * (1 + self.mines_count * mine_bonus)
+        schedule = [1.0]
+        for gems in range(1, self.total_gems + 1):
+            remaining_cells = self.total_cells - gems
 
-        # Progressive multiplier with diminishing returns and risk consideration
-        if remaining_cells <= self.mines_count:
-            return base_multiplier + (self.revealed_gems * multiplier_per_gem * (1 + self.mines_count * mine_bonus))
+            # Progressive multiplier with diminishing returns and risk consideration
+            if remaining_cells <= self.mines_count:
+                schedule.append(base_multiplier + gems * gem_value)
+                continue
 
-        # Calculate risk factor: probability of hitting a mine on next reveal
-        mine_risk_factor = self.mines_count / remaining_cells if remaining_cells > 0 else 1.0
+            # Risk factor: probability of hitting a mine on the next reveal
+            mine_risk_factor = self.mines_count / remaining_cells
 
-        # Multiplier increases with each gem found, but with diminishing returns
-        multiplier = base_multiplier + (
-                self.revealed_gems * multiplier_per_gem *
-                (1 + (self.mines_count * mine_bonus)) *
-                (1.0 + mine_risk_factor * 0.1)  # Small risk bonus
-        )
+            # Multiplier increases with each gem found, capped to prevent excessive payouts
+            multiplier = base_multiplier + gems * gem_value * (1.0 + mine_risk_factor * 0.1)  # Small risk bonus
+            schedule.append(min(multiplier, max_multiplier))
 
-        # Cap the multiplier to prevent excessive payouts
-        max_multiplier = get_server_setting(self.guild_id, 'minesweeper_max_multiplier', 3.0)
-        return min(multiplier, max_multiplier)
+        return schedule
+
+    def calculate_multiplier(self) -> float:
+        """Current multiplier based on revealed gems (a table lookup)"""
+        return self.multipliers[self.revealed_gems]
 
     async def reveal_cell(self, interaction: discord.Interaction, row: int, col: int):
         """Reveal a cell and handle game logic"""
-        self.revealed[row][col] = True
+        bit = self.cell_bit(row, col)
+        self.revealed_mask |= bit
 
-        if self.grid[row][col]:  # Hit a mine
+        if self.mine_mask & bit:  # Hit a mine
             await self.end_game(interaction, False)
         else:  # Found a gem
             self.revealed_gems += 1
@@ -163,6 +203,10 @@ class MinesweeperView(discord.ui.View):
             if self.revealed_gems >= self.total_gems:
                 await self.end_game(interaction, True)
             else:
+                sessions = get_session_cog(self.bot)
+                if sessions:
+                    await sessions.checkpoint(self.session_id, self.snapshot())
+
                 embed = await self.create_game_embed(interaction)
                 await interaction.edit_original_response(embed=embed, view=self)
 
@@ -175,8 +219,9 @@ class MinesweeperView(discord.ui.View):
         for i, letter in enumerate(['A', 'B', 'C', 'D', 'E']):
             line = f"{letter}:"
             for j in range(self.grid_size):
-                if self.revealed[i][j]:
-                    if self.grid[i][j]:  # Mine
+                bit = self.cell_bit(i, j)
+                if self.revealed_mask & bit:
+                    if self.mine_mask & bit:  # Mine
                         line += " 💣"
                     else:  # Gem
                         line += " 💎"
@@ -255,6 +300,10 @@ class MinesweeperView(discord.ui.View):
 
             status_info = f"📈 **현재 배수:** {self.current_multiplier:.2f}x\n💰 **현재 캐시아웃:** {potential_payout:,} 코인"
 
+            next_multiplier = self.next_multiplier()
+            if next_multiplier is not None:
+                status_info += f"\n⏭️ **다음 보석:** {next_multiplier:.2f}x ({int(self.bet * next_multiplier):,} 코인)"
+
             if potential_profit > 0:
                 status_info += f"\n📈 **순이익:** +{potential_profit:,} 코인"
             elif potential_profit < 0:
@@ -279,25 +328,26 @@ class MinesweeperView(discord.ui.View):
         self.game_won = won
 
         # Reveal all cells
-        for i in range(self.grid_size):
-            for j in range(self.grid_size):
-                self.revealed[i][j] = True
+        self.revealed_mask = self.all_cells_mask
 
         # Disable all components
         for item in self.children:
             item.disabled = True
 
-        # Handle payout
+        # Handle payout (the bet was taken at start; settle guards against double cash-outs)
         coins_cog = self.bot.get_cog('CoinsCog')
-        if coins_cog and won:
-            payout = int(self.bet * self.current_multiplier)
-            await coins_cog.add_coins(
+        if coins_cog:
+            payout = int(self.bet * self.current_multiplier) if won else 0
+            await coins_cog.settle(
+                self.round_id,
                 self.user_id,
                 interaction.guild.id,
+                0,
                 payout,
-                "minesweeper_win",
-                f"지뢰찾기 승리: {self.revealed_gems}개 보석, {self.current_multiplier:.2f}x 배수"
+                "minesweeper",
+                f"지뢰찾기 {'승리' if won else '패배'}: {self.revealed_gems}개 보석, {self.current_multiplier:.2f}x 배수"
             )
+        await self.close_session()
 
         embed = await self.create_game_embed(interaction, True, won)
         await interaction.edit_original_response(embed=embed, view=self)
@@ -334,7 +384,7 @@ class PositionSelect(discord.ui.Select):
         # Parse selected position
         row, col = map(int, self.values[0].split(','))
 
-        if view.revealed[row][col]:
+        if view.is_revealed(row, col):
             await interaction.response.send_message("❌ 이미 공개된 칸입니다!", ephemeral=True)
             return
 
@@ -419,10 +469,20 @@ class MinesweeperCog(commands.Cog):
 
         # Create game view
         view = MinesweeperView(self.bot, interaction.user.id, bet, mines, interaction.guild.id)
+
         embed = await view.create_game_embed(interaction)
 
         await interaction.response.send_message(embed=embed, view=view)
 
+        # Escrow the bet until the board is cashed out or lost.
+        # The write happens after responding so DB latency can't push the command past the interaction deadline
+        sessions = get_session_cog(self.bot)
+        if sessions:
+            view.session_id = await sessions.open_session(
+                'minesweeper', interaction.guild.id, interaction.channel.id,
+                {interaction.user.id: bet}, view.snapshot()
+            )
+
         self.logger.info(
             f"{interaction.user}가 {bet}코인, {mines}개 지뢰로 지뢰찾기 시작",
             extra={'guild_id': interaction.guild.id}
@@ -133,8 +133,13 @@ class SlotMachineCog(commands.Cog):
             await interaction.response.send_message(error_msg, ephemeral=True)
             return
 
+        # The spin is decided up front so the bet and payout settle in one round trip
+        reel1, reel2, reel3 = self.spin_reels()
+        payout, result_text = self.calculate_payout(reel1, reel2, reel3, bet, interaction.guild.id)
+
         coins_cog = self.bot.get_cog('CoinsCog')
-        if not await coins_cog.remove_coins(interaction.user.id, interaction.guild.id, bet, "slot_machine_bet", "Slot machine bet"):
+        if not await coins_cog.settle(f"slots:{interaction.id}", interaction.user.id, interaction.guild.id, bet, payout,
+                                      "slot_machine", f"Slot machine: {reel1}{reel2}{reel3}"):
             await interaction.response.send_message("베팅 처리 실패!", ephemeral=True)
             return
 
@@ -169,8 +174,6 @@ class SlotMachineCog(commands.Cog):
             await asyncio.sleep(0.7)
 
         # Final spin result
-        reel1, reel2, reel3 = self.spin_reels()
-        payout, result_text = self.calculate_payout(reel1, reel2, reel3, bet, interaction.guild.id)
         total_losses_to_lottery = 0
 
         # Determine result color and title
@@ -206,9 +209,6 @@ class SlotMachineCog(commands.Cog):
         result_info = f"{result_text}\n\n"
 
         if payout > 0:
-            await coins_cog.add_coins(interaction.user.id, interaction.guild.id, payout, "slot_machine_win",
-                                      f"Slot machine win: {reel1}{reel2}{reel3}")
-
             profit = payout - bet
             result_info += f"💰 **수익:** {payout:,} 코인\n"
             if profit > 0:
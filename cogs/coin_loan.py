@@ -1,12 +1,23 @@
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
+import asyncio
+import time
 from datetime import datetime, timezone, timedelta
 import pytz
 
 # Make sure to have these utility files or adjust the imports
 from utils.logger import get_logger
 from utils import config
+from utils.discord_tools import KeysetPageView
+from cogs.scheduler import get_scheduler
+
+# Overdue notices (channel updates and DMs) sent at once; keeps a large batch under Discord rate limits
+OVERDUE_NOTIFY_CONCURRENCY = 5
+
+# Admin listing page sizes
+LOAN_PAGE_SIZE = 20
+REQUEST_PAGE_SIZE = 10
 
 
 class LoanRequestModal(discord.ui.Modal, title="대출 신청"):
@@ -450,10 +461,47 @@ class LoanCog(commands.Cog):
         print("Bot is ready, setting up tables...")
         await self.setup_loan_tables()
         await self.setup_request_interface()
-        if not self.check_overdue_loans.is_running():
-            self.check_overdue_loans.start()
+        await self.setup_due_date_jobs()
         self.logger.info("대출 시스템 Cog가 초기화되고 백그라운드 작업이 시작되었습니다.")
 
+    async def setup_due_date_jobs(self):
+        """Register the due date handler and schedule every active loan's due date"""
+        scheduler = get_scheduler(self.bot)
+        if not scheduler:
+            self.logger.warning("작업 스케줄러가 없어 연체 처리가 비활성화됩니다.")
+            return
+
+        scheduler.register_handler('loan_due', self.run_scheduled_due_date)
+
+        # Loans that came due while the bot was offline are scheduled in the past and processed right away
+        try:
+            loans = await self.bot.pool.fetch(
+                "SELECT loan_id, guild_id, due_date FROM user_loans WHERE status = 'active'"
+            )
+            await scheduler.schedule_many('loan_due', [
+                (f"loan_due:{loan['loan_id']}", loan['due_date'], {'loan_id': loan['loan_id']}, loan['guild_id'])
+                for loan in loans
+            ])
+        except Exception as e:
+            self.logger.error(f"대출 상환 기한 예약 실패: {e}")
+
+    async def schedule_due_date(self, loan_id: int, guild_id: int, due_date: datetime):
+        """Schedule overdue processing for the moment a loan comes due"""
+        scheduler = get_scheduler(self.bot)
+        if scheduler:
+            await scheduler.schedule('loan_due', f"loan_due:{loan_id}", due_date, {'loan_id': loan_id}, guild_id)
+
+    async def on_loan_issued(self, loan_id: int, user_id: int, guild_id: int, due_date: datetime):
+        """Schedule a new loan's due date and sync the borrower's cached restriction state"""
+        await self.schedule_due_date(loan_id, guild_id, due_date)
+        coins_cog = self.bot.get_cog('CoinsCog')
+        if coins_cog:
+            await coins_cog.refresh_loan_restriction(user_id, guild_id)
+
+    async def run_scheduled_due_date(self, payload: dict):
+        """A loan's due date has passed; default every loan that is now overdue"""
+        await self.process_overdue_loans()
+
     async def setup_loan_tables(self):
         """Creates the necessary database tables for the loan system."""
         try:
@@ -489,10 +537,169 @@ class LoanCog(commands.Cog):
                 );
             """)
 
+            # Per-guild portfolio aggregates, kept current by the same statements that change user_loans.
+            # outstanding_interest is the interest scheduled on open loans; outstanding_amount is what is still owed.
+            stats_table_exists = await self.bot.pool.fetchval("SELECT to_regclass('loan_guild_stats') IS NOT NULL")
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS loan_guild_stats (
+                    guild_id BIGINT PRIMARY KEY,
+                    issued_count INTEGER NOT NULL DEFAULT 0,
+                    active_count INTEGER NOT NULL DEFAULT 0,
+                    defaulted_count INTEGER NOT NULL DEFAULT 0,
+                    paid_count INTEGER NOT NULL DEFAULT 0,
+                    defaulted_total INTEGER NOT NULL DEFAULT 0,
+                    principal_issued BIGINT NOT NULL DEFAULT 0,
+                    outstanding_principal BIGINT NOT NULL DEFAULT 0,
+                    outstanding_interest BIGINT NOT NULL DEFAULT 0,
+                    outstanding_amount BIGINT NOT NULL DEFAULT 0
+                );
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS loan_borrower_stats (
+                    guild_id BIGINT NOT NULL,
+                    user_id BIGINT NOT NULL,
+                    loan_count INTEGER NOT NULL DEFAULT 0,
+                    total_borrowed BIGINT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (guild_id, user_id)
+                );
+            """)
+
+            # Keyset listings and top-borrower lookups
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_user_loans_guild_open
+                ON user_loans(guild_id, issued_at DESC, loan_id DESC)
+                WHERE status IN ('active', 'defaulted');
+            """)
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_loan_requests_guild_open
+                ON loan_requests(guild_id, requested_at DESC, request_id DESC)
+                WHERE status IN ('pending', 'negotiating');
+            """)
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_loan_borrower_stats_top
+                ON loan_borrower_stats(guild_id, total_borrowed DESC);
+            """)
+
+            if not stats_table_exists:
+                await self.backfill_loan_stats()
+
             self.logger.info("✅ 대출 데이터베이스 테이블이 준비되었습니다.")
         except Exception as e:
             self.logger.error(f"❌ 대출 테이블 설정 실패: {e}")
 
+    async def backfill_loan_stats(self):
+        """Build the aggregate tables from existing loan history (first run only)"""
+        async with self.bot.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("""
+                    INSERT INTO loan_guild_stats
+                    (guild_id, issued_count, active_count, defaulted_count, paid_count, defaulted_total,
+                     principal_issued, outstanding_principal, outstanding_interest, outstanding_amount)
+                    SELECT guild_id,
+                           COUNT(*),
+                           COUNT(*) FILTER (WHERE status = 'active'),
+                           COUNT(*) FILTER (WHERE status = 'defaulted'),
+                           COUNT(*) FILTER (WHERE status = 'paid'),
+                           COUNT(*) FILTER (WHERE status = 'defaulted'),
+                           SUM(principal_amount),
+                           COALESCE(SUM(principal_amount) FILTER (WHERE status IN ('active', 'defaulted')), 0),
+                           COALESCE(SUM(FLOOR(principal_amount * interest_rate / 100)::bigint)
+                                    FILTER (WHERE status IN ('active', 'defaulted')), 0),
+                           COALESCE(SUM(remaining_amount) FILTER (WHERE status IN ('active', 'defaulted')), 0)
+                    FROM user_loans
+                    GROUP BY guild_id
+                    ON CONFLICT (guild_id) DO NOTHING
+                """)
+                await conn.execute("""
+                    INSERT INTO loan_borrower_stats (guild_id, user_id, loan_count, total_borrowed)
+                    SELECT guild_id, user_id, COUNT(*), SUM(principal_amount)
+                    FROM user_loans
+                    GROUP BY guild_id, user_id
+                    ON CONFLICT (guild_id, user_id) DO NOTHING
+                """)
+        self.logger.info("대출 통계 집계 테이블을 기존 대출 기록으로 채웠습니다.")
+
+    async def create_loan_record(self, user_id: int, guild_id: int, principal: int, total_repayment: int,
+                                 interest_rate: float, due_date: datetime, channel_id: int):
+        """Insert an active loan and count it in the guild and borrower aggregates in one statement"""
+        return await self.bot.pool.fetchrow("""
+            WITH loan AS (
+                INSERT INTO user_loans (user_id, guild_id, principal_amount, remaining_amount, interest_rate, due_date, status, channel_id)
+                VALUES ($1, $2, $3, $4, $5, $6, 'active', $7)
+                RETURNING loan_id, user_id, guild_id, principal_amount, remaining_amount,
+                          FLOOR(principal_amount * interest_rate / 100)::bigint AS interest
+            ), guild_stats AS (
+                INSERT INTO loan_guild_stats AS s
+                (guild_id, issued_count, active_count, principal_issued, outstanding_principal, outstanding_interest, outstanding_amount)
+                SELECT guild_id, 1, 1, principal_amount, principal_amount, interest, remaining_amount FROM loan
+                ON CONFLICT (guild_id) DO UPDATE SET
+                    issued_count = s.issued_count + 1,
+                    active_count = s.active_count + 1,
+                    principal_issued = s.principal_issued + EXCLUDED.principal_issued,
+                    outstanding_principal = s.outstanding_principal + EXCLUDED.outstanding_principal,
+                    outstanding_interest = s.outstanding_interest + EXCLUDED.outstanding_interest,
+                    outstanding_amount = s.outstanding_amount + EXCLUDED.outstanding_amount
+            ), borrower_stats AS (
+                INSERT INTO loan_borrower_stats AS b (guild_id, user_id, loan_count, total_borrowed)
+                SELECT guild_id, user_id, 1, principal_amount FROM loan
+                ON CONFLICT (guild_id, user_id) DO UPDATE SET
+                    loan_count = b.loan_count + 1,
+                    total_borrowed = b.total_borrowed + EXCLUDED.total_borrowed
+            )
+            SELECT loan_id FROM loan
+        """, user_id, guild_id, principal, total_repayment, interest_rate, due_date, channel_id)
+
+    async def delete_loan_record(self, loan_id: int):
+        """Roll back a just-issued loan, removing it from the aggregates in the same statement"""
+        await self.bot.pool.execute("""
+            WITH loan AS (
+                DELETE FROM user_loans WHERE loan_id = $1 AND status = 'active'
+                RETURNING user_id, guild_id, principal_amount, remaining_amount,
+                          FLOOR(principal_amount * interest_rate / 100)::bigint AS interest
+            ), borrower_stats AS (
+                UPDATE loan_borrower_stats b SET
+                    loan_count = b.loan_count - 1,
+                    total_borrowed = b.total_borrowed - loan.principal_amount
+                FROM loan WHERE b.guild_id = loan.guild_id AND b.user_id = loan.user_id
+            )
+            UPDATE loan_guild_stats s SET
+                issued_count = s.issued_count - 1,
+                active_count = s.active_count - 1,
+                principal_issued = s.principal_issued - loan.principal_amount,
+                outstanding_principal = s.outstanding_principal - loan.principal_amount,
+                outstanding_interest = s.outstanding_interest - loan.interest,
+                outstanding_amount = s.outstanding_amount - loan.remaining_amount
+            FROM loan WHERE s.guild_id = loan.guild_id
+        """, loan_id)
+
+    async def record_loan_payment(self, loan_id: int, new_remaining: int):
+        """Apply a repayment to the loan and the guild aggregates in one statement; a zero balance closes the loan"""
+        await self.bot.pool.execute("""
+            WITH prev AS (
+                SELECT loan_id, guild_id, status, principal_amount, remaining_amount,
+                       FLOOR(principal_amount * interest_rate / 100)::bigint AS interest
+                FROM user_loans
+                WHERE loan_id = $1 AND status IN ('active', 'defaulted')
+                FOR UPDATE
+            ), loan AS (
+                UPDATE user_loans l SET
+                    remaining_amount = $2,
+                    status = CASE WHEN $2 = 0 THEN 'paid' ELSE l.status END
+                FROM prev WHERE l.loan_id = prev.loan_id
+                RETURNING prev.guild_id, prev.status AS prev_status, prev.principal_amount, prev.interest,
+                          prev.remaining_amount - $2 AS paid_amount
+            )
+            UPDATE loan_guild_stats s SET
+                outstanding_amount = s.outstanding_amount - loan.paid_amount,
+                active_count = s.active_count - CASE WHEN $2 = 0 AND loan.prev_status = 'active' THEN 1 ELSE 0 END,
+                defaulted_count = s.defaulted_count - CASE WHEN $2 = 0 AND loan.prev_status = 'defaulted' THEN 1 ELSE 0 END,
+                paid_count = s.paid_count + CASE WHEN $2 = 0 THEN 1 ELSE 0 END,
+                outstanding_principal = s.outstanding_principal - CASE WHEN $2 = 0 THEN loan.principal_amount ELSE 0 END,
+                outstanding_interest = s.outstanding_interest - CASE WHEN $2 = 0 THEN loan.interest ELSE 0 END
+            FROM loan WHERE s.guild_id = loan.guild_id
+        """, loan_id, new_remaining)
+
     async def setup_request_interface(self):
         """Set up the loan request interface"""
         try:
@@ -630,13 +837,8 @@ class LoanCog(commands.Cog):
             total_repayment = request['amount'] + int(request['amount'] * (request['interest_rate'] / 100))
 
             # Create loan record
-            loan_query = """
-                INSERT INTO user_loans (user_id, guild_id, principal_amount, remaining_amount, interest_rate, due_date, status, channel_id)
-                VALUES ($1, $2, $3, $4, $5, $6, 'active', $7)
-                RETURNING loan_id
-            """
-            loan_record = await self.bot.pool.fetchrow(
-                loan_query, request['user_id'], request['guild_id'],
+            loan_record = await self.create_loan_record(
+                request['user_id'], request['guild_id'],
                 request['amount'], total_repayment, request['interest_rate'],
                 due_date, channel.id
             )
@@ -649,7 +851,7 @@ class LoanCog(commands.Cog):
 
             if not success:
                 # Rollback
-                await self.bot.pool.execute("DELETE FROM user_loans WHERE loan_id = $1", loan_record['loan_id'])
+                await self.delete_loan_record(loan_record['loan_id'])
                 try:
                     await channel.delete()
                 except:
@@ -664,6 +866,7 @@ class LoanCog(commands.Cog):
 
             # Update loan channel with loan info
             await self.update_loan_channel(channel, loan_record['loan_id'])
+            await self.on_loan_issued(loan_record['loan_id'], request['user_id'], request['guild_id'], due_date)
 
             # Update original message
             try:
@@ -1063,13 +1266,8 @@ class LoanCog(commands.Cog):
             total_repayment = final_amount + int(final_amount * (final_interest / 100))
 
             # Create loan record
-            loan_query = """
-                INSERT INTO user_loans (user_id, guild_id, principal_amount, remaining_amount, interest_rate, due_date, status, channel_id)
-                VALUES ($1, $2, $3, $4, $5, $6, 'active', $7)
-                RETURNING loan_id
-            """
-            loan_record = await self.bot.pool.fetchrow(
-                loan_query, request['user_id'], request['guild_id'],
+            loan_record = await self.create_loan_record(
+                request['user_id'], request['guild_id'],
                 final_amount, total_repayment, final_interest, due_date, loan_channel.id
             )
 
@@ -1081,7 +1279,7 @@ class LoanCog(commands.Cog):
 
             if not success:
                 # Rollback
-                await self.bot.pool.execute("DELETE FROM user_loans WHERE loan_id = $1", loan_record['loan_id'])
+                await self.delete_loan_record(loan_record['loan_id'])
                 try:
                     await loan_channel.delete()
                 except:
@@ -1101,6 +1299,7 @@ class LoanCog(commands.Cog):
 
             # Update loan channel with loan info
             await self.update_loan_channel(loan_channel, loan_record['loan_id'])
+            await self.on_loan_issued(loan_record['loan_id'], request['user_id'], request['guild_id'], due_date)
 
             # Post completion message in negotiation channel
             completion_embed = discord.Embed(
@@ -1381,8 +1580,7 @@ class LoanCog(commands.Cog):
             new_remaining = loan['remaining_amount'] - payment_amount
             if new_remaining <= 0:
                 # Loan fully paid
-                await self.bot.pool.execute(
-                    "UPDATE user_loans SET remaining_amount = 0, status = 'paid' WHERE loan_id = $1", loan_id)
+                await self.record_loan_payment(loan_id, 0)
 
                 await interaction.followup.send(
                     f"🎉 **{payment_amount:,} 코인**을 상환하여 대출을 모두 갚았습니다! 축하합니다!", ephemeral=True)
@@ -1419,8 +1617,7 @@ class LoanCog(commands.Cog):
                         pass
             else:
                 # Partial payment
-                await self.bot.pool.execute("UPDATE user_loans SET remaining_amount = $1 WHERE loan_id = $2",
-                                            new_remaining, loan_id)
+                await self.record_loan_payment(loan_id, new_remaining)
                 await interaction.followup.send(
                     f"✅ **{payment_amount:,} 코인**을 상환했습니다. 남은 금액: **{new_remaining:,} 코인**", ephemeral=True)
 
@@ -1455,89 +1652,123 @@ class LoanCog(commands.Cog):
             self.logger.error(f"Error checking if restrictions lifted: {e}")
             return False
 
-    @tasks.loop(hours=24)
-    async def check_overdue_loans(self):
-        """Daily check for loans that have passed their due date and notifications."""
+    async def process_overdue_loans(self):
+        """Default every loan past its due date in one statement, then notify borrowers concurrently."""
+        started = time.perf_counter()
         current_time = datetime.now(timezone.utc)
-        self.logger.info("연체된 대출을 확인하는 중...")
         try:
-            # Find loans that just became overdue (status is still 'active' but past due date)
-            newly_overdue_query = """
-                SELECT loan_id, user_id, guild_id, remaining_amount, channel_id, due_date
-                FROM user_loans 
-                WHERE status = 'active' AND due_date < $1
-            """
-            newly_overdue = await self.bot.pool.fetch(newly_overdue_query, current_time)
-
-            for loan in newly_overdue:
-                # Update status to defaulted
-                update_query = "UPDATE user_loans SET status = 'defaulted' WHERE loan_id = $1"
-                await self.bot.pool.execute(update_query, loan['loan_id'])
-
-                self.logger.info(f"대출 ID {loan['loan_id']} (사용자: {loan['user_id']})가 'defaulted'로 변경되었습니다.")
-
-                # Update loan channel if exists
-                if loan['channel_id']:
-                    channel = self.bot.get_channel(loan['channel_id'])
-                    if channel:
-                        await self.update_loan_channel(channel, loan['loan_id'])
-
-                        # Send overdue notification in the channel
-                        overdue_embed = discord.Embed(
-                            title="🚨 대출 연체 알림",
-                            description="이 대출의 상환 기한이 지났습니다.",
-                            color=discord.Color.red(),
-                            timestamp=current_time
-                        )
-                        overdue_embed.add_field(
-                            name="⚠️ 적용된 제한사항",
-                            value="• 다른 사용자로부터 코인을 받을 수 없습니다\n"
-                                  "• 카지노 게임에 참여할 수 없습니다\n"
-                                  "• 일일 코인 수령만 가능합니다",
-                            inline=False
-                        )
-                        overdue_embed.add_field(
-                            name="📋 제한 해제 조건",
-                            value="모든 연체된 대출을 완전히 상환해야 합니다.",
-                            inline=False
-                        )
+            # Flip and collect the newly overdue loans atomically, so concurrent runs never notify twice
+            newly_overdue = await self.bot.pool.fetch("""
+                WITH defaulted AS (
+                    UPDATE user_loans SET status = 'defaulted'
+                    WHERE status = 'active' AND due_date <= $1
+                    RETURNING loan_id, user_id, guild_id, remaining_amount, channel_id, due_date
+                ), guild_stats AS (
+                    UPDATE loan_guild_stats s SET
+                        active_count = s.active_count - d.loans,
+                        defaulted_count = s.defaulted_count + d.loans,
+                        defaulted_total = s.defaulted_total + d.loans
+                    FROM (SELECT guild_id, COUNT(*) AS loans FROM defaulted GROUP BY guild_id) d
+                    WHERE s.guild_id = d.guild_id
+                )
+                SELECT * FROM defaulted
+            """, current_time)
+        except Exception as e:
+            self.logger.error(f"연체된 대출 확인 중 오류 발생: {e}")
+            return
 
-                        await channel.send(overdue_embed)
+        update_ms = (time.perf_counter() - started) * 1000
+        if not newly_overdue:
+            return
 
-                # Send DM notification to user about restrictions
-                user = self.bot.get_user(loan['user_id'])
-                if user:
-                    try:
-                        dm_embed = discord.Embed(
-                            title="🚨 대출 연체 - 계정 제한 적용",
-                            description=f"대출 상환 기한이 지나 계정에 제한이 적용되었습니다.",
-                            color=discord.Color.red(),
-                            timestamp=current_time
-                        )
-                        dm_embed.add_field(
-                            name="연체 대출 정보",
-                            value=f"대출 ID: {loan['loan_id']}\n남은 금액: {loan['remaining_amount']:,} 코인",
-                            inline=False
-                        )
-                        dm_embed.add_field(
-                            name="⚠️ 적용된 제한사항",
-                            value="• 다른 사용자로부터 코인을 받을 수 없습니다\n"
-                                  "• 카지노 게임에 참여할 수 없습니다\n"
-                                  "• 일일 코인 수령만 가능합니다",
-                            inline=False
-                        )
-                        dm_embed.add_field(
-                            name="📋 제한 해제 방법",
-                            value="연체된 모든 대출을 완전히 상환하면 제한이 자동으로 해제됩니다.",
-                            inline=False
-                        )
+        coins_cog = self.bot.get_cog('CoinsCog')
+        for loan in newly_overdue:
+            self.logger.info(f"대출 ID {loan['loan_id']} (사용자: {loan['user_id']})가 'defaulted'로 변경되었습니다.",
+                             extra={'guild_id': loan['guild_id']})
+            if coins_cog:
+                await coins_cog.set_loan_restriction(loan['user_id'], loan['guild_id'], loan['loan_id'],
+                                                     loan['remaining_amount'], loan['due_date'])
 
-                        await user.send(embed=dm_embed)
-                    except:
-                        pass  # Ignore if can't send DM
+        semaphore = asyncio.Semaphore(OVERDUE_NOTIFY_CONCURRENCY)
 
-        except Exception as e:
-            self.logger.error(f"연체된 대출 확인 중 오류 발생: {e}")
+        async def notify(loan):
+            async with semaphore:
+                await self.notify_overdue_loan(loan, current_time)
+
+        notify_started = time.perf_counter()
+        results = await asyncio.gather(*(notify(loan) for loan in newly_overdue), return_exceptions=True)
+        notify_ms = (time.perf_counter() - notify_started) * 1000
+
+        failed = [r for r in results if isinstance(r, Exception)]
+        for error in failed:
+            self.logger.error(f"연체 알림 전송 실패: {error}")
+
+        self.logger.info(
+            f"연체 처리 완료: {len(newly_overdue)}건 (UPDATE {update_ms:.1f}ms, "
+            f"알림 {notify_ms:.1f}ms, 실패 {len(failed)}건, 총 {(time.perf_counter() - started) * 1000:.1f}ms)"
+        )
+
+    async def notify_overdue_loan(self, loan, current_time: datetime):
+        """Refresh the loan channel and tell the borrower about the restrictions"""
+        # Update loan channel if exists
+        if loan['channel_id']:
+            channel = self.bot.get_channel(loan['channel_id'])
+            if channel:
+                await self.update_loan_channel(channel, loan['loan_id'])
+
+                # Send overdue notification in the channel
+                overdue_embed = discord.Embed(
+                    title="🚨 대출 연체 알림",
+                    description="이 대출의 상환 기한이 지났습니다.",
+                    color=discord.Color.red(),
+                    timestamp=current_time
+                )
+                overdue_embed.add_field(
+                    name="⚠️ 적용된 제한사항",
+                    value="• 다른 사용자로부터 코인을 받을 수 없습니다\n"
+                          "• 카지노 게임에 참여할 수 없습니다\n"
+                          "• 일일 코인 수령만 가능합니다",
+                    inline=False
+                )
+                overdue_embed.add_field(
+                    name="📋 제한 해제 조건",
+                    value="모든 연체된 대출을 완전히 상환해야 합니다.",
+                    inline=False
+                )
+
+                await channel.send(embed=overdue_embed)
+
+        # Send DM notification to user about restrictions
+        user = self.bot.get_user(loan['user_id'])
+        if user:
+            try:
+                dm_embed = discord.Embed(
+                    title="🚨 대출 연체 - 계정 제한 적용",
+                    description=f"대출 상환 기한이 지나 계정에 제한이 적용되었습니다.",
+                    color=discord.Color.red(),
+                    timestamp=current_time
+                )
+                dm_embed.add_field(
+                    name="연체 대출 정보",
+                    value=f"대출 ID: {loan['loan_id']}\n남은 금액: {loan['remaining_amount']:,} 코인",
+                    inline=False
+                )
+                dm_embed.add_field(
+                    name="⚠️ 적용된 제한사항",
+                    value="• 다른 사용자로부터 코인을 받을 수 없습니다\n"
+                          "• 카지노 게임에 참여할 수 없습니다\n"
+                          "• 일일 코인 수령만 가능합니다",
+                    inline=False
+                )
+                dm_embed.add_field(
+                    name="📋 제한 해제 방법",
+                    value="연체된 모든 대출을 완전히 상환하면 제한이 자동으로 해제됩니다.",
+                    inline=False
+                )
+
+                await user.send(embed=dm_embed)
+            except:
+                pass  # Ignore if can't send DM
 
     # Slash commands
     @app_commands.command(name="제한확인", description="현재 계정에 적용된 제한사항을 확인합니다.")
@@ -1670,13 +1901,8 @@ class LoanCog(commands.Cog):
             total_repayment = amount + int(amount * (interest / 100))
 
             # Insert loan record
-            query = """
-                INSERT INTO user_loans (user_id, guild_id, principal_amount, remaining_amount, interest_rate, due_date, status, channel_id)
-                VALUES ($1, $2, $3, $4, $5, $6, 'active', $7)
-                RETURNING loan_id
-            """
-            loan_record = await self.bot.pool.fetchrow(
-                query, user.id, interaction.guild_id, amount, total_repayment, interest, due_date, channel.id
+            loan_record = await self.create_loan_record(
+                user.id, interaction.guild_id, amount, total_repayment, interest, due_date, channel.id
             )
 
             if not loan_record:
@@ -1688,12 +1914,13 @@ class LoanCog(commands.Cog):
                                                 f"Loan issued by {interaction.user.display_name}")
 
             if not success:
-                await self.bot.pool.execute("DELETE FROM user_loans WHERE loan_id = $1", loan_record['loan_id'])
+                await self.delete_loan_record(loan_record['loan_id'])
                 await channel.delete()
                 return await interaction.followup.send("❌ 코인 지급에 실패했습니다. 대출이 취소되었습니다.", ephemeral=True)
 
             # Update loan channel
             await self.update_loan_channel(channel, loan_record['loan_id'])
+            await self.on_loan_issued(loan_record['loan_id'], user.id, interaction.guild_id, due_date)
 
             await interaction.followup.send(
                 f"✅ {user.mention}님에게 {amount:,} 코인 대출을 발행했습니다. 채널: {channel.mention}")
@@ -1944,51 +2171,80 @@ class LoanCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
 
         try:
-            query = """
-                SELECT loan_id, user_id, principal_amount, remaining_amount, interest_rate, status, due_date, issued_at, channel_id
-                FROM user_loans 
-                WHERE guild_id = $1 AND status IN ('active', 'defaulted')
-                ORDER BY issued_at DESC
-                LIMIT 20
-            """
-            loans = await self.bot.pool.fetch(query, interaction.guild.id)
+            guild = interaction.guild
+            loans, next_cursor = await self.fetch_loan_page(guild.id, None)
 
             if not loans:
                 return await interaction.followup.send("현재 활성 상태의 대출이 없습니다.", ephemeral=True)
 
-            embed = discord.Embed(
-                title=f"📋 {interaction.guild.name} 대출 목록",
-                color=discord.Color.blue(),
-                timestamp=datetime.now(timezone.utc)
+            view = KeysetPageView(
+                interaction.user.id,
+                lambda cursor: self.fetch_loan_page(guild.id, cursor),
+                lambda rows, page: self.render_loan_page(guild, rows, page),
+                next_cursor
             )
+            await interaction.followup.send(embed=self.render_loan_page(guild, loans, 1), view=view, ephemeral=True)
 
-            for loan in loans:
-                user = self.bot.get_user(loan['user_id'])
-                user_name = user.display_name if user else f"Unknown ({loan['user_id']})"
-                status_emoji = "🟢" if loan['status'] == 'active' else "🔴"
+        except Exception as e:
+            self.logger.error(f"대출 목록 조회 중 오류 발생: {e}")
+            await interaction.followup.send(f"❌ 대출 목록 조회 중 오류가 발생했습니다: {e}", ephemeral=True)
 
-                due_date = loan['due_date']
-                if due_date.tzinfo is None:
-                    due_date = due_date.replace(tzinfo=timezone.utc)
+    async def fetch_loan_page(self, guild_id: int, cursor):
+        """One page of open loans, newest first, seeking past the (issued_at, loan_id) cursor"""
+        columns = "loan_id, user_id, principal_amount, remaining_amount, interest_rate, status, due_date, issued_at, channel_id"
+        if cursor is None:
+            loans = await self.bot.pool.fetch(f"""
+                SELECT {columns}
+                FROM user_loans
+                WHERE guild_id = $1 AND status IN ('active', 'defaulted')
+                ORDER BY issued_at DESC, loan_id DESC
+                LIMIT $2
+            """, guild_id, LOAN_PAGE_SIZE + 1)
+        else:
+            loans = await self.bot.pool.fetch(f"""
+                SELECT {columns}
+                FROM user_loans
+                WHERE guild_id = $1 AND status IN ('active', 'defaulted')
+                AND (issued_at, loan_id) < ($3, $4)
+                ORDER BY issued_at DESC, loan_id DESC
+                LIMIT $2
+            """, guild_id, LOAN_PAGE_SIZE + 1, *cursor)
+
+        if len(loans) > LOAN_PAGE_SIZE:
+            loans = loans[:LOAN_PAGE_SIZE]
+            return loans, (loans[-1]['issued_at'], loans[-1]['loan_id'])
+        return loans, None
+
+    def render_loan_page(self, guild: discord.Guild, loans, page: int) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"📋 {guild.name} 대출 목록",
+            color=discord.Color.blue(),
+            timestamp=datetime.now(timezone.utc)
+        )
 
-                channel_link = ""
-                if loan['channel_id']:
-                    channel = self.bot.get_channel(loan['channel_id'])
-                    if channel:
-                        channel_link = f"\n🔗 {channel.mention}"
+        for loan in loans:
+            user = self.bot.get_user(loan['user_id'])
+            user_name = user.display_name if user else f"Unknown ({loan['user_id']})"
+            status_emoji = "🟢" if loan['status'] == 'active' else "🔴"
 
-                embed.add_field(
-                    name=f"{status_emoji} {user_name} (ID: {loan['loan_id']})",
-                    value=f"원금: {loan['principal_amount']:,}\n남은액: {loan['remaining_amount']:,}\n기한: <t:{int(due_date.timestamp())}:R>{channel_link}",
-                    inline=True
-                )
+            due_date = loan['due_date']
+            if due_date.tzinfo is None:
+                due_date = due_date.replace(tzinfo=timezone.utc)
 
-            embed.set_footer(text="최근 20개의 대출만 표시됩니다.")
-            await interaction.followup.send(embed=embed, ephemeral=True)
+            channel_link = ""
+            if loan['channel_id']:
+                channel = self.bot.get_channel(loan['channel_id'])
+                if channel:
+                    channel_link = f"\n🔗 {channel.mention}"
 
-        except Exception as e:
-            self.logger.error(f"대출 목록 조회 중 오류 발생: {e}")
-            await interaction.followup.send(f"❌ 대출 목록 조회 중 오류가 발생했습니다: {e}", ephemeral=True)
+            embed.add_field(
+                name=f"{status_emoji} {user_name} (ID: {loan['loan_id']})",
+                value=f"원금: {loan['principal_amount']:,}\n남은액: {loan['remaining_amount']:,}\n기한: <t:{int(due_date.timestamp())}:R>{channel_link}",
+                inline=True
+            )
+
+        embed.set_footer(text=f"{page}페이지 · 페이지당 {LOAN_PAGE_SIZE}건 (최신순)")
+        return embed
 
     @app_commands.command(name="신청목록", description="대출 신청 목록을 확인합니다. (관리자 전용)")
     async def list_requests(self, interaction: discord.Interaction):
@@ -1999,49 +2255,78 @@ class LoanCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
 
         try:
-            query = """
-                SELECT request_id, user_id, amount, interest_rate, days_due, reason, status, requested_at
-                FROM loan_requests 
-                WHERE guild_id = $1 AND status IN ('pending', 'negotiating')
-                ORDER BY requested_at DESC
-                LIMIT 10
-            """
-            requests = await self.bot.pool.fetch(query, interaction.guild.id)
+            guild_id = interaction.guild.id
+            requests, next_cursor = await self.fetch_request_page(guild_id, None)
 
             if not requests:
                 return await interaction.followup.send("현재 처리 중인 대출 신청이 없습니다.", ephemeral=True)
 
-            embed = discord.Embed(
-                title=f"📋 대출 신청 목록",
-                color=discord.Color.orange(),
-                timestamp=datetime.now(timezone.utc)
+            view = KeysetPageView(
+                interaction.user.id,
+                lambda cursor: self.fetch_request_page(guild_id, cursor),
+                self.render_request_page,
+                next_cursor
             )
+            await interaction.followup.send(embed=self.render_request_page(requests, 1), view=view, ephemeral=True)
+
+        except Exception as e:
+            self.logger.error(f"신청 목록 조회 중 오류 발생: {e}")
+            await interaction.followup.send(f"❌ 신청 목록 조회 중 오류가 발생했습니다: {e}", ephemeral=True)
 
-            for req in requests:
-                user = self.bot.get_user(req['user_id'])
-                user_name = user.display_name if user else f"Unknown ({req['user_id']})"
-                status_emoji = "⏳ 검토중" if req['status'] == 'pending' else "💬 협상중"
+    async def fetch_request_page(self, guild_id: int, cursor):
+        """One page of open loan requests, newest first, seeking past the (requested_at, request_id) cursor"""
+        columns = "request_id, user_id, amount, interest_rate, days_due, reason, status, requested_at"
+        if cursor is None:
+            requests = await self.bot.pool.fetch(f"""
+                SELECT {columns}
+                FROM loan_requests
+                WHERE guild_id = $1 AND status IN ('pending', 'negotiating')
+                ORDER BY requested_at DESC, request_id DESC
+                LIMIT $2
+            """, guild_id, REQUEST_PAGE_SIZE + 1)
+        else:
+            requests = await self.bot.pool.fetch(f"""
+                SELECT {columns}
+                FROM loan_requests
+                WHERE guild_id = $1 AND status IN ('pending', 'negotiating')
+                AND (requested_at, request_id) < ($3, $4)
+                ORDER BY requested_at DESC, request_id DESC
+                LIMIT $2
+            """, guild_id, REQUEST_PAGE_SIZE + 1, *cursor)
+
+        if len(requests) > REQUEST_PAGE_SIZE:
+            requests = requests[:REQUEST_PAGE_SIZE]
+            return requests, (requests[-1]['requested_at'], requests[-1]['request_id'])
+        return requests, None
+
+    def render_request_page(self, requests, page: int) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"📋 대출 신청 목록",
+            color=discord.Color.orange(),
+            timestamp=datetime.now(timezone.utc)
+        )
 
-                total_repayment = req['amount'] + int(req['amount'] * (req['interest_rate'] / 100))
+        for req in requests:
+            user = self.bot.get_user(req['user_id'])
+            user_name = user.display_name if user else f"Unknown ({req['user_id']})"
+            status_emoji = "⏳ 검토중" if req['status'] == 'pending' else "💬 협상중"
 
-                embed.add_field(
-                    name=f"{status_emoji} {user_name} (ID: {req['request_id']})",
-                    value=f"**금액:** {req['amount']:,} 코인\n**이자율:** {req['interest_rate']}%\n**기간:** {req['days_due']}일\n**총액:** {total_repayment:,} 코인\n**사유:** {req['reason'][:50]}{'...' if len(req['reason']) > 50 else ''}",
-                    inline=False
-                )
+            total_repayment = req['amount'] + int(req['amount'] * (req['interest_rate'] / 100))
 
             embed.add_field(
-                name="🔧 명령어 안내",
-                value="• 승인: `/대출승인 request_id:번호`\n• 역제안: `/대출역제안 request_id:번호`\n• 거부: `/대출거부 request_id:번호`",
+                name=f"{status_emoji} {user_name} (ID: {req['request_id']})",
+                value=f"**금액:** {req['amount']:,} 코인\n**이자율:** {req['interest_rate']}%\n**기간:** {req['days_due']}일\n**총액:** {total_repayment:,} 코인\n**사유:** {req['reason'][:50]}{'...' if len(req['reason']) > 50 else ''}",
                 inline=False
             )
 
-            embed.set_footer(text="최근 10개의 신청만 표시됩니다.")
-            await interaction.followup.send(embed=embed, ephemeral=True)
+        embed.add_field(
+            name="🔧 명령어 안내",
+            value="• 승인: `/대출승인 request_id:번호`\n• 역제안: `/대출역제안 request_id:번호`\n• 거부: `/대출거부 request_id:번호`",
+            inline=False
+        )
 
-        except Exception as e:
-            self.logger.error(f"신청 목록 조회 중 오류 발생: {e}")
-            await interaction.followup.send(f"❌ 신청 목록 조회 중 오류가 발생했습니다: {e}", ephemeral=True)
+        embed.set_footer(text=f"{page}페이지 · 페이지당 {REQUEST_PAGE_SIZE}건 (최신순)")
+        return embed
 
     @app_commands.command(name="대출통계", description="대출 시스템 통계를 확인합니다. (관리자 전용)")
     async def loan_statistics(self, interaction: discord.Interaction):
@@ -2052,21 +2337,21 @@ class LoanCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
 
         try:
-            # Get various statistics
-            stats_queries = {
-                'active_loans': "SELECT COUNT(*) FROM user_loans WHERE guild_id = $1 AND status = 'active'",
-                'defaulted_loans': "SELECT COUNT(*) FROM user_loans WHERE guild_id = $1 AND status = 'defaulted'",
-                'completed_loans': "SELECT COUNT(*) FROM user_loans WHERE guild_id = $1 AND status = 'paid'",
-                'pending_requests': "SELECT COUNT(*) FROM loan_requests WHERE guild_id = $1 AND status = 'pending'",
-                'negotiating_requests': "SELECT COUNT(*) FROM loan_requests WHERE guild_id = $1 AND status = 'negotiating'",
-                'total_active_amount': "SELECT COALESCE(SUM(remaining_amount), 0) FROM user_loans WHERE guild_id = $1 AND status = 'active'",
-                'total_principal_issued': "SELECT COALESCE(SUM(principal_amount), 0) FROM user_loans WHERE guild_id = $1",
-            }
+            # Loan figures come from the incrementally maintained aggregate row
+            loan_stats = await self.bot.pool.fetchrow(
+                "SELECT * FROM loan_guild_stats WHERE guild_id = $1", interaction.guild.id
+            )
+            request_stats = await self.bot.pool.fetchrow("""
+                SELECT COUNT(*) FILTER (WHERE status = 'pending') AS pending_requests,
+                       COUNT(*) FILTER (WHERE status = 'negotiating') AS negotiating_requests
+                FROM loan_requests
+                WHERE guild_id = $1 AND status IN ('pending', 'negotiating')
+            """, interaction.guild.id)
 
-            stats = {}
-            for key, query in stats_queries.items():
-                result = await self.bot.pool.fetchval(query, interaction.guild.id)
-                stats[key] = result
+            stats = dict(loan_stats) if loan_stats else {}
+            stats.update(request_stats)
+            issued_count = stats.get('issued_count', 0)
+            default_rate = stats.get('defaulted_total', 0) / issued_count * 100 if issued_count else 0.0
 
             embed = discord.Embed(
                 title=f"📊 {interaction.guild.name} 대출 시스템 통계",
@@ -2077,7 +2362,7 @@ class LoanCog(commands.Cog):
             # Current loans status
             embed.add_field(
                 name="🏦 현재 대출 현황",
-                value=f"**활성 대출:** {stats['active_loans']}건\n**연체 대출:** {stats['defaulted_loans']}건\n**완료 대출:** {stats['completed_loans']}건",
+                value=f"**활성 대출:** {stats.get('active_count', 0)}건\n**연체 대출:** {stats.get('defaulted_count', 0)}건\n**완료 대출:** {stats.get('paid_count', 0)}건\n**연체율:** {default_rate:.1f}%",
                 inline=True
             )
 
@@ -2091,17 +2376,19 @@ class LoanCog(commands.Cog):
             # Financial stats
             embed.add_field(
                 name="💰 금액 통계",
-                value=f"**총 발행액:** {stats['total_principal_issued']:,} 코인\n**현재 미수금:** {stats['total_active_amount']:,} 코인",
+                value=f"**총 발행액:** {stats.get('principal_issued', 0):,} 코인\n"
+                      f"**미상환 원금:** {stats.get('outstanding_principal', 0):,} 코인\n"
+                      f"**미상환 이자:** {stats.get('outstanding_interest', 0):,} 코인\n"
+                      f"**현재 미수금:** {stats.get('outstanding_amount', 0):,} 코인",
                 inline=True
             )
 
             # Get top borrowers
             top_borrowers_query = """
-                SELECT user_id, COUNT(*) as loan_count, SUM(principal_amount) as total_borrowed
-                FROM user_loans 
-                WHERE guild_id = $1 
-                GROUP BY user_id 
-                ORDER BY total_borrowed DESC 
+                SELECT user_id, loan_count, total_borrowed
+                FROM loan_borrower_stats
+                WHERE guild_id = $1 AND loan_count > 0
+                ORDER BY total_borrowed DESC
                 LIMIT 5
             """
             top_borrowers = await self.bot.pool.fetch(top_borrowers_query, interaction.guild.id)
@@ -2132,19 +2419,14 @@ class LoanCog(commands.Cog):
         This is called after every loan payment.
         """
         try:
-            # Check if user still has any overdue loans
-            current_time = datetime.now(timezone.utc)
-
-            overdue_check_query = """
-                SELECT COUNT(*) FROM user_loans 
-                WHERE user_id = $1 AND guild_id = $2 
-                AND status IN ('active', 'defaulted') 
-                AND due_date < $3
-            """
-
-            overdue_count = await self.bot.pool.fetchval(overdue_check_query, user_id, guild_id, current_time)
+            # Check if user still has any overdue loans, refreshing the cached restriction state
+            coins_cog = self.bot.get_cog('CoinsCog')
+            if coins_cog:
+                still_restricted = await coins_cog.refresh_loan_restriction(user_id, guild_id)
+            else:
+                still_restricted = not await self.check_if_restrictions_lifted(user_id, guild_id)
 
-            if overdue_count == 0:
+            if not still_restricted:
                 # User no longer has overdue loans, log the restriction lift
                 self.logger.info(
                     f"User {user_id} in guild {guild_id} is no longer restricted - all overdue loans resolved",
@@ -1,6 +1,6 @@
 # cogs/shop_system.py
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import asyncio
 from datetime import datetime, timezone, timedelta
@@ -10,6 +10,7 @@ import os
 
 from utils.logger import get_logger
 from utils import config
+from cogs.scheduler import get_scheduler
 ######
 ######
 ######
@@ -236,8 +237,12 @@ class ShopSystemCog(commands.Cog):
                 VALUES ($1, $2, $3, $4, $5, $6)
             """, user_id, guild_id, item_id, item['price'], duration_hours, expires_at)
 
-            # Track active purchase
+            # Track active purchase and expire it exactly when it runs out
             self.active_purchases[user_id] = expires_at
+            scheduler = get_scheduler(self.bot)
+            if scheduler:
+                await scheduler.schedule('shop_boost_expire', f"shop_boost_expire:{user_id}", expires_at,
+                                         {'user_id': user_id}, guild_id)
 
             self.logger.info(f"Recorded purchase: {item_id} for user {user_id}", extra={'guild_id': guild_id})
 
@@ -293,47 +298,62 @@ class ShopSystemCog(commands.Cog):
         # Setup shop message with cleanup (force new message)
         await self.setup_shop_message(force_new=True)
 
-        # Load active purchases
+        # Load active purchases and schedule their expiry
+        scheduler = get_scheduler(self.bot)
+        if scheduler:
+            scheduler.register_handler('shop_boost_expire', self.run_scheduled_expiry)
         await self.load_active_purchases()
 
-        # Start expiry check task
-        if not self.check_expired_purchases.is_running():
-            self.check_expired_purchases.start()
-
         self.logger.info("Shop system reloaded - cleaned up old messages and created fresh shop interface")
 
     async def load_active_purchases(self):
         """Load active purchases from database"""
         try:
+            # Boosters that ran out while the bot was offline are loaded too, so their expiry runs right away
             query = """
-                SELECT user_id, expires_at
+                SELECT user_id, MIN(guild_id) AS guild_id, MAX(expires_at) AS expires_at
                 FROM shop_purchases
-                WHERE status = 'active' AND expires_at > CURRENT_TIMESTAMP
+                WHERE status = 'active' AND expires_at IS NOT NULL
+                GROUP BY user_id
             """
             records = await self.bot.pool.fetch(query)
+            now = datetime.now(timezone.utc)
+            jobs = []
 
             for record in records:
-                self.active_purchases[record['user_id']] = record['expires_at']
+                # expires_at is stored as a UTC timestamp without time zone
+                expires_at = record['expires_at'].replace(tzinfo=timezone.utc)
+                self.active_purchases[record['user_id']] = expires_at
+                jobs.append((f"shop_boost_expire:{record['user_id']}", expires_at,
+                             {'user_id': record['user_id']}, record['guild_id']))
 
                 # Update XP boost tracking
                 xp_cog = self.bot.get_cog('XPSystemCog')
-                if xp_cog:
+                if xp_cog and expires_at > now:
                     xp_cog.xp_boost_users.add(record['user_id'])
 
+            scheduler = get_scheduler(self.bot)
+            if scheduler:
+                await scheduler.schedule_many('shop_boost_expire', jobs)
+
             self.logger.info(f"Loaded {len(records)} active purchases")
 
         except Exception as e:
             self.logger.error(f"Error loading active purchases: {e}")
 
-    @tasks.loop(minutes=5)
-    async def check_expired_purchases(self):
-        """Check for expired purchases and remove boosts"""
+    async def run_scheduled_expiry(self, payload: dict):
+        """Expire a user's booster when its scheduled job comes due"""
+        await self.expire_purchases([payload['user_id']])
+
+    async def expire_purchases(self, user_ids: List[int]):
+        """Expire the given users' purchases that have run out and remove boosts"""
         try:
             current_time = datetime.now(timezone.utc)
             expired_users = []
 
-            for user_id, expiry_time in list(self.active_purchases.items()):
-                if current_time >= expiry_time:
+            for user_id in user_ids:
+                expiry_time = self.active_purchases.get(user_id)
+                if expiry_time and current_time >= expiry_time:
                     expired_users.append(user_id)
                     del self.active_purchases[user_id]
 
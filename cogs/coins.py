@@ -1,5 +1,6 @@
 # cogs/coins.py
 from typing import Optional
+from collections import OrderedDict
 
 import discord
 from discord.ext import commands, tasks
@@ -10,6 +11,7 @@ import json
 import os
 from datetime import datetime, timezone, timedelta
 import pytz
+import asyncpg
 
 from utils.logger import get_logger
 from utils import config
@@ -99,7 +101,7 @@ class CoinsView(discord.ui.View):
                     """, user_id, guild_id, starting_coins, "daily_claim", "Daily coin claim")
 
                 # Trigger leaderboard update
-                self.bot.loop.create_task(coins_cog.schedule_leaderboard_update(guild_id))
+                coins_cog.request_leaderboard_update(guild_id)
 
                 embed = discord.Embed(
                     title="💰 일일 코인 지급!",
@@ -242,6 +244,15 @@ class CoinsCog(commands.Cog):
         self.update_delay = 3  # seconds to debounce updates
         self.last_leaderboard_cache = {}  # guild_id: data
 
+        # Recently settled casino rounds, so double-clicks never reach the database
+        self.settled_rounds = OrderedDict()  # round_id: True
+        self.settled_rounds_max = 2048
+
+        # Users with overdue loans, loaded once and kept current by LoanCog, so gives and plays never query loans
+        self.loan_restrictions = {}  # guild_id: {user_id: {'loan_id', 'remaining_amount', 'due_date'}}
+        self.loan_restrictions_loaded = False
+        self.loan_restrictions_lock = asyncio.Lock()
+
         # Message ID persistence per guild
         self.message_ids_file = "data/guild_message_ids.json"
 
@@ -404,7 +415,18 @@ class CoinsCog(commands.Cog):
             return
 
         self.pending_leaderboard_updates[guild_id] = True
+        await self._run_leaderboard_update(guild_id)
+
+    def request_leaderboard_update(self, guild_id: int):
+        """Coalesced trigger: spawns at most one pending update task per guild"""
+        if self.pending_leaderboard_updates.get(guild_id, False):
+            return
+
+        self.pending_leaderboard_updates[guild_id] = True
+        self.bot.loop.create_task(self._run_leaderboard_update(guild_id))
 
+    async def _run_leaderboard_update(self, guild_id: int):
+        """Debounced leaderboard refresh; clears the pending flag when done"""
         # Wait for debounce period
         await asyncio.sleep(self.update_delay)
 
@@ -550,6 +572,18 @@ class CoinsCog(commands.Cog):
                 )
             """)
 
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS casino_rounds (
+                    round_id VARCHAR(64) PRIMARY KEY,
+                    user_id BIGINT NOT NULL,
+                    guild_id BIGINT NOT NULL,
+                    game VARCHAR(32) NOT NULL,
+                    stake INTEGER NOT NULL,
+                    payout INTEGER NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
             # Create indexes for better performance
             await self.bot.pool.execute("""
                 CREATE INDEX IF NOT EXISTS idx_user_coins_guild_coins ON user_coins(guild_id, coins DESC);
@@ -563,6 +597,10 @@ class CoinsCog(commands.Cog):
                 CREATE INDEX IF NOT EXISTS idx_coin_transactions_guild_type ON coin_transactions(guild_id, transaction_type);
             """)
 
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_casino_rounds_user_guild ON casino_rounds(user_id, guild_id, created_at DESC);
+            """)
+
             self.logger.info("✅ 코인 데이터베이스 테이블이 준비되었습니다.")
         except Exception as e:
             # FIX: This is a global setup, so no specific guild_id to add to log
@@ -613,10 +651,10 @@ class CoinsCog(commands.Cog):
             """, user_id, guild_id, amount, transaction_type, description)
 
             # Trigger real-time leaderboard update
-            self.bot.loop.create_task(self.schedule_leaderboard_update(guild_id))
+            self.request_leaderboard_update(guild_id)
 
             # FIX: Add guild_id to log message
-            self.logger.info(f"Added {amount} coins to user {user_id} in guild {guild_id}: {description}", extra={'guild_id': guild_id})
+            self.logger.info("Added %s coins to user %s in guild %s: %s", amount, user_id, guild_id, description, extra={'guild_id': guild_id})
             return True
         except Exception as e:
             # FIX: Add guild_id to log message
@@ -654,16 +692,83 @@ class CoinsCog(commands.Cog):
             """, user_id, guild_id, -amount, transaction_type, description)
 
             # Trigger real-time leaderboard update
-            self.bot.loop.create_task(self.schedule_leaderboard_update(guild_id))
+            self.request_leaderboard_update(guild_id)
 
             # FIX: Add guild_id to log message
-            self.logger.info(f"Removed {amount} coins from user {user_id} in guild {guild_id}: {description}", extra={'guild_id': guild_id})
+            self.logger.info("Removed %s coins from user %s in guild %s: %s", amount, user_id, guild_id, description, extra={'guild_id': guild_id})
             return True
         except Exception as e:
             # FIX: Add guild_id to log message
             self.logger.error(f"Error removing coins from {user_id} in guild {guild_id}: {e}", extra={'guild_id': guild_id})
             return False
 
+    async def settle(self, round_id: str, user_id: int, guild_id: int, stake: int, payout: int, game: str,
+                     description: str = "") -> bool:
+        """Settle one casino round in a single statement: debit stake, credit payout, record the round.
+
+        round_id is the idempotency key. Settling the same round again is a no-op that
+        returns True, so retries and double-clicked buttons never pay twice. Returns False
+        if the balance does not cover the stake or the database call fails.
+        """
+        if round_id in self.settled_rounds:
+            return True
+
+        try:
+            balance = await self.bot.pool.fetchval("""
+                WITH debit AS (
+                    UPDATE user_coins
+                    SET coins = coins - $4 + $5,
+                        total_spent = total_spent + $4,
+                        total_earned = total_earned + $5
+                    WHERE user_id = $2 AND guild_id = $3 AND coins >= $4
+                      AND NOT EXISTS (SELECT 1 FROM casino_rounds WHERE round_id = $1)
+                    RETURNING coins
+                ), round AS (
+                    INSERT INTO casino_rounds (round_id, user_id, guild_id, game, stake, payout)
+                    SELECT $1, $2, $3, $6::varchar, $4, $5 FROM debit
+                ), ledger AS (
+                    INSERT INTO coin_transactions (user_id, guild_id, amount, transaction_type, description)
+                    SELECT $2, $3, t.amount, t.transaction_type, $7::text
+                    FROM debit, (VALUES (-$4::int, $6::varchar || '_bet'), ($5::int, $6::varchar || '_win'))
+                        AS t(amount, transaction_type)
+                    WHERE t.amount <> 0
+                )
+                SELECT coins FROM debit
+            """, round_id, user_id, guild_id, stake, payout, game, description)
+        except asyncpg.UniqueViolationError:
+            # A concurrent settle of the same round won the race
+            self._remember_round(round_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error settling {game} round {round_id} for {user_id} in guild {guild_id}: {e}",
+                              extra={'guild_id': guild_id})
+            return False
+
+        if balance is None:
+            # Either the round was already recorded or the stake was not covered
+            already_settled = await self.bot.pool.fetchval(
+                "SELECT 1 FROM casino_rounds WHERE round_id = $1", round_id
+            )
+            if already_settled:
+                self._remember_round(round_id)
+                return True
+            return False
+
+        self._remember_round(round_id)
+        if stake or payout:
+            self.request_leaderboard_update(guild_id)
+
+        self.logger.info(f"Settled {game} round {round_id} for user {user_id} in guild {guild_id}: "
+                         f"stake {stake}, payout {payout}", extra={'guild_id': guild_id})
+        return True
+
+    def _remember_round(self, round_id: str):
+        """Add a round to the in-memory dedupe cache, evicting the oldest entries"""
+        self.settled_rounds[round_id] = True
+        self.settled_rounds.move_to_end(round_id)
+        while len(self.settled_rounds) > self.settled_rounds_max:
+            self.settled_rounds.popitem(last=False)
+
     # Keep the original scheduled task as a backup/maintenance function
     @tasks.loop(hours=1)  # Reduced frequency since we have real-time updates
     async def maintenance_leaderboard_update(self):
@@ -1046,7 +1151,7 @@ class CoinsCog(commands.Cog):
             """, user.id, guild_id, difference, "admin_set", f"Admin set by {interaction.user.display_name}: {reason}")
 
             # Trigger leaderboard update
-            self.bot.loop.create_task(self.schedule_leaderboard_update(guild_id))
+            self.request_leaderboard_update(guild_id)
 
             await interaction.followup.send(
                 f"✅ {user.mention}님의 코인을 {amount:,} 코인으로 설정했습니다.\n"
@@ -1203,26 +1308,84 @@ class CoinsCog(commands.Cog):
         else:
             await interaction.followup.send("ℹ️ 변경 사항이 없어 설정을 업데이트하지 않았습니다.")
 
+    async def load_loan_restrictions(self):
+        """Load every user with an overdue loan into the restriction cache (only the first call queries)"""
+        async with self.loan_restrictions_lock:
+            if self.loan_restrictions_loaded:
+                return
+
+            try:
+                rows = await self.bot.pool.fetch("""
+                    SELECT DISTINCT ON (guild_id, user_id) guild_id, user_id, loan_id, remaining_amount, due_date
+                    FROM user_loans
+                    WHERE status IN ('active', 'defaulted') AND due_date < NOW()
+                    ORDER BY guild_id, user_id, due_date ASC
+                """)
+            except asyncpg.UndefinedTableError:
+                rows = []  # Loan system has never run, so nobody is restricted
+
+            restrictions = {}
+            for row in rows:
+                restrictions.setdefault(row['guild_id'], {})[row['user_id']] = {
+                    'loan_id': row['loan_id'],
+                    'remaining_amount': row['remaining_amount'],
+                    'due_date': row['due_date']
+                }
+
+            self.loan_restrictions = restrictions
+            self.loan_restrictions_loaded = True
+            self.logger.info(f"Loaded loan restrictions for {len(rows)} user(s)", extra={'guild_id': None})
+
+    async def set_loan_restriction(self, user_id: int, guild_id: int, loan_id: int, remaining_amount: int,
+                                   due_date: datetime):
+        """Mark a user as restricted by an overdue loan"""
+        await self.load_loan_restrictions()
+        self.loan_restrictions.setdefault(guild_id, {})[user_id] = {
+            'loan_id': loan_id,
+            'remaining_amount': remaining_amount,
+            'due_date': due_date
+        }
+
+    async def clear_loan_restriction(self, user_id: int, guild_id: int):
+        """Lift a user's loan restriction"""
+        await self.load_loan_restrictions()
+        guild_restrictions = self.loan_restrictions.get(guild_id)
+        if guild_restrictions:
+            guild_restrictions.pop(user_id, None)
+
+    async def refresh_loan_restriction(self, user_id: int, guild_id: int) -> bool:
+        """Re-read one user's overdue loans into the cache after a loan changes. Returns True if still restricted."""
+        overdue_loan = await self.bot.pool.fetchrow("""
+            SELECT loan_id, remaining_amount, due_date
+            FROM user_loans
+            WHERE user_id = $1 AND guild_id = $2
+            AND status IN ('active', 'defaulted')
+            AND due_date < NOW()
+            ORDER BY due_date ASC
+            LIMIT 1
+        """, user_id, guild_id)
+
+        if overdue_loan:
+            await self.set_loan_restriction(user_id, guild_id, overdue_loan['loan_id'],
+                                            overdue_loan['remaining_amount'], overdue_loan['due_date'])
+            return True
+
+        await self.clear_loan_restriction(user_id, guild_id)
+        return False
+
+    async def get_loan_restriction(self, user_id: int, guild_id: int) -> Optional[dict]:
+        """Cached overdue loan info for a user, or None if unrestricted"""
+        if not self.loan_restrictions_loaded:
+            await self.load_loan_restrictions()
+        return self.loan_restrictions.get(guild_id, {}).get(user_id)
+
     async def check_user_loan_restrictions(self, user_id: int, guild_id: int) -> dict:
         """
         Check if user has loan restrictions that prevent them from receiving coins or gambling.
         Returns a dict with restriction info.
         """
         try:
-            # Check for overdue loans
-            current_time = datetime.now(timezone.utc)
-
-            overdue_loan_query = """
-                SELECT loan_id, remaining_amount, due_date 
-                FROM user_loans 
-                WHERE user_id = $1 AND guild_id = $2 
-                AND status IN ('active', 'defaulted') 
-                AND due_date < $3
-                ORDER BY due_date ASC
-                LIMIT 1
-            """
-
-            overdue_loan = await self.bot.pool.fetchrow(overdue_loan_query, user_id, guild_id, current_time)
+            overdue_loan = await self.get_loan_restriction(user_id, guild_id)
 
             if overdue_loan:
                 return {
@@ -0,0 +1,271 @@
+# cogs/game_sessions.py - Persistent casino game session registry with bet escrow
+from discord.ext import commands
+import json
+import uuid
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+
+# A restorer receives the stored session row and its escrow ({user_id: amount})
+# and returns True if it managed to resume the game in Discord.
+SessionRestorer = Callable[[dict, Dict[int, int]], Awaitable[bool]]
+
+
+class GameSessionCog(commands.Cog):
+    """Registry of open casino game sessions and their escrowed stakes.
+
+    Games that take a bet up front and settle later (blackjack, minesweeper, hold'em,
+    bingo, card draw, crash) open a session when the bet is taken, checkpoint their
+    state at decision points, and close the session once paid out. Any session still
+    open when the bot starts was interrupted by a restart; it is either handed to the
+    game's registered restorer or its escrow is refunded in one bulk transaction.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.logger = get_logger("게임 세션")
+        self.restorers: Dict[str, SessionRestorer] = {}
+
+        # The boot id lives on the bot so it survives reloads of this cog but not a
+        # process restart. Recovery only touches sessions from earlier boots.
+        if not getattr(bot, 'game_session_boot_id', None):
+            bot.game_session_boot_id = uuid.uuid4().hex
+        self.boot_id = bot.game_session_boot_id
+
+        self.logger.info("게임 세션 레지스트리가 초기화되었습니다.")
+        self.bot.loop.create_task(self.wait_and_recover())
+
+    async def wait_and_recover(self):
+        """Wait for bot to be ready, prepare tables and recover interrupted sessions"""
+        await self.bot.wait_until_ready()
+        if not self.bot.pool:
+            self.logger.warning("데이터베이스가 없어 게임 세션 복구를 건너뜁니다.")
+            return
+        await self.setup_database()
+        await self.recover_sessions()
+
+    async def setup_database(self):
+        """Create session and escrow tables"""
+        try:
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS casino_sessions (
+                    session_id VARCHAR(32) PRIMARY KEY,
+                    guild_id BIGINT NOT NULL,
+                    channel_id BIGINT,
+                    game_type VARCHAR(32) NOT NULL,
+                    boot_id VARCHAR(32) NOT NULL,
+                    state JSONB,
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    updated_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS casino_session_stakes (
+                    session_id VARCHAR(32) REFERENCES casino_sessions(session_id) ON DELETE CASCADE,
+                    user_id BIGINT NOT NULL,
+                    guild_id BIGINT NOT NULL,
+                    amount INTEGER NOT NULL,
+                    PRIMARY KEY (session_id, user_id)
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_casino_sessions_boot ON casino_sessions(boot_id);
+            """)
+
+            self.logger.info("✅ 게임 세션 테이블이 준비되었습니다.")
+        except Exception as e:
+            self.logger.error(f"❌ 게임 세션 테이블 설정 실패: {e}")
+
+    def register_restorer(self, game_type: str, restorer: SessionRestorer):
+        """Register a coroutine that can resume interrupted sessions of a game type"""
+        self.restorers[game_type] = restorer
+
+    async def open_session(self, game_type: str, guild_id: int, channel_id: Optional[int] = None,
+                           stakes: Optional[Dict[int, int]] = None, state: Optional[dict] = None) -> Optional[str]:
+        """Record a new session with its initial escrowed stakes. Returns the session id."""
+        if not self.bot.pool:
+            return None
+
+        session_id = uuid.uuid4().hex
+        try:
+            async with self.bot.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute("""
+                        INSERT INTO casino_sessions (session_id, guild_id, channel_id, game_type, boot_id, state)
+                        VALUES ($1, $2, $3, $4, $5, $6)
+                    """, session_id, guild_id, channel_id, game_type, self.boot_id,
+                        json.dumps(state) if state is not None else None)
+
+                    if stakes:
+                        await conn.executemany("""
+                            INSERT INTO casino_session_stakes (session_id, user_id, guild_id, amount)
+                            VALUES ($1, $2, $3, $4)
+                        """, [(session_id, user_id, guild_id, amount) for user_id, amount in stakes.items()])
+            return session_id
+        except Exception as e:
+            self.logger.error(f"Error opening {game_type} session in guild {guild_id}: {e}", extra={'guild_id': guild_id})
+            return None
+
+    async def add_stake(self, session_id: Optional[str], user_id: int, guild_id: int, amount: int):
+        """Add to a player's escrowed stake (joins, double downs, splits, insurance)"""
+        if not session_id or not self.bot.pool:
+            return
+        try:
+            await self.bot.pool.execute("""
+                INSERT INTO casino_session_stakes (session_id, user_id, guild_id, amount)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (session_id, user_id)
+                DO UPDATE SET amount = casino_session_stakes.amount + EXCLUDED.amount
+            """, session_id, user_id, guild_id, amount)
+        except Exception as e:
+            self.logger.error(f"Error adding stake to session {session_id}: {e}", extra={'guild_id': guild_id})
+
+    async def release_stake(self, session_id: Optional[str], user_id: int):
+        """Drop a player's escrow once it has been refunded or settled individually"""
+        if not session_id or not self.bot.pool:
+            return
+        try:
+            await self.bot.pool.execute(
+                "DELETE FROM casino_session_stakes WHERE session_id = $1 AND user_id = $2",
+                session_id, user_id
+            )
+        except Exception as e:
+            self.logger.error(f"Error releasing stake in session {session_id}: {e}")
+
+    async def checkpoint(self, session_id: Optional[str], state: dict):
+        """Persist the game state at a decision point"""
+        if not session_id or not self.bot.pool:
+            return
+        try:
+            await self.bot.pool.execute("""
+                UPDATE casino_sessions SET state = $2, updated_at = NOW()
+                WHERE session_id = $1
+            """, session_id, json.dumps(state))
+        except Exception as e:
+            self.logger.error(f"Error checkpointing session {session_id}: {e}")
+
+    async def close_session(self, session_id: Optional[str]):
+        """Remove a settled session together with its escrow"""
+        if not session_id or not self.bot.pool:
+            return
+        try:
+            await self.bot.pool.execute("DELETE FROM casino_sessions WHERE session_id = $1", session_id)
+        except Exception as e:
+            self.logger.error(f"Error closing session {session_id}: {e}")
+
+    async def recover_sessions(self):
+        """Resume or refund every session left open by a previous boot"""
+        try:
+            sessions = await self.bot.pool.fetch("""
+                SELECT session_id, guild_id, channel_id, game_type, state
+                FROM casino_sessions WHERE boot_id <> $1
+            """, self.boot_id)
+            if not sessions:
+                return
+
+            stake_rows = await self.bot.pool.fetch("""
+                SELECT session_id, user_id, amount FROM casino_session_stakes
+                WHERE session_id = ANY($1::varchar[])
+            """, [s['session_id'] for s in sessions])
+        except Exception as e:
+            self.logger.error(f"Error loading interrupted sessions: {e}")
+            return
+
+        stakes_by_session: Dict[str, Dict[int, int]] = {}
+        for row in stake_rows:
+            stakes_by_session.setdefault(row['session_id'], {})[row['user_id']] = row['amount']
+
+        to_refund: List[str] = []
+        restored = 0
+        for session in sessions:
+            session_data = dict(session)
+            session_data['state'] = json.loads(session['state']) if session['state'] else None
+            stakes = stakes_by_session.get(session['session_id'], {})
+
+            restorer = self.restorers.get(session['game_type'])
+            if restorer and stakes:
+                try:
+                    if await restorer(session_data, stakes):
+                        # Adopt the session so a later reload of this cog leaves it alone
+                        await self.bot.pool.execute(
+                            "UPDATE casino_sessions SET boot_id = $2 WHERE session_id = $1",
+                            session['session_id'], self.boot_id
+                        )
+                        restored += 1
+                        continue
+                except Exception as e:
+                    self.logger.error(f"Error restoring {session['game_type']} session {session['session_id']}: {e}",
+                                      extra={'guild_id': session['guild_id']})
+            to_refund.append(session['session_id'])
+
+        refunded = await self.refund_sessions(to_refund)
+        self.logger.info(f"중단된 게임 세션 처리 완료: 복구 {restored}개, 환불 {len(to_refund)}개 ({refunded:,} 코인)")
+
+    async def refund_sessions(self, session_ids: List[str]) -> int:
+        """Refund all escrow of the given sessions in a single transaction. Returns coins refunded."""
+        if not session_ids:
+            return 0
+
+        try:
+            async with self.bot.pool.acquire() as conn:
+                async with conn.transaction():
+                    refunds = await conn.fetch("""
+                        SELECT st.user_id, st.guild_id, s.game_type, SUM(st.amount)::INTEGER AS amount
+                        FROM casino_session_stakes st
+                        JOIN casino_sessions s ON s.session_id = st.session_id
+                        WHERE st.session_id = ANY($1::varchar[]) AND st.amount > 0
+                        GROUP BY st.user_id, st.guild_id, s.game_type
+                    """, session_ids)
+
+                    if refunds:
+                        user_ids = [r['user_id'] for r in refunds]
+                        guild_ids = [r['guild_id'] for r in refunds]
+                        amounts = [r['amount'] for r in refunds]
+                        types = [f"{r['game_type']}_refund" for r in refunds]
+
+                        await conn.execute("""
+                            INSERT INTO user_coins (user_id, guild_id, coins, total_earned)
+                            SELECT user_id, guild_id, SUM(amount), SUM(amount)
+                            FROM UNNEST($1::bigint[], $2::bigint[], $3::int[]) AS r(user_id, guild_id, amount)
+                            GROUP BY user_id, guild_id
+                            ON CONFLICT (user_id, guild_id)
+                            DO UPDATE SET
+                                coins = user_coins.coins + EXCLUDED.coins,
+                                total_earned = user_coins.total_earned + EXCLUDED.coins
+                        """, user_ids, guild_ids, amounts)
+
+                        await conn.execute("""
+                            INSERT INTO coin_transactions (user_id, guild_id, amount, transaction_type, description)
+                            SELECT user_id, guild_id, amount, transaction_type, '봇 재시작으로 중단된 게임 환불'
+                            FROM UNNEST($1::bigint[], $2::bigint[], $3::int[], $4::varchar[])
+                                AS r(user_id, guild_id, amount, transaction_type)
+                        """, user_ids, guild_ids, amounts, types)
+
+                    await conn.execute(
+                        "DELETE FROM casino_sessions WHERE session_id = ANY($1::varchar[])", session_ids
+                    )
+        except Exception as e:
+            self.logger.error(f"Error refunding interrupted sessions: {e}")
+            return 0
+
+        coins_cog = self.bot.get_cog('CoinsCog')
+        if coins_cog:
+            for guild_id in {r['guild_id'] for r in refunds}:
+                coins_cog.request_leaderboard_update(guild_id)
+
+        for r in refunds:
+            self.logger.info(f"Refunded {r['amount']} coins to user {r['user_id']} for interrupted {r['game_type']}",
+                             extra={'guild_id': r['guild_id']})
+
+        return sum(r['amount'] for r in refunds)
+
+
+def get_session_cog(bot) -> Optional[GameSessionCog]:
+    """Helper function for game cogs to get the GameSessionCog instance"""
+    return bot.get_cog('GameSessionCog')
+
+
+async def setup(bot):
+    await bot.add_cog(GameSessionCog(bot))
@@ -5,14 +5,41 @@ from discord import app_commands
 import random
 import asyncio
 from datetime import datetime, timezone, timedelta, time
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 import json
+import numpy as np
 import pytz
 
 from utils.logger import get_logger
 from utils.config import get_server_setting
 
 
+# Prize share of the pot per number of matches; each tier is split among its winners
+PRIZE_TIERS = ((5, 60), (4, 30), (3, 10))
+
+# Set bits per byte, for counting matches across uint64 masks without a Python loop
+_POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def numbers_to_mask(numbers: List[int]) -> int:
+    """Encode lottery numbers 1-35 as a 35-bit mask (bit n-1 set for number n)"""
+    mask = 0
+    for n in numbers:
+        mask |= 1 << (n - 1)
+    return mask
+
+
+def mask_to_numbers(mask: int) -> List[int]:
+    """Decode a number mask back to its sorted numbers"""
+    return [n for n in range(1, 36) if mask >> (n - 1) & 1]
+
+
+def count_matches(masks: np.ndarray, winning_mask: int) -> np.ndarray:
+    """Matched numbers per entry: popcount(entry_mask & winning_mask), vectorized over all entries"""
+    hits = masks & np.uint64(winning_mask)
+    return _POPCOUNT8[hits.view(np.uint8)].reshape(-1, 8).sum(axis=1)
+
+
 class LotteryEntry:
     """Represents a single lottery entry"""
 
@@ -20,6 +47,7 @@ class LotteryEntry:
         self.user_id = user_id
         self.numbers = sorted(numbers)  # Store sorted for easy comparison
         self.entry_time = entry_time
+        self.mask = numbers_to_mask(numbers)
 
 
 class LotterySystem:
@@ -46,6 +74,15 @@ class LotteryCog(commands.Cog):
         self.lottery_interface_message: Optional[discord.Message] = None
         self.lottery_channel_id = 1418763263721869403
         self._interface_setup_complete = False
+        # Guilds whose in-memory pot has changed since the last flush to lottery_state
+        self.pot_dirty: Set[int] = set()
+
+        # Coalesced interface refreshes: pot/entry changes mark the guild dirty and a
+        # debounced task edits the message at most once per interval with the latest values
+        self.pending_interface_updates: Dict[int, bool] = {}  # guild_id: bool
+        self.interface_update_delay = 10  # seconds
+        self.interface_embed_cache: Dict[int, discord.Embed] = {}  # guild_id: last full embed
+        self.interface_view: Optional[LotteryInterfaceView] = None
 
         # Schedule the full initialization sequence
         self.bot.loop.create_task(self.initialize())
@@ -59,7 +96,10 @@ class LotteryCog(commands.Cog):
 
             # Load saved states from database
             self.logger.info("Loading saved lottery states from database...")
+            await self.setup_database()
             await self.load_lottery_states()
+            if not self.flush_pot_updates.is_running():
+                self.flush_pot_updates.start()
 
             # Always ensure the lottery interface is posted and current
             self.logger.info("Setting up lottery interface...")
@@ -167,7 +207,7 @@ class LotteryCog(commands.Cog):
 
             # Create new embed and view
             embed = self.create_lottery_interface_embed(target_guild_id=guild_id)
-            view = LotteryInterfaceView(self)
+            view = self.get_interface_view()
 
             # Update existing message or create new one
             if existing_message:
@@ -199,6 +239,11 @@ class LotteryCog(commands.Cog):
         if self.daily_lottery_draw.is_running():
             self.daily_lottery_draw.cancel()
             self.logger.info("Daily lottery draw task cancelled due to cog unload")
+        if self.flush_pot_updates.is_running():
+            self.flush_pot_updates.cancel()
+        if self.pot_dirty:
+            # Write out contributions that arrived since the last flush
+            self.bot.loop.create_task(self.write_dirty_pots())
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -358,7 +403,7 @@ class LotteryCog(commands.Cog):
 
             # Create new interface embed and view
             embed = self.create_lottery_interface_embed(target_guild_id=guild_id)
-            view = LotteryInterfaceView(self)
+            view = self.get_interface_view()
 
             # Send the new interface message
             try:
@@ -521,10 +566,61 @@ class LotteryCog(commands.Cog):
 
         embed.set_footer(text="크래시 게임 수수료가 자동으로 팟에 추가됩니다")
 
+        if target_guild_id:
+            self.interface_embed_cache[target_guild_id] = embed.copy()
+
+        return embed
+
+    def build_refreshed_interface_embed(self, guild_id: int) -> discord.Embed:
+        """Reuse the cached embed and only patch the live pot and participant fields"""
+        skeleton = self.interface_embed_cache.get(guild_id)
+        if skeleton is None:
+            return self.create_lottery_interface_embed(guild_id)
+
+        lottery = self.get_lottery(guild_id)
+        embed = skeleton.copy()
+        embed.timestamp = datetime.now(timezone.utc)
+        embed.set_field_at(0, name="💰 현재 팟", value=f"{lottery.pot_amount:,} 코인", inline=True)
+        embed.set_field_at(1, name="👥 현재 참가자", value=f"{len(lottery.entries)}명", inline=True)
         return embed
 
-    async def update_lottery_interface(self, guild_id: int = None):
-        """Update the lottery interface embed with current data"""
+    def get_interface_view(self) -> 'LotteryInterfaceView':
+        """The interface view is stateless, so one instance serves every edit"""
+        if self.interface_view is None:
+            self.interface_view = LotteryInterfaceView(self)
+        return self.interface_view
+
+    def request_interface_update(self, guild_id: int):
+        """Coalesced trigger: spawns at most one pending interface refresh per guild"""
+        if self.pending_interface_updates.get(guild_id, False):
+            return
+
+        self.pending_interface_updates[guild_id] = True
+        self.bot.loop.create_task(self._run_interface_update(guild_id))
+
+    async def _run_interface_update(self, guild_id: int):
+        """Debounced interface refresh with whatever the pot is once the interval has passed"""
+        await asyncio.sleep(self.interface_update_delay)
+
+        # Clear first so contributions that land during the edit schedule the next refresh
+        self.pending_interface_updates[guild_id] = False
+
+        message = self.lottery_interface_message
+        if not message or (message.guild and message.guild.id != guild_id):
+            return  # The interface shows another guild's lottery
+
+        try:
+            await self.update_lottery_interface(guild_id, full=False)
+        except Exception as e:
+            self.logger.error(f"Error in scheduled lottery interface update for guild {guild_id}: {e}",
+                              extra={'guild_id': guild_id})
+
+    async def update_lottery_interface(self, guild_id: int = None, full: bool = True):
+        """Update the lottery interface embed with current data.
+
+        full=False patches the cached embed instead of rebuilding every field; it is used
+        by the coalesced refresher, where only the pot and participant count change.
+        """
         if not self.lottery_interface_message:
             self.logger.warning("복권 인터페이스 메시지가 없어 업데이트를 건너뜁니다.")
             return
@@ -539,8 +635,11 @@ class LotteryCog(commands.Cog):
                 self.logger.warning("복권 인터페이스 업데이트용 guild_id를 확인할 수 없습니다.")
                 return
 
-            embed = self.create_lottery_interface_embed(target_guild_id)
-            view = LotteryInterfaceView(self)
+            if full:
+                embed = self.create_lottery_interface_embed(target_guild_id)
+            else:
+                embed = self.build_refreshed_interface_embed(target_guild_id)
+            view = self.get_interface_view()
 
             # Add timestamp to show when last updated
             embed.set_footer(
@@ -585,8 +684,38 @@ class LotteryCog(commands.Cog):
             self.guild_lotteries[guild_id] = LotterySystem(guild_id)
         return self.guild_lotteries[guild_id]
 
+    async def setup_database(self):
+        """Create lottery state and entry tables"""
+        if not self.bot.pool:
+            return
+        try:
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS lottery_state (
+                    guild_id BIGINT PRIMARY KEY,
+                    pot_amount BIGINT NOT NULL DEFAULT 1000,
+                    last_draw_time TIMESTAMPTZ,
+                    winning_numbers TEXT,
+                    last_winner_id BIGINT,
+                    last_prize_amount BIGINT NOT NULL DEFAULT 0
+                )
+            """)
+
+            # One row per ticket; the five numbers are a 35-bit mask
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS lottery_entries (
+                    guild_id BIGINT NOT NULL,
+                    user_id BIGINT NOT NULL,
+                    numbers_mask BIGINT NOT NULL,
+                    entered_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (guild_id, user_id)
+                )
+            """)
+            self.logger.info("✅ 복권 테이블이 준비되었습니다.")
+        except Exception as e:
+            self.logger.error(f"❌ 복권 테이블 설정 실패: {e}", exc_info=True)
+
     async def load_lottery_states(self):
-        """Load lottery states from database"""
+        """Load lottery states and open entries from database"""
         try:
             if hasattr(self.bot, 'pool') and self.bot.pool:
                 states = await self.bot.pool.fetch("SELECT * FROM lottery_state")
@@ -595,10 +724,19 @@ class LotteryCog(commands.Cog):
                     lottery.pot_amount = state['pot_amount']
                     lottery.last_draw_time = state['last_draw_time']
                     lottery.winning_numbers = json.loads(state['winning_numbers']) if state['winning_numbers'] else []
+                    lottery.last_winner_id = state['last_winner_id']
                     lottery.last_prize_amount = state['last_prize_amount']
-                    # Load entries if needed, etc.
                     self.guild_lotteries[state['guild_id']] = lottery
                     self.logger.info(f"Loaded lottery state for guild {state['guild_id']}")
+
+                entries = await self.bot.pool.fetch(
+                    "SELECT guild_id, user_id, numbers_mask, entered_at FROM lottery_entries"
+                )
+                for row in entries:
+                    entry = LotteryEntry(row['user_id'], mask_to_numbers(row['numbers_mask']), row['entered_at'])
+                    self.get_lottery(row['guild_id']).entries[row['user_id']] = entry
+                if entries:
+                    self.logger.info(f"Loaded {len(entries)} open lottery entries")
         except Exception as e:
             self.logger.error(f"Error loading lottery states: {e}", exc_info=True)
 
@@ -606,8 +744,34 @@ class LotteryCog(commands.Cog):
         """Add amount to lottery pot"""
         lottery = self.get_lottery(guild_id)
         lottery.pot_amount += amount
-        # Update interface to reflect new pot amount
-        await self.update_lottery_interface(guild_id)
+        # Persisted by the next flush_pot_updates run rather than one write per contribution
+        self.pot_dirty.add(guild_id)
+        # Reflected in the interface by the next coalesced refresh
+        self.request_interface_update(guild_id)
+
+    @tasks.loop(seconds=30)
+    async def flush_pot_updates(self):
+        """Periodically persist pots changed by casino contributions"""
+        await self.write_dirty_pots()
+
+    async def write_dirty_pots(self):
+        """Write every changed pot in one statement"""
+        if not self.pot_dirty or not self.bot.pool:
+            return
+
+        guild_ids = list(self.pot_dirty)
+        self.pot_dirty.clear()
+        pots = [self.get_lottery(guild_id).pot_amount for guild_id in guild_ids]
+        try:
+            await self.bot.pool.execute("""
+                INSERT INTO lottery_state (guild_id, pot_amount)
+                SELECT * FROM UNNEST($1::bigint[], $2::bigint[])
+                ON CONFLICT (guild_id) DO UPDATE SET pot_amount = EXCLUDED.pot_amount
+            """, guild_ids, pots)
+        except Exception as e:
+            # Retry on the next run
+            self.pot_dirty.update(guild_ids)
+            self.logger.error(f"Error flushing lottery pots: {e}")
 
     async def enter_lottery(self, user_id: int, guild_id: int, numbers: List[int]) -> tuple[bool, str]:
         """Enter user into lottery"""
@@ -620,6 +784,17 @@ class LotteryCog(commands.Cog):
             return False, msg
 
         entry = LotteryEntry(user_id, numbers, datetime.now(timezone.utc))
+
+        if self.bot.pool:
+            inserted = await self.bot.pool.fetchval("""
+                INSERT INTO lottery_entries (guild_id, user_id, numbers_mask, entered_at)
+                VALUES ($1, $2, $3, $4)
+                ON CONFLICT (guild_id, user_id) DO NOTHING
+                RETURNING TRUE
+            """, guild_id, user_id, entry.mask, entry.entry_time)
+            if not inserted:
+                return False, "이미 참가했습니다."
+
         lottery.entries[user_id] = entry
 
         return True, f"참가 완료: {sorted(numbers)}"
@@ -642,23 +817,114 @@ class LotteryCog(commands.Cog):
 
         # Generate random winning numbers
         winning_numbers = sorted(random.sample(range(1, 36), 5))
+        winning_mask = numbers_to_mask(winning_numbers)
+
+        # Score every ticket at once
+        entries = lottery.entries
+        user_ids = np.fromiter(entries.keys(), dtype=np.int64, count=len(entries))
+        masks = np.fromiter((e.mask for e in entries.values()), dtype=np.uint64, count=len(entries))
+        matches = count_matches(masks, winning_mask)
+
+        pot = lottery.pot_amount
+        winners: Dict[int, dict] = {}
+        for tier_matches, share_pct in PRIZE_TIERS:
+            tier_winners = user_ids[matches == tier_matches]
+            if not len(tier_winners):
+                continue  # Unclaimed tier stays in the pot
+            prize = pot * share_pct // 100 // len(tier_winners)
+            for user_id in tier_winners.tolist():
+                winners[user_id] = {'matches': tier_matches, 'prize': prize}
+
+        total_awarded = sum(w['prize'] for w in winners.values())
+        draw_time = datetime.now(timezone.utc)
+        top_winner = max(winners, key=lambda uid: winners[uid]['matches']) if winners else None
+
+        # Deduct from the live pot first so contributions arriving during the write are kept
+        lottery.pot_amount -= total_awarded
+        remaining_pot = lottery.pot_amount
+
+        if self.bot.pool:
+            try:
+                await self.settle_draw(guild_id, user_ids.tolist(), winners, remaining_pot, draw_time,
+                                       winning_numbers, top_winner, winners[top_winner]['prize'] if top_winner else 0)
+            except Exception as e:
+                lottery.pot_amount += total_awarded
+                self.logger.error(f"Error settling lottery draw for guild {guild_id}: {e}", exc_info=True,
+                                  extra={'guild_id': guild_id})
+                return False, "추첨 정산 중 오류가 발생했습니다.", {}
 
-        # Calculate winners and prizes (simplified)
         results = {
             'winning_numbers': winning_numbers,
-            'total_entries': len(lottery.entries),
-            'total_awarded': 0,
-            'remaining_pot': lottery.pot_amount,
-            'winners': {}
+            'total_entries': len(user_ids),
+            'total_awarded': total_awarded,
+            'remaining_pot': remaining_pot,
+            'winners': winners
         }
 
-        # Reset entries after draw
-        lottery.entries = {}
+        # Reset entries after draw, keeping any ticket bought while the draw was being settled
+        drawn = set(user_ids.tolist())
+        lottery.entries = {uid: e for uid, e in lottery.entries.items() if uid not in drawn}
         lottery.winning_numbers = winning_numbers
-        lottery.last_draw_time = datetime.now(timezone.utc)
-
+        lottery.last_draw_time = draw_time
+        if top_winner:
+            lottery.last_winner_id = top_winner
+            lottery.last_prize_amount = winners[top_winner]['prize']
+
+        coins_cog = self.bot.get_cog('CoinsCog')
+        if coins_cog and winners:
+            coins_cog.request_leaderboard_update(guild_id)
+
+        self.logger.info(
+            f"Lottery draw {winning_numbers}: {len(user_ids)} entries, {len(winners)} winners, {total_awarded:,} coins awarded",
+            extra={'guild_id': guild_id}
+        )
         return True, "Draw successful", results
 
+    async def settle_draw(self, guild_id: int, drawn_user_ids: List[int], winners: Dict[int, dict],
+                          remaining_pot: int, draw_time: datetime, winning_numbers: List[int],
+                          top_winner: Optional[int], top_prize: int):
+        """Pay all winners, record the draw and clear the drawn entries in one transaction"""
+        async with self.bot.pool.acquire() as conn:
+            async with conn.transaction():
+                if winners:
+                    user_ids = list(winners)
+                    prizes = [w['prize'] for w in winners.values()]
+                    descriptions = [f"복권 당첨 ({w['matches']}개 일치)" for w in winners.values()]
+
+                    await conn.execute("""
+                        INSERT INTO user_coins (user_id, guild_id, coins, total_earned)
+                        SELECT user_id, $2, prize, prize
+                        FROM UNNEST($1::bigint[], $3::int[]) AS w(user_id, prize)
+                        ON CONFLICT (user_id, guild_id)
+                        DO UPDATE SET
+                            coins = user_coins.coins + EXCLUDED.coins,
+                            total_earned = user_coins.total_earned + EXCLUDED.coins
+                    """, user_ids, guild_id, prizes)
+
+                    await conn.execute("""
+                        INSERT INTO coin_transactions (user_id, guild_id, amount, transaction_type, description)
+                        SELECT user_id, $2, prize, 'lottery_win', description
+                        FROM UNNEST($1::bigint[], $3::int[], $4::text[]) AS w(user_id, prize, description)
+                    """, user_ids, guild_id, prizes, descriptions)
+
+                await conn.execute("""
+                    INSERT INTO lottery_state (guild_id, pot_amount, last_draw_time, winning_numbers,
+                                               last_winner_id, last_prize_amount)
+                    VALUES ($1, $2, $3, $4, $5, $6)
+                    ON CONFLICT (guild_id) DO UPDATE SET
+                        pot_amount = EXCLUDED.pot_amount,
+                        last_draw_time = EXCLUDED.last_draw_time,
+                        winning_numbers = EXCLUDED.winning_numbers,
+                        last_winner_id = COALESCE(EXCLUDED.last_winner_id, lottery_state.last_winner_id),
+                        last_prize_amount = CASE WHEN EXCLUDED.last_winner_id IS NULL
+                            THEN lottery_state.last_prize_amount ELSE EXCLUDED.last_prize_amount END
+                """, guild_id, remaining_pot, draw_time, json.dumps(winning_numbers), top_winner, top_prize)
+
+                await conn.execute(
+                    "DELETE FROM lottery_entries WHERE guild_id = $1 AND user_id = ANY($2::bigint[])",
+                    guild_id, drawn_user_ids
+                )
+
     async def debug_automation_status(self):
         """Debug method to check automation status"""
         self.logger.info("=== LOTTERY AUTOMATION DEBUG ===")
@@ -862,12 +1128,8 @@ class LotteryEntryModal(discord.ui.Modal, title="복권 번호 선택"):
 
                     await interaction.followup.send(embed=embed, ephemeral=True)
 
-                    # Update the main lottery interface safely
-                    try:
-                        await self.cog.update_lottery_interface(interaction.guild.id)
-                    except Exception as update_error:
-                        self.cog.logger.error(f"로또 인터페이스 업데이트 오류: {update_error}")
-                        # Don't fail the whole operation if interface update fails
+                    # Participant count is picked up by the next coalesced interface refresh
+                    self.cog.request_interface_update(interaction.guild.id)
 
                 except Exception as display_error:
                     self.cog.logger.error(f"성공 메시지 표시 오류: {display_error}", exc_info=True)
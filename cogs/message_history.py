@@ -1,12 +1,16 @@
 # cogs/message_history.py - Updated for multi-server support
 
 import discord
-from discord.ext import commands
+from discord import app_commands
+from discord.ext import commands, tasks
 from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
 import traceback
 import aiohttp
 import io
 import os
+import pytz
 
 from utils.config import (
     get_channel_id,
@@ -14,6 +18,12 @@ from utils.config import (
     is_server_configured
 )
 from utils.logger import get_logger
+from utils.media_store import MediaStore
+from utils.http_client import DownloadTooLarge
+from utils.message_cache import MessageCache, CachedMessage
+from utils.log_batcher import ChannelLogBatcher
+from utils.message_archive import MessageArchive, SEARCH_PAGE_SIZE
+from utils.discord_tools import KeysetPageView
 
 
 class MessageLogCog(commands.Cog):
@@ -26,52 +36,122 @@ class MessageLogCog(commands.Cog):
         # Flag to ensure the bot ready message is sent only once per server
         self._sent_ready_messages = set()
 
-        # Media history folder per server
+        # Deduplicated media history, one blob folder per server
         self.base_media_folder = "mediahistory"
         os.makedirs(self.base_media_folder, exist_ok=True)
+        self.media_store = MediaStore(bot, self.base_media_folder)
+        self.archive = MessageArchive(bot)
+        self.bot.loop.create_task(self.setup_storage())
+
+        # Recent messages of logged servers, so edits/deletes resolve old content without API calls
+        self.message_cache = MessageCache()
+        self.bot.loop.create_task(self.message_cache.open())
+
+        # Delete/edit logs are merged per log channel instead of one send each
+        self.log_batcher = ChannelLogBatcher()
+
+    async def setup_storage(self):
+        await self.bot.wait_until_ready()
+        await self.media_store.setup_database()
+        await self.archive.setup_database()
+        self.media_retention.start()
+
+    async def cog_unload(self):
+        self.media_retention.cancel()
+        await self.log_batcher.flush_all()
+        await self.message_cache.close()
+
+    def is_logged_message(self, message) -> bool:
+        """Whether message history is on for this message's server and it isn't the bot's or the log channel's"""
+        if not message.guild or not is_server_configured(message.guild.id):
+            return False
+        if not is_feature_enabled(message.guild.id, 'message_history'):
+            return False
+        if message.author and message.author.bot:
+            return False
+        return message.channel.id != get_channel_id(message.guild.id, 'message_history_channel')
+
+    async def get_cached_message(self, message_id: int) -> Optional[CachedMessage]:
+        """Rebuild a message from the local cache, or None if it was never cached"""
+        return (await self.get_cached_messages([message_id])).get(message_id)
+
+    async def get_cached_messages(self, message_ids) -> Dict[int, CachedMessage]:
+        rows = await self.message_cache.get_many(message_ids)
+        messages = {}
+        for message_id, row in rows.items():
+            guild = self.bot.get_guild(row['guild_id'])
+            if not guild:
+                continue
+            channel = guild.get_channel_or_thread(row['channel_id'])
+            author = guild.get_member(row['author_id']) or self.bot.get_user(row['author_id'])
+            messages[message_id] = CachedMessage(row, guild, channel, author)
+        return messages
+
+    @tasks.loop(hours=24)
+    async def media_retention(self):
+        """서버별 보존 기간/용량 제한에 따라 오래된 미디어 정리"""
+        try:
+            rows = await self.bot.pool.fetch("SELECT DISTINCT guild_id FROM media_blobs")
+            for row in rows:
+                await self.media_store.evict(row['guild_id'])
+        except Exception as e:
+            self.logger.error(f"미디어 보존 정리 중 오류 발생: {e}\n{traceback.format_exc()}")
 
-    def get_server_media_folder(self, guild_id: int) -> str:
-        """Get media folder path for specific server"""
-        folder = os.path.join(self.base_media_folder, str(guild_id))
-        os.makedirs(folder, exist_ok=True)
-        return folder
+    async def _prepare_attachment_log(self, attachment, message_id, guild_id, description_prefix="",
+                                      upload: bool = True) -> Tuple[str, Optional[Tuple[discord.File, int]]]:
+        """Save an attachment to the media store and build the file to re-upload with its log entry.
 
-    async def _send_attachment_to_log(self, log_channel, attachment, message_id, guild_id, description_prefix=""):
-        """Helper function to download, save locally, and send an attachment to the log channel."""
+        Returns the summary line for the embed and (file, size), or None if saving failed or upload is off.
+        """
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(attachment.url) as resp:
-                    if resp.status == 200:
-                        file_bytes = await resp.read()
-
-                        # Save to server-specific mediahistory folder
-                        media_folder = self.get_server_media_folder(guild_id)
-                        save_path = os.path.join(media_folder, f"{message_id}_{attachment.filename}")
+            # Store in the deduplicated media store; identical files share one blob
+            stored = await self.media_store.store_attachment(guild_id, message_id, attachment)
+            # FIX: Add guild_id to log message
+            self.logger.debug(
+                f"Successfully saved attachment {attachment.filename} as blob {stored['sha256'][:12]} "
+                f"(dedup: {stored['deduplicated']}, gzip: {stored['compressed']}).", extra={'guild_id': guild_id})
 
-                        with open(save_path, 'wb') as f:
-                            f.write(file_bytes)
-                        # FIX: Add guild_id to log message
-                        self.logger.debug(f"Successfully saved attachment {attachment.filename} to {save_path}.", extra={'guild_id': guild_id})
-
-                        discord_file = discord.File(
-                            save_path,
-                            filename=attachment.filename,
-                            description=f"{description_prefix}첨부 파일 (메시지 ID: {message_id})"
-                        )
-                        await log_channel.send(f"{description_prefix}첨부 파일: `{attachment.filename}`", file=discord_file)
-                        # FIX: Add guild_id to log message
-                        self.logger.debug(f"Successfully sent attachment {attachment.filename} to log channel.", extra={'guild_id': guild_id})
-                        return f"[`{attachment.filename}`]({attachment.url}) (저장됨)"
-                    else:
-                        # FIX: Add guild_id to log message
-                        self.logger.warning(
-                            f"첨부 파일 {attachment.filename} 다운로드 실패: HTTP {resp.status}", extra={'guild_id': guild_id})
-                        return f"[`{attachment.filename}`]({attachment.url}) (저장 실패: HTTP {resp.status})"
+            status = '저장됨, 중복' if stored['deduplicated'] else '저장됨'
+            line = f"[`{attachment.filename}`]({attachment.url}) ({status})"
+            try:
+                if not upload:
+                    return line, None
+                # Open the blob before releasing it, so the eviction pass release() may start can't remove it first
+                discord_file = discord.File(
+                    await self.media_store.open_blob(stored),
+                    filename=attachment.filename,
+                    description=f"{description_prefix}첨부 파일 (메시지 ID: {message_id})"
+                )
+            finally:
+                self.media_store.release(stored)
+            return line, (discord_file, stored['size'])
+        except DownloadTooLarge:
+            self.logger.warning(
+                f"첨부 파일 {attachment.filename}이(가) 서버 미디어 저장 용량보다 커서 저장하지 않았습니다.",
+                extra={'guild_id': guild_id})
+            return f"[`{attachment.filename}`]({attachment.url}) (저장 안 됨: 저장소 용량 초과)", None
+        except aiohttp.ClientResponseError as e:
+            # FIX: Add guild_id to log message
+            self.logger.warning(
+                f"첨부 파일 {attachment.filename} 다운로드 실패: HTTP {e.status}", extra={'guild_id': guild_id})
+            return f"[`{attachment.filename}`]({attachment.url}) (저장 실패: HTTP {e.status})", None
         except Exception as e:
             # FIX: Add guild_id to log message
             self.logger.error(
                 f"첨부 파일 {attachment.filename} 저장 중 예외 발생: {e}\n{traceback.format_exc()}", extra={'guild_id': guild_id})
-            return f"[`{attachment.filename}`]({attachment.url}) (저장 오류)"
+            return f"[`{attachment.filename}`]({attachment.url}) (저장 오류)", None
+
+    async def _log_attachments(self, attachments, message_id, guild_id, description_prefix,
+                               files: Optional[List[Tuple[discord.File, int]]]) -> List[str]:
+        """Save several attachments and return their summary lines; files (if given) collects the re-uploads"""
+        lines = []
+        for attachment in attachments:
+            line, log_file = await self._prepare_attachment_log(attachment, message_id, guild_id, description_prefix,
+                                                                upload=files is not None)
+            lines.append(line)
+            if log_file:
+                files.append(log_file)
+        return lines
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -121,6 +201,112 @@ class MessageLogCog(commands.Cog):
                         self.logger.error(
                             f"로그 채널 ID {log_channel_id}을(를) 찾을 수 없어 봇 시작 메시지를 보낼 수 없습니다. (서버: {guild.name})", extra={'guild_id': guild.id})
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        """로그 대상 서버의 메시지를 로컬 캐시에 저장"""
+        if self.is_logged_message(message):
+            self.message_cache.put(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """discord.py 캐시에 없는 메시지의 삭제를 로컬 캐시로 기록"""
+        if payload.cached_message is not None:
+            return  # on_message_delete handles it
+
+        cached = await self.get_cached_message(payload.message_id)
+        if cached and cached.channel:
+            await self.on_message_delete(cached)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        """discord.py 캐시에 없는 메시지의 수정을 로컬 캐시로 기록"""
+        if payload.cached_message is not None:
+            return  # on_message_edit handles it
+
+        cached = await self.get_cached_message(payload.message_id)
+        if cached and cached.channel:
+            await self.on_message_edit(cached, payload.message)
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(self, payload: discord.RawBulkMessageDeleteEvent):
+        """
+        일괄 삭제(/삭제, 디스코드 bulk delete)를 메시지별 로그 대신
+        요약 임베드 하나와 전체 내용 텍스트 파일 하나로 기록합니다.
+        """
+        guild = self.bot.get_guild(payload.guild_id) if payload.guild_id else None
+        if not guild or not is_server_configured(guild.id) or not is_feature_enabled(guild.id, 'message_history'):
+            return
+
+        log_channel_id = get_channel_id(guild.id, 'message_history_channel')
+        if not log_channel_id or payload.channel_id == log_channel_id:
+            return
+
+        log_channel = self.bot.get_channel(log_channel_id)
+        if not log_channel:
+            self.logger.error(
+                f"로그 채널 ID {log_channel_id}을(를) 찾을 수 없습니다. 일괄 삭제 로그를 보낼 수 없습니다. (서버: {guild.name})", extra={'guild_id': guild.id})
+            return
+
+        try:
+            # discord.py's cache first, then the local cache for the rest
+            messages = {m.id: m for m in payload.cached_messages}
+            missing = [message_id for message_id in payload.message_ids if message_id not in messages]
+            messages.update(await self.get_cached_messages(missing))
+            for message_id in payload.message_ids:
+                self.message_cache.forget(message_id)
+
+            logged = [m for m in sorted(messages.values(), key=lambda m: m.id) if not (m.author and m.author.bot)]
+            unknown = len(payload.message_ids) - len(messages)
+
+            lines = []
+            for m in logged:
+                created_at = m.created_at if isinstance(m.created_at, datetime) else datetime.fromtimestamp(m.created_at, timezone.utc)
+                author_name = str(m.author) if m.author else getattr(m, 'author_name', '알 수 없는 사용자')
+                author_id = m.author.id if m.author else getattr(m, 'author_id', 'N/A')
+                lines.append(f"[{created_at.strftime('%Y-%m-%d %H:%M:%S UTC')}] {author_name} ({author_id}) · {m.id}")
+                lines.append(m.content if m.content else "(내용 없음)")
+                if m.attachments:
+                    # Saved to the media store, but not re-uploaded one by one
+                    saved = await self._log_attachments(m.attachments, m.id, guild.id, "일괄 삭제된 메시지의 ", None)
+                    lines.extend(f"  첨부: {line}" for line in saved)
+                lines.append("")
+            if unknown:
+                lines.append(f"(캐시에 없어 내용을 알 수 없는 메시지 {unknown}개)")
+
+            channel = guild.get_channel_or_thread(payload.channel_id)
+            channel_text = f"{channel.mention} ({payload.channel_id})" if channel else str(payload.channel_id)
+            authors = Counter(
+                (m.author.mention if m.author else getattr(m, 'author_name', '알 수 없는 사용자')) for m in logged
+            )
+
+            embed = discord.Embed(
+                title="🧹 메시지 일괄 삭제됨",
+                color=discord.Color.dark_red(),
+                timestamp=datetime.now(timezone.utc)
+            )
+            embed.add_field(name="채널", value=channel_text, inline=False)
+            embed.add_field(name="삭제된 메시지", value=f"{len(payload.message_ids)}개 (기록됨 {len(logged)}개, 알 수 없음 {unknown}개)", inline=False)
+            if authors:
+                embed.add_field(
+                    name="작성자별",
+                    value="\n".join(f"{author}: {count}개" for author, count in authors.most_common(10)),
+                    inline=False
+                )
+            embed.set_footer(text=f"전체 내용은 첨부된 텍스트 파일 참고 • 서버: {guild.name}")
+
+            transcript = "\n".join(lines).encode('utf-8')
+            transcript_file = discord.File(
+                io.BytesIO(transcript),
+                filename=f"bulk-delete-{payload.channel_id}-{int(datetime.now(timezone.utc).timestamp())}.txt"
+            )
+            self.log_batcher.enqueue(log_channel, embed, [(transcript_file, len(transcript))])
+            await self.archive.archive([self.archive.entry(m, 'bulk_delete') for m in logged if m.channel])
+            self.logger.info(
+                f"{channel_text}에서 일괄 삭제된 메시지 {len(payload.message_ids)}개를 기록했습니다. (서버: {guild.name})", extra={'guild_id': guild.id})
+
+        except Exception as e:
+            self.logger.error(f"일괄 삭제 로깅 중 오류 발생 (서버: {guild.name}): {e}\n{traceback.format_exc()}", extra={'guild_id': guild.id})
+
     @commands.Cog.listener()
     async def on_message_delete(self, message: discord.Message):
         """
@@ -162,32 +348,21 @@ class MessageLogCog(commands.Cog):
                 f"로그 채널 ID {log_channel_id}을(를) 찾을 수 없습니다. 메시지 삭제 로그를 보낼 수 없습니다. (서버: {message.guild.name})", extra={'guild_id': message.guild.id})
             return
 
-        # Try to fetch the full message content if its content is None
+        # A deleted message can't be fetched any more; fall back to the local cache if its content is missing
         full_message = message
+        self.message_cache.forget(message.id)
 
         if full_message.content is None:
-            # FIX: Add guild_id to log message
-            self.logger.info(
-                f"메시지 {message.id} 내용이 None입니다. 전체 메시지를 가져오려 합니다.", extra={'guild_id': message.guild.id})
-            try:
-                if message.channel:
-                    fetched_msg = await message.channel.fetch_message(message.id)
-                    full_message = fetched_msg
-                    # FIX: Add guild_id to log message
-                    self.logger.info(
-                        f"메시지 {message.id}를 성공적으로 가져왔습니다. 내용 길이: {len(full_message.content) if full_message.content else 0}.", extra={'guild_id': message.guild.id})
-                else:
-                    # FIX: Add guild_id to log message
-                    self.logger.warning(
-                        f"메시지 {message.id}에 채널 정보가 없어 내용을 가져올 수 없습니다.", extra={'guild_id': message.guild.id})
-            except (discord.NotFound, discord.Forbidden):
+            cached = await self.get_cached_message(message.id)
+            if cached:
+                full_message = cached
                 # FIX: Add guild_id to log message
-                self.logger.warning(
-                    f"메시지 {message.id}를 가져오는 데 실패했습니다 (NotFound/Forbidden). 내용이 부정확할 수 있습니다.", extra={'guild_id': message.guild.id})
-            except Exception as e:
+                self.logger.debug(
+                    f"메시지 {message.id} 내용을 로컬 캐시에서 찾았습니다.", extra={'guild_id': message.guild.id})
+            else:
                 # FIX: Add guild_id to log message
-                self.logger.error(
-                    f"메시지 {message.id}를 가져오는 중 예상치 못한 오류 발생: {e}\n{traceback.format_exc()}", extra={'guild_id': message.guild.id})
+                self.logger.warning(
+                    f"메시지 {message.id}의 내용이 캐시에 없습니다. 내용이 부정확할 수 있습니다.", extra={'guild_id': message.guild.id})
         else:
             # FIX: Add guild_id to log message
             self.logger.debug(
@@ -200,8 +375,8 @@ class MessageLogCog(commands.Cog):
                 timestamp=datetime.now(timezone.utc)
             )
 
-            author_mention = full_message.author.mention if full_message.author else "알 수 없는 사용자"
-            author_id = full_message.author.id if full_message.author else "N/A"
+            author_mention = full_message.author.mention if full_message.author else getattr(full_message, 'author_name', None) or "알 수 없는 사용자"
+            author_id = full_message.author.id if full_message.author else getattr(full_message, 'author_id', "N/A")
             channel_mention = full_message.channel.mention if full_message.channel else "알 수 없는 채널"
             channel_id = full_message.channel.id if full_message.channel else "N/A"
             author_avatar_url = full_message.author.display_avatar.url if full_message.author and full_message.author.display_avatar else None
@@ -215,12 +390,10 @@ class MessageLogCog(commands.Cog):
             embed.add_field(name="내용", value=content_to_display, inline=False)
 
             # Handle attachments
+            files = []
             if full_message.attachments:
-                attachment_info = []
-                for attachment in full_message.attachments:
-                    result = await self._send_attachment_to_log(log_channel, attachment, full_message.id,
-                                                                message.guild.id, "삭제된 메시지의 ")
-                    attachment_info.append(result)
+                attachment_info = await self._log_attachments(full_message.attachments, full_message.id,
+                                                              message.guild.id, "삭제된 메시지의 ", files)
                 embed.add_field(name="첨부 파일", value="\n".join(attachment_info), inline=False)
             else:
                 embed.add_field(name="첨부 파일", value="*없음*", inline=False)
@@ -229,7 +402,8 @@ class MessageLogCog(commands.Cog):
             if author_avatar_url:
                 embed.set_thumbnail(url=author_avatar_url)
 
-            await log_channel.send(embed=embed)
+            self.log_batcher.enqueue(log_channel, embed, files)
+            await self.archive.archive([self.archive.entry(full_message, 'delete')])
             # FIX: Add guild_id to log message
             self.logger.info(
                 f"{full_message.channel.name if full_message.channel else '알 수 없는 채널'}에서 {author_mention}의 삭제된 메시지를 기록했습니다. (서버: {message.guild.name})", extra={'guild_id': message.guild.id})
@@ -280,40 +454,30 @@ class MessageLogCog(commands.Cog):
         # Attempt to get reliable 'before' content and attachments
         fetched_original_content = before.content
         fetched_original_attachments = before.attachments
+        original_content_known = True
 
-        # If 'before' message content is None (not in cache or content not provided by Discord)
+        # Fetching would return the edited message, so missing 'before' content comes from the local cache
         if fetched_original_content is None:
-            # FIX: Add guild_id to log message
-            self.logger.info(
-                f"'before' 메시지 {before.id} 내용이 None입니다. 전체 메시지를 가져오려 합니다.", extra={'guild_id': before.guild.id})
-            try:
-                if before.channel:
-                    fetched_before_message = await before.channel.fetch_message(before.id)
-                    fetched_original_content = fetched_before_message.content if fetched_before_message.content is not None else ""
-                    fetched_original_attachments = fetched_before_message.attachments
-                    # FIX: Add guild_id to log message
-                    self.logger.info(
-                        f"'before' 메시지 {before.id}를 성공적으로 가져왔습니다. 내용 길이: {len(fetched_original_content)}자.", extra={'guild_id': before.guild.id})
-                else:
-                    # FIX: Add guild_id to log message
-                    self.logger.warning(
-                        f"'before' 메시지 {before.id}에 채널 정보가 없어 내용을 가져올 수 없습니다.", extra={'guild_id': before.guild.id})
-            except (discord.NotFound, discord.Forbidden):
+            cached = await self.get_cached_message(before.id)
+            if cached:
+                fetched_original_content = cached.content or ""
+                fetched_original_attachments = cached.attachments
+                # FIX: Add guild_id to log message
+                self.logger.debug(
+                    f"'before' 메시지 {before.id} 내용을 로컬 캐시에서 찾았습니다.", extra={'guild_id': before.guild.id})
+            else:
                 # FIX: Add guild_id to log message
                 self.logger.warning(
-                    f"'before' 메시지 {before.id}를 가져오는 데 실패했습니다 (NotFound/Forbidden). 원래 내용이 부정확할 수 있습니다.", extra={'guild_id': before.guild.id})
+                    f"'before' 메시지 {before.id}의 내용이 캐시에 없습니다. 원래 내용이 부정확할 수 있습니다.", extra={'guild_id': before.guild.id})
                 fetched_original_content = "*캐시에 없거나 가져올 수 없는 내용*"
-            except Exception as e:
-                # FIX: Add guild_id to log message
-                self.logger.error(
-                    f"'before' 메시지 {before.id}를 가져오는 중 예상치 못한 오류 발생: {e}\n{traceback.format_exc()}", extra={'guild_id': before.guild.id})
-                fetched_original_content = "*가져오기 실패 (오류 발생)*"
+                original_content_known = False
         else:
             # FIX: Add guild_id to log message
             self.logger.debug(
                 f"'before' 메시지 {before.id}의 내용이 이벤트에 포함되어 있습니다. 내용 길이: {len(fetched_original_content)}.", extra={'guild_id': before.guild.id})
 
         after_content = after.content if after.content is not None else ""
+        self.message_cache.put(after)
 
         # Content and attachment comparison
         content_changed = (fetched_original_content.strip() != after_content.strip())
@@ -375,14 +539,12 @@ class MessageLogCog(commands.Cog):
                                    a.filename not in after_attachment_filenames]
 
             attachment_changes_text = []
+            files = []
 
             # Log and save removed attachments
             if removed_attachments:
-                removed_attachment_info = []
-                for attachment in removed_attachments:
-                    result = await self._send_attachment_to_log(log_channel, attachment, before.id, before.guild.id,
-                                                                "삭제된 첨부 파일: ")
-                    removed_attachment_info.append(result)
+                removed_attachment_info = await self._log_attachments(removed_attachments, before.id,
+                                                                      before.guild.id, "삭제된 첨부 파일: ", files)
                 attachment_changes_text.append(f"**삭제됨:**\n" + '\n'.join(removed_attachment_info))
 
             # Log added attachments
@@ -396,11 +558,8 @@ class MessageLogCog(commands.Cog):
             if attachment_changes_text:
                 embed.add_field(name="첨부 파일 변경", value="\n".join(attachment_changes_text), inline=False)
             elif fetched_original_attachments and not after.attachments:
-                all_removed_info = []
-                for attachment in fetched_original_attachments:
-                    result = await self._send_attachment_to_log(log_channel, attachment, before.id, before.guild.id,
-                                                                "모두 삭제된 첨부 파일: ")
-                    all_removed_info.append(result)
+                all_removed_info = await self._log_attachments(fetched_original_attachments, before.id,
+                                                               before.guild.id, "모두 삭제된 첨부 파일: ", files)
                 embed.add_field(name="첨부 파일 변경", value=f"**모든 첨부 파일 삭제됨:**\n" + '\n'.join(all_removed_info),
                                 inline=False)
             elif not fetched_original_attachments and after.attachments:
@@ -415,7 +574,13 @@ class MessageLogCog(commands.Cog):
                 embed.set_thumbnail(url=author_avatar_url)
             embed.url = after.jump_url  # Link to the edited message
 
-            await log_channel.send(embed=embed)
+            self.log_batcher.enqueue(log_channel, embed, files)
+            if content_changed:
+                # An unknown original is archived as NULL, not as the embed's placeholder text
+                await self.archive.archive([self.archive.entry(
+                    before, 'edit', after_content,
+                    content=fetched_original_content if original_content_known else None
+                )])
             # FIX: Add guild_id to log message
             self.logger.info(
                 f"{before.channel.name if before.channel else '알 수 없는 채널'}에서 {author_mention}의 수정된 메시지를 기록했습니다. (서버: {before.guild.name})", extra={'guild_id': before.guild.id})
@@ -427,6 +592,127 @@ class MessageLogCog(commands.Cog):
             # FIX: Add guild_id to log message
             self.logger.error(f"수정된 메시지 로깅 중 오류 발생 (서버: {before.guild.name}): {e}\n{traceback.format_exc()}", extra={'guild_id': before.guild.id})
 
+    @app_commands.command(name="메시지검색", description="삭제/수정된 메시지 기록을 검색합니다.")
+    @app_commands.describe(
+        text="검색할 내용 (단어 앞부분만 입력해도 검색됩니다)",
+        user="작성자",
+        channel="채널",
+        from_date="시작 날짜 (YYYY-MM-DD)",
+        to_date="종료 날짜 (YYYY-MM-DD, 포함)"
+    )
+    @app_commands.default_permissions(manage_messages=True)
+    async def search_messages(self, interaction: discord.Interaction, text: str = None,
+                              user: discord.User = None, channel: discord.abc.GuildChannel = None,
+                              from_date: str = None, to_date: str = None):
+        await interaction.response.defer(ephemeral=True)
+
+        eastern = pytz.timezone('America/New_York')
+        try:
+            since = eastern.localize(datetime.strptime(from_date, '%Y-%m-%d')) if from_date else None
+            until = eastern.localize(datetime.strptime(to_date, '%Y-%m-%d')) + timedelta(days=1) if to_date else None
+        except ValueError:
+            await interaction.followup.send("❌ 날짜는 `YYYY-MM-DD` 형식으로 입력해주세요.", ephemeral=True)
+            return
+
+        filters = dict(
+            author_id=user.id if user else None,
+            channel_id=channel.id if channel else None,
+            text=text, since=since, until=until
+        )
+        guild = interaction.guild
+
+        async def fetch_page(cursor):
+            return await self.archive.search(guild.id, cursor=cursor, **filters)
+
+        try:
+            rows, next_cursor = await fetch_page(None)
+        except Exception as e:
+            self.logger.error(f"메시지 검색 실패: {e}\n{traceback.format_exc()}", extra={'guild_id': guild.id})
+            await interaction.followup.send("❌ 메시지 검색 중 오류가 발생했습니다.", ephemeral=True)
+            return
+
+        if not rows:
+            await interaction.followup.send("🔍 조건에 맞는 메시지 기록이 없습니다.", ephemeral=True)
+            return
+
+        summary = " · ".join(part for part in (
+            f"내용: {text}" if text else None,
+            f"작성자: {user}" if user else None,
+            f"채널: #{channel.name}" if channel else None,
+            f"{from_date or '처음'} ~ {to_date or '현재'}" if from_date or to_date else None
+        ) if part) or "전체"
+
+        def render_page(page_rows, page: int) -> discord.Embed:
+            return self.render_search_page(guild, page_rows, page, summary)
+
+        if next_cursor is None:
+            await interaction.followup.send(embed=render_page(rows, 1), ephemeral=True)
+            return
+
+        view = KeysetPageView(interaction.user.id, fetch_page, render_page, next_cursor)
+        await interaction.followup.send(embed=render_page(rows, 1), view=view, ephemeral=True)
+
+    def render_search_page(self, guild: discord.Guild, rows, page: int, summary: str) -> discord.Embed:
+        event_labels = {'delete': '🗑️ 삭제', 'bulk_delete': '🧹 일괄 삭제', 'edit': '✏️ 수정'}
+
+        def clip(value: Optional[str], length: int = 300) -> str:
+            if not value:
+                return "*내용 없음*"
+            return value if len(value) <= length else value[:length - 3] + "..."
+
+        embed = discord.Embed(
+            title="🔍 메시지 기록 검색",
+            description=f"검색 조건: {summary}",
+            color=discord.Color.blue()
+        )
+        for row in rows:
+            channel = guild.get_channel_or_thread(row['channel_id'])
+            author = f"<@{row['author_id']}>" if row['author_id'] else (row['author_name'] or "알 수 없는 사용자")
+            value = f"{author} · {channel.mention if channel else row['channel_id']} · <t:{int(row['archived_at'].timestamp())}:f>\n"
+            if row['event'] == 'edit':
+                value += f"**이전:** {clip(row['content'], 200)}\n**이후:** {clip(row['new_content'], 200)}"
+            else:
+                value += clip(row['content'])
+            if row['attachments']:
+                value += f"\n📎 첨부 {len(row['attachments'])}개"
+            embed.add_field(name=f"{event_labels.get(row['event'], row['event'])} · 메시지 {row['message_id']}",
+                            value=value, inline=False)
+        embed.set_footer(text=f"페이지 {page} • 페이지당 최대 {SEARCH_PAGE_SIZE}개")
+        return embed
+
+    @app_commands.command(name="미디어저장소", description="메시지 기록 미디어 저장소 사용량을 확인합니다.")
+    @app_commands.default_permissions(administrator=True)
+    async def media_storage_report(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            report = await self.media_store.usage_report(interaction.guild.id)
+        except Exception as e:
+            self.logger.error(f"미디어 저장소 사용량 조회 실패: {e}\n{traceback.format_exc()}", extra={'guild_id': interaction.guild.id})
+            await interaction.followup.send("❌ 저장소 사용량을 불러오는 중 오류가 발생했습니다.", ephemeral=True)
+            return
+
+        def mb(value: int) -> str:
+            return f"{value / 1024 / 1024:,.1f}MB"
+
+        stored, original, referenced = report['stored_bytes'], report['original_bytes'], report['referenced_bytes']
+        usage = stored / report['quota_bytes'] * 100 if report['quota_bytes'] else 0
+
+        embed = discord.Embed(
+            title="🗄️ 미디어 저장소 사용량",
+            color=discord.Color.blue(),
+            timestamp=datetime.now(timezone.utc)
+        )
+        embed.add_field(name="사용량", value=f"{mb(stored)} / {mb(report['quota_bytes'])} ({usage:.1f}%)", inline=False)
+        embed.add_field(name="파일", value=f"고유 파일 {report['blob_count']:,}개\n기록된 첨부 {report['ref_count']:,}개", inline=True)
+        embed.add_field(name="중복 제거 절약", value=mb(max(referenced - original, 0)), inline=True)
+        embed.add_field(name="압축 절약", value=f"{mb(max(original - stored, 0))} ({report['compressed_count']:,}개 압축)", inline=True)
+        embed.add_field(name="보존 기간", value=f"{report['retention_days']}일", inline=True)
+        if report['oldest_used_at']:
+            embed.add_field(name="가장 오래된 파일", value=f"<t:{int(report['oldest_used_at'].timestamp())}:R>", inline=True)
+        embed.set_footer(text=f"서버: {interaction.guild.name}")
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
 
 async def setup(bot):
     await bot.add_cog(MessageLogCog(bot))
\ No newline at end of file
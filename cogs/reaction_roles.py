@@ -91,12 +91,12 @@ class ReactionRoles(commands.Cog):
 
                 for emoji_key_in_map in emoji_role_map.keys():
                     if emoji_key_in_map in existing_emoji_keys:
-                        self.logger.debug(f"이모지 {emoji_key_in_map}은(는) 메시지 {message_id}에 이미 존재합니다. (서버: {guild.name})",
+                        self.logger.debug("이모지 %s은(는) 메시지 %s에 이미 존재합니다. (서버: %s)", emoji_key_in_map, message_id, guild.name,
                                           extra={'guild_id': guild.id})
                         continue
                     try:
                         await message.add_reaction(emoji_key_in_map)
-                        self.logger.debug(f"➕ 이모지 {emoji_key_in_map}을(를) 메시지 {message_id}에 추가했습니다. (서버: {guild.name})",
+                        self.logger.debug("➕ 이모지 %s을(를) 메시지 %s에 추가했습니다. (서버: %s)", emoji_key_in_map, message_id, guild.name,
                                           extra={'guild_id': guild.id})
                         await asyncio.sleep(0.5)
                     except discord.HTTPException as e:
@@ -144,7 +144,7 @@ class ReactionRoles(commands.Cog):
                 continue
             except discord.Forbidden:
                 self.logger.debug(
-                    f"권한 부족으로 채널 #{channel.name} ({channel.id})에서 메시지 {message_id}를 가져올 수 없습니다. (서버: {guild.name})",
+                    "권한 부족으로 채널 #%s (%s)에서 메시지 %s를 가져올 수 없습니다. (서버: %s)", channel.name, channel.id, message_id, guild.name,
                     extra={'guild_id': guild.id})
                 continue
             except Exception as e:
@@ -162,7 +162,8 @@ class ReactionRoles(commands.Cog):
             return
 
         self.logger.debug(
-            f"Raw reaction add: User {payload.user_id}, Message {payload.message_id}, Emoji {payload.emoji}, Guild {payload.guild_id}",
+            "Raw reaction add: User %s, Message %s, Emoji %s, Guild %s",
+            payload.user_id, payload.message_id, payload.emoji, payload.guild_id,
             extra={'guild_id': guild.id})
 
         if payload.user_id == self.bot.user.id or (payload.member and payload.member.bot):
@@ -243,7 +244,7 @@ class ReactionRoles(commands.Cog):
         reaction_role_map = get_reaction_roles(guild.id)
 
         if payload.message_id not in reaction_role_map:
-            self.logger.debug(f"Message {payload.message_id} not in reaction role map for guild {guild.name}",
+            self.logger.debug("Message %s not in reaction role map for guild %s", payload.message_id, guild.name,
                               extra={'guild_id': guild.id})
             return
 
@@ -253,9 +254,9 @@ class ReactionRoles(commands.Cog):
         else:
             emoji_key = str(payload.emoji)
 
-        self.logger.debug(f"Looking for emoji key: '{emoji_key}' in message {payload.message_id} (서버: {guild.name})",
+        self.logger.debug("Looking for emoji key: '%s' in message %s (서버: %s)", emoji_key, payload.message_id, guild.name,
                           extra={'guild_id': guild.id})
-        self.logger.debug(f"Available keys: {list(reaction_role_map[payload.message_id].keys())}",
+        self.logger.debug("Available keys: %s", reaction_role_map[payload.message_id].keys(),
                           extra={'guild_id': guild.id})
 
         role_id = reaction_role_map[payload.message_id].get(emoji_key)
@@ -267,13 +268,13 @@ class ReactionRoles(commands.Cog):
                 role_id = reaction_role_map[payload.message_id].get(fallback_key)
                 if role_id:
                     emoji_key = fallback_key
-                    self.logger.debug(f"Found role using fallback key: {fallback_key} (서버: {guild.name})",
+                    self.logger.debug("Found role using fallback key: %s (서버: %s)", fallback_key, guild.name,
                                       extra={'guild_id': guild.id})
 
         if not role_id:
             self.logger.warning(f"메시지 {payload.message_id}에서 알 수 없는 이모지 '{emoji_key}'에 반응 추가됨. (서버: {guild.name})",
                                 extra={'guild_id': guild.id})
-            self.logger.debug(f"Available emoji keys in map: {list(reaction_role_map[payload.message_id].keys())}",
+            self.logger.debug("Available emoji keys in map: %s", reaction_role_map[payload.message_id].keys(),
                               extra={'guild_id': guild.id})
             return
 
@@ -306,7 +307,7 @@ class ReactionRoles(commands.Cog):
             return
 
         if role in member.roles:
-            self.logger.debug(f"사용자 {member.display_name}이(가) 이미 역할 '{role.name}'을(를) 가지고 있습니다. (서버: {guild.name})",
+            self.logger.debug("사용자 %s이(가) 이미 역할 '%s'을(를) 가지고 있습니다. (서버: %s)", member.display_name, role.name, guild.name,
                               extra={'guild_id': guild.id})
             return
 
@@ -368,7 +369,7 @@ class ReactionRoles(commands.Cog):
             role_id = reaction_role_map[payload.message_id].get(fallback_key)
 
         if not role_id:
-            self.logger.debug(f"메시지 {payload.message_id}에서 알 수 없는 이모지 '{emoji_key}' 반응 제거됨. (서버: {guild.name})",
+            self.logger.debug("메시지 %s에서 알 수 없는 이모지 '%s' 반응 제거됨. (서버: %s)", payload.message_id, emoji_key, guild.name,
                               extra={'guild_id': guild.id})
             return
 
@@ -399,7 +400,7 @@ class ReactionRoles(commands.Cog):
             return
 
         if role not in member.roles:
-            self.logger.debug(f"사용자 {member.display_name}이(가) 역할 '{role.name}'을(를) 가지고 있지 않습니다. (서버: {guild.name})",
+            self.logger.debug("사용자 %s이(가) 역할 '%s'을(를) 가지고 있지 않습니다. (서버: %s)", member.display_name, role.name, guild.name,
                               extra={'guild_id': guild.id})
             return
 
@@ -0,0 +1,275 @@
+# cogs/scheduler.py - Persistent exact-time job scheduler shared by cogs
+from discord.ext import commands
+import asyncio
+import heapq
+import itertools
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+# A handler receives the job's payload dict when the job comes due
+JobHandler = Callable[[dict], Awaitable[None]]
+
+# Longest single sleep; bounds drift from wall clock changes on very distant deadlines
+MAX_SLEEP_SECONDS = 3600
+# Failed handlers back off exponentially from RETRY_DELAY; after MAX_ATTEMPTS the job is parked
+RETRY_DELAY = timedelta(minutes=5)
+MAX_RETRY_DELAY = timedelta(hours=6)
+MAX_ATTEMPTS = 8
+
+
+class JobSchedulerCog(commands.Cog):
+    """Exact-time jobs for deadlines that cogs used to discover by polling.
+
+    A cog registers a handler per job type and schedules keyed jobs at absolute
+    times (betting close, warning expiry, booster expiry, loan due dates). Jobs
+    are stored in scheduled_jobs so they survive restarts; at startup every stored
+    job is loaded and anything that came due while the bot was down runs right
+    away. In memory, one dispatcher task sleeps until the earliest deadline in a
+    min-heap, so an idle bot costs no queries at all.
+
+    Scheduling an existing key replaces that job, and a job's row is only removed
+    once its handler succeeds. A failed handler is retried with exponential backoff
+    starting at RETRY_DELAY; after MAX_ATTEMPTS failures the row is parked (kept
+    with parked_at and last_error set, but no longer loaded or run) so a job whose
+    channel or cog is gone stops retrying.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.logger = get_logger("작업 스케줄러")
+        self.handlers: Dict[str, JobHandler] = {}
+
+        self.jobs: Dict[str, dict] = {}  # job_key -> {'job_type', 'run_at', 'payload', 'attempts'}
+        self.heap: List[Tuple[float, int, str]] = []  # (run_at timestamp, seq, job_key)
+        self.parked: Dict[str, List[str]] = {}  # job_type -> keys due before a handler was registered
+        self.seq = itertools.count()
+
+        self.wakeup = asyncio.Event()
+        self.ready = asyncio.Event()
+        self.dispatcher_task: Optional[asyncio.Task] = None
+
+        self.logger.info("작업 스케줄러가 초기화되었습니다.")
+        self.bot.loop.create_task(self.initialize())
+
+    async def initialize(self):
+        """Wait for bot to be ready, prepare the jobs table and load stored jobs"""
+        await self.bot.wait_until_ready()
+        if self.bot.pool:
+            await self.setup_database()
+            await self.load_jobs()
+        else:
+            self.logger.warning("데이터베이스가 없어 예약 작업이 메모리에만 유지됩니다.")
+
+        self.ready.set()
+        self.dispatcher_task = self.bot.loop.create_task(self.dispatch_loop())
+
+    def cog_unload(self):
+        if self.dispatcher_task:
+            self.dispatcher_task.cancel()
+
+    async def setup_database(self):
+        """Create the jobs table"""
+        try:
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS scheduled_jobs (
+                    job_key VARCHAR(128) PRIMARY KEY,
+                    job_type VARCHAR(64) NOT NULL,
+                    guild_id BIGINT,
+                    run_at TIMESTAMPTZ NOT NULL,
+                    payload JSONB,
+                    created_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                ALTER TABLE scheduled_jobs ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+                ALTER TABLE scheduled_jobs ADD COLUMN IF NOT EXISTS last_error TEXT;
+                ALTER TABLE scheduled_jobs ADD COLUMN IF NOT EXISTS parked_at TIMESTAMPTZ;
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scheduled_jobs_run_at ON scheduled_jobs(run_at);
+            """)
+
+            self.logger.info("✅ 예약 작업 테이블이 준비되었습니다.")
+        except Exception as e:
+            self.logger.error(f"❌ 예약 작업 테이블 설정 실패: {e}")
+
+    async def load_jobs(self):
+        """Load every stored job; overdue ones fire on the dispatcher's first pass"""
+        try:
+            rows = await self.bot.pool.fetch("""
+                SELECT job_key, job_type, run_at, payload, attempts FROM scheduled_jobs WHERE parked_at IS NULL
+            """)
+        except Exception as e:
+            self.logger.error(f"Error loading scheduled jobs: {e}")
+            return
+
+        now = datetime.now(timezone.utc)
+        overdue = 0
+        for row in rows:
+            payload = json.loads(row['payload']) if row['payload'] else {}
+            self._push(row['job_key'], row['job_type'], row['run_at'], payload, row['attempts'])
+            if row['run_at'] <= now:
+                overdue += 1
+
+        self.logger.info(f"예약 작업 {len(rows)}개를 불러왔습니다 (밀린 작업 {overdue}개).")
+
+    # --- public API -----------------------------------------------------------
+
+    def register_handler(self, job_type: str, handler: JobHandler):
+        """Register the coroutine that runs jobs of this type"""
+        self.handlers[job_type] = handler
+        parked = self.parked.pop(job_type, [])
+        for key in parked:
+            job = self.jobs.get(key)
+            if job:
+                self._push(key, job['job_type'], job['run_at'], job['payload'], job['attempts'])
+
+    async def schedule(self, job_type: str, key: str, run_at: datetime, payload: Optional[dict] = None,
+                       guild_id: Optional[int] = None):
+        """Schedule (or reschedule) the job with this key"""
+        await self.schedule_many(job_type, [(key, run_at, payload, guild_id)])
+
+    async def schedule_many(self, job_type: str, jobs: Iterable[Tuple[str, datetime, Optional[dict], Optional[int]]]):
+        """Schedule many jobs of one type with a single statement"""
+        jobs = [(key, self._aware(run_at), payload or {}, guild_id) for key, run_at, payload, guild_id in jobs]
+        if not jobs:
+            return
+
+        await self.ready.wait()
+        if self.bot.pool:
+            try:
+                await self.bot.pool.execute("""
+                    INSERT INTO scheduled_jobs (job_key, job_type, guild_id, run_at, payload)
+                    SELECT k, $1, g, r, p::jsonb
+                    FROM UNNEST($2::varchar[], $3::bigint[], $4::timestamptz[], $5::text[]) AS j(k, g, r, p)
+                    ON CONFLICT (job_key) DO UPDATE SET
+                        job_type = EXCLUDED.job_type,
+                        guild_id = EXCLUDED.guild_id,
+                        run_at = EXCLUDED.run_at,
+                        payload = EXCLUDED.payload,
+                        attempts = 0,
+                        last_error = NULL,
+                        parked_at = NULL
+                """, job_type, [j[0] for j in jobs], [j[3] for j in jobs], [j[1] for j in jobs],
+                    [json.dumps(j[2]) for j in jobs])
+            except Exception as e:
+                self.logger.error(f"Error storing {len(jobs)} {job_type} job(s): {e}")
+
+        for key, run_at, payload, _ in jobs:
+            self._push(key, job_type, run_at, payload)
+
+    async def cancel(self, key: str):
+        """Drop a pending job"""
+        self.jobs.pop(key, None)
+        if self.bot.pool:
+            try:
+                await self.bot.pool.execute("DELETE FROM scheduled_jobs WHERE job_key = $1", key)
+            except Exception as e:
+                self.logger.error(f"Error cancelling job {key}: {e}")
+
+    def pending_count(self, job_type: Optional[str] = None) -> int:
+        return sum(1 for job in self.jobs.values() if job_type is None or job['job_type'] == job_type)
+
+    # --- dispatcher -----------------------------------------------------------
+
+    @staticmethod
+    def _aware(run_at: datetime) -> datetime:
+        # Naive datetimes are taken as local time, matching datetime.now()
+        return run_at if run_at.tzinfo else run_at.astimezone()
+
+    @staticmethod
+    def _retry_delay(attempts: int) -> timedelta:
+        return min(RETRY_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+
+    def _push(self, key: str, job_type: str, run_at: datetime, payload: dict, attempts: int = 0):
+        self.jobs[key] = {'job_type': job_type, 'run_at': run_at, 'payload': payload, 'attempts': attempts}
+        heapq.heappush(self.heap, (run_at.timestamp(), next(self.seq), key))
+        self.wakeup.set()
+
+    async def dispatch_loop(self):
+        """Sleep until the earliest deadline, run what is due, repeat"""
+        while True:
+            now = datetime.now(timezone.utc).timestamp()
+            while self.heap and self.heap[0][0] <= now:
+                when, _, key = heapq.heappop(self.heap)
+                job = self.jobs.get(key)
+                if job is None or job['run_at'].timestamp() != when:
+                    continue  # Cancelled or rescheduled since this entry was pushed
+
+                if job['job_type'] not in self.handlers:
+                    self.parked.setdefault(job['job_type'], []).append(key)
+                    continue
+
+                del self.jobs[key]
+                self.bot.loop.create_task(self._run(key, job))
+
+            self.wakeup.clear()
+            timeout = min(self.heap[0][0] - now, MAX_SLEEP_SECONDS) if self.heap else None
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, key: str, job: dict):
+        try:
+            await self.handlers[job['job_type']](job['payload'])
+        except Exception as e:
+            if key in self.jobs:
+                return  # Rescheduled while the handler ran; the new job starts with a clean slate
+            await self._handle_failure(key, job, e)
+            return
+
+        if self.bot.pool:
+            try:
+                # Keep the row if the job was rescheduled while its handler ran
+                await self.bot.pool.execute(
+                    "DELETE FROM scheduled_jobs WHERE job_key = $1 AND run_at = $2", key, job['run_at']
+                )
+            except Exception as e:
+                self.logger.error(f"Error removing finished job {key}: {e}")
+
+    async def _handle_failure(self, key: str, job: dict, error: Exception):
+        """Retry a failed job with backoff, or park it once it has used up its attempts"""
+        attempts = job['attempts'] + 1
+        last_error = f"{type(error).__name__}: {error}"[:1000]
+
+        if attempts >= MAX_ATTEMPTS:
+            self.logger.error(f"Scheduled job {key} failed {attempts} times, parking it: {last_error}")
+            if self.bot.pool:
+                try:
+                    await self.bot.pool.execute("""
+                        UPDATE scheduled_jobs SET attempts = $3, last_error = $4, parked_at = NOW()
+                        WHERE job_key = $1 AND run_at = $2
+                    """, key, job['run_at'], attempts, last_error)
+                except Exception as update_error:
+                    self.logger.error(f"Error parking job {key}: {update_error}")
+            return
+
+        delay = self._retry_delay(attempts)
+        # Full traceback once; repeats of the same failure only get a line
+        self.logger.error(f"Scheduled job {key} failed (attempt {attempts}/{MAX_ATTEMPTS}), retrying in {delay}: "
+                          f"{last_error}", exc_info=attempts == 1)
+        retry_at = datetime.now(timezone.utc) + delay
+        self._push(key, job['job_type'], retry_at, job['payload'], attempts)
+        if self.bot.pool:
+            try:
+                await self.bot.pool.execute("""
+                    UPDATE scheduled_jobs SET run_at = $3, attempts = $4, last_error = $5
+                    WHERE job_key = $1 AND run_at = $2
+                """, key, job['run_at'], retry_at, attempts, last_error)
+            except Exception as update_error:
+                self.logger.error(f"Error rescheduling job {key}: {update_error}")
+
+
+def get_scheduler(bot) -> Optional[JobSchedulerCog]:
+    """Helper function for cogs to get the JobSchedulerCog instance"""
+    return bot.get_cog('JobSchedulerCog')
+
+
+async def setup(bot):
+    await bot.add_cog(JobSchedulerCog(bot))
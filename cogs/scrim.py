@@ -13,6 +13,15 @@ import traceback
 
 from utils.logger import get_logger
 from utils import config
+from utils.team_balance import balance_teams, rating_spread
+from cogs.scheduler import get_scheduler
+
+# Reminder events sent to full scrims before they start: (event, lead time)
+SCRIM_REMINDERS = (('10min', timedelta(minutes=10)), ('2min', timedelta(minutes=2)))
+SCRIM_REMINDER_TEXT = {'10min': "10분", '2min': "2분"}
+
+# Player rating = win rate in per mille, smoothed toward 50% by this many phantom games
+RATING_PRIOR_GAMES = 4
 
 
 class GameSelectView(discord.ui.View):
@@ -1259,8 +1268,7 @@ class PlayerCountSelectView(discord.ui.View):
             )
 
             # Update scrim data with message ID
-            scrim_data['message_id'] = message.id
-            await scrim_cog.save_scrims_data()
+            await scrim_cog.set_scrim_message(scrim_id, message.id)
 
             self.logger.info(f"Posted scrim message for {scrim_id} in #{channel.name}")
 
@@ -1570,6 +1578,24 @@ class ScrimView(discord.ui.View):
 
         await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
+    @discord.ui.button(label="팀 밸런스", style=discord.ButtonStyle.primary, custom_id="balance_scrim", emoji="⚖️")
+    async def balance_scrim(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.defer(ephemeral=True)
+        scrim_cog, scrim_data = await self._get_scrim_cog_and_data(interaction)
+        if not scrim_cog: return
+
+        is_organizer = interaction.user.id == scrim_data['organizer_id']
+        if not (is_organizer or scrim_cog.has_staff_permissions(interaction.user)):
+            await interaction.followup.send("❌ 팀을 나눌 권한이 없습니다.", ephemeral=True)
+            return
+
+        if len(scrim_data['participants']) < 2:
+            await interaction.followup.send("❌ 팀을 나누려면 최소 2명의 참가자가 필요합니다.", ephemeral=True)
+            return
+
+        embed = await scrim_cog.create_balance_embed(scrim_data)
+        await interaction.followup.send(embed=embed)
+
 
 class ScrimCreateView(discord.ui.View):
     """스타일이 개선된 지속적인 뷰"""
@@ -1611,39 +1637,184 @@ class ScrimCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.logger = get_logger("내부 매치")
+        # Working set of active and recently finished scrims; the scrims tables are the source of truth
         self.scrims_data: Dict[str, Dict] = {}
-        self.scrims_file = "data/scrims.json"
-        self.map_pools_file = "data/map_pools.json"
+        # Active scrims only (same dicts as scrims_data), so nothing walks finished history
+        self.active_scrims: Dict[str, Dict] = {}
         self.map_pools: Dict[int, List[str]] = {}
         self.default_valorant_maps = [
             "바인드", "헤이븐", "스플릿", "어센트", "아이스박스",
             "브리즈", "프랙처", "펄", "로터스", "선셋", "어비스"
         ]
-        self.bot.loop.create_task(self.after_bot_ready())
+        # Legacy JSON stores, imported once into Postgres
+        self.scrims_file = "data/scrims.json"
+        self.map_pools_file = "data/map_pools.json"
         self.scrim_records_file = "data/scrim_records.json"
-        self.scrim_records = {}
+        self.bot.loop.create_task(self.after_bot_ready())
 
     async def after_bot_ready(self):
         """Waits for the bot to be ready before starting tasks."""
         await self.bot.wait_until_ready()
+        await self.setup_database()
+        await self.migrate_json_data()
         await self.load_scrims_data()
-        # await self.migrate_timezone_data()  # Add this line
         await self.load_map_pools()
         self.setup_persistent_views()
         await self.setup_scrim_panels()
-        self.scrim_notifications.start()
+        await self.setup_scheduled_jobs()
         self.cleanup_old_scrims.start()
-        await self.load_scrim_records()
 
+    async def setup_database(self):
+        """Create the scrim tables"""
+        try:
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS scrims (
+                    scrim_id VARCHAR(16) PRIMARY KEY,
+                    guild_id BIGINT NOT NULL,
+                    organizer_id BIGINT NOT NULL,
+                    game TEXT NOT NULL,
+                    gamemode TEXT NOT NULL,
+                    tier_range TEXT NOT NULL,
+                    start_time TIMESTAMPTZ NOT NULL,
+                    max_players INTEGER NOT NULL,
+                    channel_id BIGINT,
+                    message_id BIGINT,
+                    status VARCHAR(16) NOT NULL DEFAULT '활성',
+                    notified_10min BOOLEAN NOT NULL DEFAULT FALSE,
+                    notified_2min BOOLEAN NOT NULL DEFAULT FALSE,
+                    created_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+
+            # Participants and queue share one table; queue order is insertion order
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS scrim_participants (
+                    scrim_id VARCHAR(16) NOT NULL REFERENCES scrims(scrim_id) ON DELETE CASCADE,
+                    user_id BIGINT NOT NULL,
+                    slot VARCHAR(12) NOT NULL,
+                    seq BIGINT GENERATED ALWAYS AS IDENTITY,
+                    PRIMARY KEY (scrim_id, user_id)
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS scrim_records (
+                    record_id VARCHAR(16) PRIMARY KEY,
+                    guild_id BIGINT NOT NULL,
+                    scrim_date DATE NOT NULL,
+                    games_played INTEGER NOT NULL,
+                    winners JSONB NOT NULL,
+                    participation_coins INTEGER NOT NULL,
+                    win_bonus INTEGER NOT NULL,
+                    recorded_by BIGINT NOT NULL,
+                    recorded_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS scrim_record_players (
+                    record_id VARCHAR(16) NOT NULL REFERENCES scrim_records(record_id) ON DELETE CASCADE,
+                    user_id BIGINT NOT NULL,
+                    team_name TEXT NOT NULL,
+                    PRIMARY KEY (record_id, user_id)
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS scrim_map_pools (
+                    guild_id BIGINT PRIMARY KEY,
+                    maps TEXT[] NOT NULL,
+                    updated_at TIMESTAMPTZ DEFAULT NOW()
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_scrims_guild_start ON scrims(guild_id, start_time);
+                CREATE INDEX IF NOT EXISTS idx_scrims_status_start ON scrims(status, start_time);
+                CREATE INDEX IF NOT EXISTS idx_scrim_records_guild_date ON scrim_records(guild_id, scrim_date DESC);
+                CREATE INDEX IF NOT EXISTS idx_scrim_record_players_user ON scrim_record_players(user_id, record_id);
+            """)
+
+            self.logger.info("✅ 내전 데이터베이스 테이블이 준비되었습니다.")
+        except Exception as e:
+            self.logger.error(f"❌ 내전 테이블 설정 실패: {e}", exc_info=True)
+
+    async def migrate_json_data(self):
+        """Import the legacy JSON stores into Postgres (once; the files are renamed afterwards)"""
+        try:
+            if os.path.exists(self.scrims_file):
+                with open(self.scrims_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                async with self.bot.pool.acquire() as conn:
+                    async with conn.transaction():
+                        for scrim_id, scrim in data.items():
+                            start_time = datetime.fromisoformat(scrim['start_time'].replace('Z', '+00:00'))
+                            created_at = datetime.fromisoformat(scrim['created_at'].replace('Z', '+00:00'))
+                            sent = scrim.get('notifications_sent', {})
+                            await conn.execute("""
+                                INSERT INTO scrims (scrim_id, guild_id, organizer_id, game, gamemode, tier_range,
+                                                    start_time, max_players, channel_id, message_id, status,
+                                                    notified_10min, notified_2min, created_at)
+                                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+                                ON CONFLICT (scrim_id) DO NOTHING
+                            """, scrim_id, scrim['guild_id'], scrim['organizer_id'], scrim['game'], scrim['gamemode'],
+                                scrim['tier_range'],
+                                start_time if start_time.tzinfo else start_time.replace(tzinfo=timezone.utc),
+                                scrim['max_players'], scrim.get('channel_id'), scrim.get('message_id'), scrim['status'],
+                                bool(sent.get('10min')), bool(sent.get('2min')),
+                                created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc))
+                            members = [(uid, 'participant') for uid in scrim.get('participants', [])]
+                            members += [(uid, 'queue') for uid in scrim.get('queue', [])]
+                            for user_id, slot in members:
+                                await conn.execute("""
+                                    INSERT INTO scrim_participants (scrim_id, user_id, slot) VALUES ($1, $2, $3)
+                                    ON CONFLICT (scrim_id, user_id) DO NOTHING
+                                """, scrim_id, int(user_id), slot)
+                os.replace(self.scrims_file, f"{self.scrims_file}.migrated")
+                self.logger.info(f"Imported {len(data)} scrims from {self.scrims_file}.")
+
+            if os.path.exists(self.scrim_records_file):
+                with open(self.scrim_records_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                for record_id, record in data.items():
+                    recorded_at = datetime.fromisoformat(record['recorded_at'])
+                    await self.insert_scrim_record(
+                        record_id, record['guild_id'], datetime.strptime(record['date'], '%Y-%m-%d').date(),
+                        record['games_played'], record['winners'], record['teams'], record['participation_coins'],
+                        record['win_bonus'], record['recorded_by'],
+                        recorded_at if recorded_at.tzinfo else recorded_at.replace(tzinfo=timezone.utc)
+                    )
+                os.replace(self.scrim_records_file, f"{self.scrim_records_file}.migrated")
+                self.logger.info(f"Imported {len(data)} scrim records from {self.scrim_records_file}.")
+
+            if os.path.exists(self.map_pools_file):
+                with open(self.map_pools_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                await self.bot.pool.execute("""
+                    INSERT INTO scrim_map_pools (guild_id, maps)
+                    SELECT guild_id, ARRAY(SELECT jsonb_array_elements_text(maps))
+                    FROM UNNEST($1::bigint[], $2::jsonb[]) AS m(guild_id, maps)
+                    ON CONFLICT (guild_id) DO NOTHING
+                """, [int(k) for k in data], [json.dumps(v, ensure_ascii=False) for v in data.values()])
+                os.replace(self.map_pools_file, f"{self.map_pools_file}.migrated")
+                self.logger.info(f"Imported map pools for {len(data)} guild(s) from {self.map_pools_file}.")
+        except Exception as e:
+            self.logger.error(f"Error importing legacy scrim JSON data: {e}", exc_info=True)
+
+    async def persist(self, query: str, *args):
+        """Run a single scrim write, logging instead of raising so interactions still get a reply"""
+        try:
+            await self.bot.pool.execute(query, *args)
+        except Exception as e:
+            self.logger.error(f"Error writing scrim data: {e}", exc_info=True)
 
     def setup_persistent_views(self):
         """Setup persistent views on bot startup"""
         try:
             self.bot.add_view(ScrimCreateView(self.bot))
-            for scrim_id, scrim_data in self.scrims_data.items():
-                if scrim_data['status'] == '활성':
-                    # Pass only the ID to reduce memory and ensure data is fresh
-                    self.bot.add_view(ScrimView(self.bot, scrim_id))
+            for scrim_id in self.active_scrims:
+                # Pass only the ID to reduce memory and ensure data is fresh
+                self.bot.add_view(ScrimView(self.bot, scrim_id))
             self.logger.info("Persistent views setup completed.")
         except Exception as e:
             self.logger.error(f"Error setting up persistent views: {e}", exc_info=True)
@@ -1657,47 +1828,6 @@ class ScrimCog(commands.Cog):
         if staff_role_id and discord.utils.get(member.roles, id=staff_role_id): return True
         return False
 
-    async def load_scrim_records(self):
-        """Load scrim records from file"""
-        try:
-            if os.path.exists(self.scrim_records_file):
-                with open(self.scrim_records_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Convert date strings back to date objects
-                    for record_id, record in data.items():
-                        if isinstance(record['date'], str):
-                            record['date'] = datetime.strptime(record['date'], '%Y-%m-%d').date()
-                        if isinstance(record['recorded_at'], str):
-                            record['recorded_at'] = datetime.fromisoformat(record['recorded_at'])
-                    self.scrim_records = data
-                self.logger.info("Successfully loaded scrim records.")
-        except Exception as e:
-            self.logger.error(f"Error loading scrim records: {e}", exc_info=True)
-            self.scrim_records = {}
-
-    async def save_scrim_records(self):
-        """Save scrim records to file"""
-        try:
-            os.makedirs(os.path.dirname(self.scrim_records_file), exist_ok=True)
-            data_to_save = {}
-
-            for record_id, record in self.scrim_records.items():
-                data_copy = record.copy()
-                # Convert date objects to strings for JSON serialization
-                if isinstance(data_copy['date'], date):
-                    data_copy['date'] = data_copy['date'].strftime('%Y-%m-%d')
-                if isinstance(data_copy['recorded_at'], datetime):
-                    data_copy['recorded_at'] = data_copy['recorded_at'].isoformat()
-                data_to_save[record_id] = data_copy
-
-            def write_file():
-                with open(self.scrim_records_file, 'w', encoding='utf-8') as f:
-                    json.dump(data_to_save, f, ensure_ascii=False, indent=2)
-
-            await asyncio.to_thread(write_file)
-        except Exception as e:
-            self.logger.error(f"Error saving scrim records: {e}", exc_info=True)
-
     async def refresh_scrim_panel_bottom(self, channel: discord.TextChannel):
         """Delete old scrim panel and create new one at bottom"""
         try:
@@ -1719,118 +1849,175 @@ class ScrimCog(commands.Cog):
                                   win_bonus: int, recorded_by: int) -> str:
         """Create a new scrim record"""
         try:
-            record_id = f"SR{random.randint(100000, 999999)}"
-            while record_id in self.scrim_records:
+            recorded_at = datetime.now(pytz.timezone('America/New_York'))
+            while True:
                 record_id = f"SR{random.randint(100000, 999999)}"
+                if await self.insert_scrim_record(record_id, guild_id, date, games_played, winners, teams,
+                                                  participation_coins, win_bonus, recorded_by, recorded_at):
+                    break
 
-            record = {
-                'id': record_id,
-                'guild_id': guild_id,
-                'date': date,
-                'games_played': games_played,
-                'winners': winners,
-                'teams': teams,
-                'participation_coins': participation_coins,
-                'win_bonus': win_bonus,
-                'recorded_by': recorded_by,
-                'recorded_at': datetime.now(pytz.timezone('America/New_York'))
-            }
-
-            self.scrim_records[record_id] = record
-            await self.save_scrim_records()
             self.logger.info(f"Created scrim record {record_id} for guild {guild_id}")
             return record_id
 
         except Exception as e:
             self.logger.error(f"Error creating scrim record: {e}", exc_info=True)
             return None
-    async def load_scrims_data(self):
-        try:
-            if os.path.exists(self.scrims_file):
-                with open(self.scrims_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
 
-                    for scrim_id, scrim_data in data.items():
-                        # Parse datetime strings and keep them as UTC
-                        start_time_str = scrim_data['start_time']
-                        created_at_str = scrim_data['created_at']
+    async def insert_scrim_record(self, record_id: str, guild_id: int, date: date, games_played: int,
+                                  winners: list, teams: dict, participation_coins: int, win_bonus: int,
+                                  recorded_by: int, recorded_at: datetime) -> bool:
+        """Insert a record and its players. Returns False if the record ID is already taken."""
+        players = {}
+        for team_name, user_ids in teams.items():
+            for user_id in user_ids:
+                players.setdefault(int(user_id), team_name)
+
+        async with self.bot.pool.acquire() as conn:
+            async with conn.transaction():
+                inserted = await conn.fetchval("""
+                    INSERT INTO scrim_records (record_id, guild_id, scrim_date, games_played, winners,
+                                               participation_coins, win_bonus, recorded_by, recorded_at)
+                    VALUES ($1, $2, $3, $4, $5::jsonb, $6, $7, $8, $9)
+                    ON CONFLICT (record_id) DO NOTHING
+                    RETURNING record_id
+                """, record_id, guild_id, date, games_played, json.dumps(winners, ensure_ascii=False),
+                    participation_coins, win_bonus, recorded_by, recorded_at)
+                if not inserted:
+                    return False
+
+                await conn.execute("""
+                    INSERT INTO scrim_record_players (record_id, user_id, team_name)
+                    SELECT $1, user_id, team_name FROM UNNEST($2::bigint[], $3::text[]) AS p(user_id, team_name)
+                """, record_id, list(players.keys()), list(players.values()))
+        return True
 
-                        start_time = datetime.fromisoformat(start_time_str.replace('Z', '+00:00'))
-                        created_at = datetime.fromisoformat(created_at_str.replace('Z', '+00:00'))
+    async def get_player_ratings(self, guild_id: int, user_ids: List[int]) -> Dict[int, int]:
+        """Ratings from this server's scrim records: smoothed game win rate in per mille (500 = no history)"""
+        ratings = {user_id: 500 for user_id in user_ids}
+        try:
+            rows = await self.bot.pool.fetch("""
+                SELECT p.user_id,
+                       SUM(r.games_played) AS games,
+                       SUM((SELECT COUNT(*) FROM jsonb_array_elements_text(r.winners) AS w(team)
+                            WHERE w.team = p.team_name)) AS wins
+                FROM scrim_record_players p
+                JOIN scrim_records r ON r.record_id = p.record_id
+                WHERE p.user_id = ANY($1::bigint[]) AND r.guild_id = $2
+                GROUP BY p.user_id
+            """, user_ids, guild_id)
+        except Exception as e:
+            self.logger.error(f"Error loading player ratings: {e}", exc_info=True)
+            return ratings
+
+        for row in rows:
+            games, wins = row['games'] or 0, row['wins'] or 0
+            ratings[row['user_id']] = round(1000 * (wins + RATING_PRIOR_GAMES / 2) / (games + RATING_PRIOR_GAMES))
+        return ratings
 
-                        # Ensure they're UTC timezone aware
-                        if start_time.tzinfo is None:
-                            start_time = start_time.replace(tzinfo=pytz.UTC)
-                        if created_at.tzinfo is None:
-                            created_at = created_at.replace(tzinfo=pytz.UTC)
+    async def create_balance_embed(self, scrim_data: Dict) -> discord.Embed:
+        """Suggested two-team split of a scrim's participants"""
+        ratings = await self.get_player_ratings(scrim_data['guild_id'], scrim_data['participants'])
+        teams = balance_teams(ratings)
 
-                        scrim_data['start_time'] = start_time
-                        scrim_data['created_at'] = created_at
+        embed = discord.Embed(
+            title="⚖️ 팀 밸런스 추천",
+            description=f"**{scrim_data['game']}** 내전 참가자 {len(ratings)}명을 지난 내전 승률 기준으로 나눴습니다.",
+            color=discord.Color.purple()
+        )
+        for name, team in zip(("🔵 1팀", "🔴 2팀"), teams):
+            total = sum(ratings[user_id] for user_id in team)
+            members = "\n".join(f"<@{user_id}> ({ratings[user_id] / 10:.1f}%)" for user_id in team)
+            embed.add_field(name=f"{name} · 합계 {total}", value=members or "-", inline=True)
+        embed.set_footer(text=f"점수 차이: {rating_spread(teams, ratings):g} • 기록이 없는 플레이어는 50%로 계산됩니다")
+        return embed
 
-                    self.scrims_data = data
-                self.logger.info("Successfully loaded scrims data.")
+    async def load_scrims_data(self):
+        """Load active and recently finished scrims with their participants and queues"""
+        try:
+            rows = await self.bot.pool.fetch("""
+                SELECT * FROM scrims
+                WHERE status = '활성' OR start_time >= NOW() - INTERVAL '7 days'
+            """)
+            members = await self.bot.pool.fetch("""
+                SELECT scrim_id, user_id, slot FROM scrim_participants
+                WHERE scrim_id = ANY($1::varchar[])
+                ORDER BY seq
+            """, [row['scrim_id'] for row in rows])
+
+            scrims = {row['scrim_id']: self.scrim_from_row(row) for row in rows}
+            for member in members:
+                scrim = scrims[member['scrim_id']]
+                key = 'participants' if member['slot'] == 'participant' else 'queue'
+                scrim[key].append(member['user_id'])
+
+            self.scrims_data = scrims
+            self.active_scrims = {scrim_id: scrim for scrim_id, scrim in scrims.items() if scrim['status'] == '활성'}
+            self.logger.info(f"Successfully loaded {len(scrims)} scrims.")
         except Exception as e:
             self.logger.error(f"Error loading scrims data: {e}", exc_info=True)
-    async def save_scrims_data(self):
-        """Saves scrims data to file asynchronously."""
-        try:
-            os.makedirs(os.path.dirname(self.scrims_file), exist_ok=True)
-            data_to_save = {}
 
-            for scrim_id, scrim_data in self.scrims_data.items():
-                data_copy = scrim_data.copy()
-
-                # Convert timezone-aware datetimes to UTC for storage
-                start_time = data_copy['start_time']
-                if start_time.tzinfo is None:
-                    # If somehow no timezone, assume it's Eastern and convert to UTC
-                    eastern = pytz.timezone('America/New_York')
-                    start_time = eastern.localize(start_time)
-                # Convert to UTC and store as ISO string
-                data_copy['start_time'] = start_time.astimezone(pytz.utc).isoformat()
-
-                created_at = data_copy['created_at']
-                if created_at.tzinfo is None:
-                    eastern = pytz.timezone('America/New_York')
-                    created_at = eastern.localize(created_at)
-                data_copy['created_at'] = created_at.astimezone(pytz.utc).isoformat()
-
-                data_to_save[scrim_id] = data_copy
-
-            def write_file():
-                with open(self.scrims_file, 'w', encoding='utf-8') as f:
-                    json.dump(data_to_save, f, ensure_ascii=False, indent=2)
-
-            await asyncio.to_thread(write_file)
-        except Exception as e:
-            self.logger.error(f"Error saving scrims data: {e}", exc_info=True)
+    @staticmethod
+    def scrim_from_row(row) -> Dict:
+        return {
+            'id': row['scrim_id'],
+            'guild_id': row['guild_id'],
+            'organizer_id': row['organizer_id'],
+            'game': row['game'],
+            'gamemode': row['gamemode'],
+            'tier_range': row['tier_range'],
+            'start_time': row['start_time'],
+            'max_players': row['max_players'],
+            'channel_id': row['channel_id'],
+            'participants': [],
+            'queue': [],
+            'status': row['status'],
+            'created_at': row['created_at'],
+            'notifications_sent': {'10min': row['notified_10min'], '2min': row['notified_2min']},
+            'message_id': row['message_id']
+        }
+
+    async def set_scrim_message(self, scrim_id: str, message_id: int):
+        """Remember the posted message of a scrim"""
+        scrim_data = self.scrims_data.get(scrim_id)
+        if scrim_data:
+            scrim_data['message_id'] = message_id
+        await self.persist("UPDATE scrims SET message_id = $2 WHERE scrim_id = $1", scrim_id, message_id)
+
+    async def set_scrim_status(self, scrim_id: str, status: str):
+        scrim_data = self.scrims_data.get(scrim_id)
+        if scrim_data:
+            scrim_data['status'] = status
+        if status != '활성' and self.active_scrims.pop(scrim_id, None):
+            await self.cancel_scrim_events(scrim_id)
+        await self.persist("UPDATE scrims SET status = $2 WHERE scrim_id = $1", scrim_id, status)
+
+    async def mark_notification_sent(self, scrim_id: str, notification: str):
+        """Flag a reminder ('10min' or '2min') as sent"""
+        scrim_data = self.scrims_data.get(scrim_id)
+        if scrim_data:
+            scrim_data.setdefault('notifications_sent', {})[notification] = True
+        column = {'10min': 'notified_10min', '2min': 'notified_2min'}[notification]
+        await self.persist(f"UPDATE scrims SET {column} = TRUE WHERE scrim_id = $1", scrim_id)
 
     async def load_map_pools(self):
         try:
-            if os.path.exists(self.map_pools_file):
-                with open(self.map_pools_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.map_pools = {int(k): v for k, v in data.items()}
-                self.logger.info("Successfully loaded map pools data.")
+            rows = await self.bot.pool.fetch("SELECT guild_id, maps FROM scrim_map_pools")
+            self.map_pools = {row['guild_id']: list(row['maps']) for row in rows}
+            self.logger.info("Successfully loaded map pools data.")
         except Exception as e:
             self.logger.error(f"Error loading map pools: {e}", exc_info=True)
             self.map_pools = {}
 
-    async def save_map_pools(self):
-        try:
-            os.makedirs(os.path.dirname(self.map_pools_file), exist_ok=True)
-            with open(self.map_pools_file, 'w', encoding='utf-8') as f:
-                json.dump(self.map_pools, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            self.logger.error(f"Error saving map pools: {e}", exc_info=True)
-
     def get_map_pool(self, guild_id: int) -> List[str]:
         return self.map_pools.get(guild_id, self.default_valorant_maps.copy())
 
     async def update_map_pool(self, guild_id: int, maps: List[str]) -> bool:
         try:
+            await self.bot.pool.execute("""
+                INSERT INTO scrim_map_pools (guild_id, maps, updated_at) VALUES ($1, $2, NOW())
+                ON CONFLICT (guild_id) DO UPDATE SET maps = EXCLUDED.maps, updated_at = NOW()
+            """, guild_id, maps)
             self.map_pools[guild_id] = maps
-            await self.save_map_pools()
             self.logger.info(f"Updated map pool for guild {guild_id}.")
             return True
         except Exception as e:
@@ -1889,9 +2076,26 @@ class ScrimCog(commands.Cog):
                            start_time: datetime, max_players: int, channel_id: int) -> Optional[str]:
         """Creates a new scrim, saves it, and returns its ID."""
         try:
-            scrim_id = str(random.randint(100000, 999999))
-            while scrim_id in self.scrims_data:
+            while True:
                 scrim_id = str(random.randint(100000, 999999))
+                if scrim_id in self.scrims_data:
+                    continue
+                async with self.bot.pool.acquire() as conn:
+                    async with conn.transaction():
+                        inserted = await conn.fetchval("""
+                            INSERT INTO scrims (scrim_id, guild_id, organizer_id, game, gamemode, tier_range,
+                                                start_time, max_players, channel_id)
+                            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                            ON CONFLICT (scrim_id) DO NOTHING
+                            RETURNING scrim_id
+                        """, scrim_id, guild_id, organizer_id, game, gamemode, tier_range, start_time,
+                            max_players, channel_id)
+                        if inserted:
+                            await conn.execute("""
+                                INSERT INTO scrim_participants (scrim_id, user_id, slot) VALUES ($1, $2, 'participant')
+                            """, scrim_id, organizer_id)
+                if inserted:
+                    break
 
             scrim_data = {
                 'id': scrim_id,
@@ -1912,7 +2116,8 @@ class ScrimCog(commands.Cog):
                 'message_id': None
             }
             self.scrims_data[scrim_id] = scrim_data
-            await self.save_scrims_data()
+            self.active_scrims[scrim_id] = scrim_data
+            await self.schedule_scrim_events(scrim_data)
             self.logger.info(f"New scrim created: {scrim_id} in guild {guild_id}")
             return scrim_id
         except Exception as e:
@@ -1933,8 +2138,7 @@ class ScrimCog(commands.Cog):
 
             message = await channel.send(content=content, embed=embed, view=view)
 
-            scrim_data['message_id'] = message.id
-            await self.save_scrims_data()
+            await self.set_scrim_message(scrim_id, message.id)
             self.logger.info(f"Posted message for scrim {scrim_id} in #{channel.name}")
 
         except Exception as e:
@@ -2054,72 +2258,91 @@ class ScrimCog(commands.Cog):
     @app_commands.command(name="내전기록", description="내전 기록을 조회합니다.")
     @app_commands.describe(
         days="최근 며칠간의 기록을 볼지 설정 (기본값: 7일)",
-        record_id="특정 기록 ID로 조회"
+        record_id="특정 기록 ID로 조회",
+        user="특정 참가자의 기록만 조회"
     )
     async def scrim_history(self, interaction: discord.Interaction,
                             days: app_commands.Range[int, 1, 30] = 7,
-                            record_id: str = None):
+                            record_id: str = None,
+                            user: discord.Member = None):
         await interaction.response.defer(ephemeral=True)
 
-        guild_records = []
-
-        if record_id:
-            # Search for specific record
-            record = self.scrim_records.get(record_id)
-            if record and record['guild_id'] == interaction.guild.id:
-                guild_records.append(record)
+        try:
+            if record_id:
+                # Search for specific record
+                rows = await self.bot.pool.fetch("""
+                    SELECT r.*, COUNT(*) OVER () AS total_count
+                    FROM scrim_records r
+                    WHERE r.record_id = $1 AND r.guild_id = $2
+                """, record_id, interaction.guild.id)
+                if not rows:
+                    await interaction.followup.send(f"❌ 기록 ID `{record_id}`를 찾을 수 없습니다.", ephemeral=True)
+                    return
             else:
-                await interaction.followup.send(f"❌ 기록 ID `{record_id}`를 찾을 수 없습니다.", ephemeral=True)
-                return
-        else:
-            # Get recent records
-            cutoff_date = datetime.now().date() - timedelta(days=days)
-            for record in self.scrim_records.values():
-                if (record['guild_id'] == interaction.guild.id and
-                        record['date'] >= cutoff_date):
-                    guild_records.append(record)
-
-        if not guild_records:
+                # Recent records (newest first), optionally only those the user played in
+                cutoff_date = datetime.now().date() - timedelta(days=days)
+                rows = await self.bot.pool.fetch("""
+                    SELECT r.*, COUNT(*) OVER () AS total_count
+                    FROM scrim_records r
+                    WHERE r.guild_id = $1 AND r.scrim_date >= $2
+                      AND ($3::bigint IS NULL OR EXISTS (
+                          SELECT 1 FROM scrim_record_players p
+                          WHERE p.record_id = r.record_id AND p.user_id = $3
+                      ))
+                    ORDER BY r.scrim_date DESC, r.recorded_at DESC
+                    LIMIT 5
+                """, interaction.guild.id, cutoff_date, user.id if user else None)
+
+            player_counts = {}
+            if rows:
+                counts = await self.bot.pool.fetch("""
+                    SELECT record_id, COUNT(*) AS players
+                    FROM scrim_record_players
+                    WHERE record_id = ANY($1::varchar[])
+                    GROUP BY record_id
+                """, [row['record_id'] for row in rows])
+                player_counts = {row['record_id']: row['players'] for row in counts}
+        except Exception as e:
+            self.logger.error(f"Error fetching scrim history: {e}", exc_info=True)
+            await interaction.followup.send("❌ 내전 기록을 불러오는 중 오류가 발생했습니다.", ephemeral=True)
+            return
+
+        if not rows:
             period_text = f"최근 {days}일간" if not record_id else "해당 ID의"
+            if user:
+                period_text += f" {user.display_name}님의"
             await interaction.followup.send(f"📝 {period_text} 내전 기록이 없습니다.", ephemeral=True)
             return
 
-        # Sort by date (newest first)
-        guild_records.sort(key=lambda x: x['date'], reverse=True)
-
+        total_count = rows[0]['total_count']
         embed = discord.Embed(
-            title="📊 내전 기록",
-            description=f"총 {len(guild_records)}개의 기록이 있습니다.",
+            title="📊 내전 기록" if not user else f"📊 {user.display_name}님의 내전 기록",
+            description=f"총 {total_count}개의 기록이 있습니다.",
             color=discord.Color.blue()
         )
 
-        for record in guild_records[:5]:  # Show max 5 records
-            # Calculate team stats
-            all_players = set()
-            for team_members in record['teams'].values():
-                all_players.update(team_members)
-
+        for record in rows:
             # Count wins per team
             team_wins = {}
-            for winner in record['winners']:
+            for winner in json.loads(record['winners']):
                 team_wins[winner] = team_wins.get(winner, 0) + 1
 
             field_value = (
-                f"**날짜:** {record['date']}\n"
+                f"**날짜:** {record['scrim_date']}\n"
                 f"**게임 수:** {record['games_played']}\n"
-                f"**참가자:** {len(all_players)}명\n"
+                f"**참가자:** {player_counts.get(record['record_id'], 0)}명\n"
                 f"**팀 승수:** {', '.join([f'{team}: {wins}승' for team, wins in team_wins.items()])}\n"
                 f"**기록자:** <@{record['recorded_by']}>"
             )
 
             embed.add_field(
-                name=f"🎮 기록 {record['id']}",
+                name=f"🎮 기록 {record['record_id']}",
                 value=field_value,
                 inline=False
             )
 
-        if len(guild_records) > 5:
-            embed.set_footer(text=f"더 많은 기록이 있습니다. 총 {len(guild_records)}개 중 5개만 표시")
+        if total_count > 5:
+            embed.set_footer(text=f"더 많은 기록이 있습니다. 총 {total_count}개 중 5개만 표시")
 
         await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -2132,8 +2355,12 @@ class ScrimCog(commands.Cog):
 
         if user_id in scrim_data['queue']: scrim_data['queue'].remove(user_id)
         scrim_data['participants'].append(user_id)
-        await self.save_scrims_data()
+        await self.persist("""
+            INSERT INTO scrim_participants (scrim_id, user_id, slot) VALUES ($1, $2, 'participant')
+            ON CONFLICT (scrim_id, user_id) DO UPDATE SET slot = 'participant'
+        """, scrim_id, user_id)
         self.logger.info(f"User {user_id} joined scrim {scrim_id}.")
+        self.on_scrim_filled(scrim_id)
         return True, "✅ 내전에 성공적으로 참가했습니다!"
 
     async def leave_scrim(self, user_id: int, scrim_id: str) -> tuple[bool, str]:
@@ -2142,10 +2369,14 @@ class ScrimCog(commands.Cog):
         if user_id not in scrim_data['participants']: return False, "❌ 참가 중이 아닙니다."
 
         scrim_data['participants'].remove(user_id)
+        await self.persist("DELETE FROM scrim_participants WHERE scrim_id = $1 AND user_id = $2", scrim_id, user_id)
 
         if scrim_data['queue'] and len(scrim_data['participants']) < scrim_data['max_players']:
             next_user_id = scrim_data['queue'].pop(0)
             scrim_data['participants'].append(next_user_id)
+            await self.persist("""
+                UPDATE scrim_participants SET slot = 'participant' WHERE scrim_id = $1 AND user_id = $2
+            """, scrim_id, next_user_id)
             guild = self.bot.get_guild(scrim_data['guild_id'])
             if guild:
                 member = guild.get_member(next_user_id)
@@ -2154,8 +2385,8 @@ class ScrimCog(commands.Cog):
                         await member.send(f"**{scrim_data['game']}** 내전에 자리가 생겨 대기열에서 자동으로 이동되었습니다!")
                     except discord.Forbidden:
                         pass  # Can't DM user
+            self.on_scrim_filled(scrim_id)
 
-        await self.save_scrims_data()
         self.logger.info(f"User {user_id} left scrim {scrim_id}.")
         return True, "✅ 내전에서 성공적으로 나갔습니다."
 
@@ -2168,7 +2399,10 @@ class ScrimCog(commands.Cog):
         if len(scrim_data['participants']) < scrim_data['max_players']: return False, "❌ 아직 자리가 남아 있습니다. 직접 참가해주세요."
 
         scrim_data['queue'].append(user_id)
-        await self.save_scrims_data()
+        await self.persist("""
+            INSERT INTO scrim_participants (scrim_id, user_id, slot) VALUES ($1, $2, 'queue')
+            ON CONFLICT (scrim_id, user_id) DO NOTHING
+        """, scrim_id, user_id)
         self.logger.info(f"User {user_id} joined queue for scrim {scrim_id}.")
         return True, f"✅ 대기열에 성공적으로 가입했습니다! (현재 위치: {len(scrim_data['queue'])})"
 
@@ -2178,7 +2412,7 @@ class ScrimCog(commands.Cog):
         if user_id not in scrim_data['queue']: return False, "❌ 대기열에 없습니다."
 
         scrim_data['queue'].remove(user_id)
-        await self.save_scrims_data()
+        await self.persist("DELETE FROM scrim_participants WHERE scrim_id = $1 AND user_id = $2", scrim_id, user_id)
         self.logger.info(f"User {user_id} left queue for scrim {scrim_id}.")
         return True, "✅ 대기열에서 성공적으로 나갔습니다."
 
@@ -2186,8 +2420,7 @@ class ScrimCog(commands.Cog):
         scrim_data = self.scrims_data.get(scrim_id)
         if not scrim_data: return False
 
-        scrim_data['status'] = '취소됨'
-        await self.save_scrims_data()
+        await self.set_scrim_status(scrim_id, '취소됨')
 
         guild = self.bot.get_guild(scrim_data['guild_id'])
         if guild:
@@ -2219,62 +2452,113 @@ class ScrimCog(commands.Cog):
         except Exception as e:
             self.logger.error(f"Error updating scrim message {scrim_id}: {e}", exc_info=True)
 
-    @tasks.loop(minutes=1)
-    async def scrim_notifications(self):
-        """내전 시작 시간 전에 알림 전송"""
-        try:
-            eastern = pytz.timezone('America/New_York')
-            now = datetime.now(eastern)
+    async def setup_scheduled_jobs(self):
+        """Register the scrim event handler and schedule events for active scrims"""
+        scheduler = get_scheduler(self.bot)
+        if not scheduler:
+            self.logger.warning("작업 스케줄러가 없어 내전 알림이 비활성화됩니다.")
+            return
 
-            for scrim_id, scrim_data in list(self.scrims_data.items()):
-                if scrim_data['status'] != '활성':
-                    continue
+        scheduler.register_handler('scrim_event', self.run_scrim_event)
 
-                start_time = scrim_data['start_time']
-                # Convert UTC stored time to Eastern for comparison
-                if start_time.tzinfo == pytz.utc:
-                    start_time = start_time.astimezone(eastern)
-                elif start_time.tzinfo is None:
-                    # If somehow no timezone, assume it's UTC
-                    start_time = pytz.utc.localize(start_time).astimezone(eastern)
-
-                time_until_start = start_time - now
-                is_full = len(scrim_data['participants']) >= scrim_data['max_players']
-                notifications_sent = scrim_data.get('notifications_sent', {'10min': False, '2min': False})
-
-                # 10분 알림 (15분에서 5분 사이)
-                if (timedelta(minutes=5) <= time_until_start <= timedelta(minutes=15) and
-                        not notifications_sent.get('10min') and is_full):
-                    await self.send_scrim_notification(scrim_data, "10분")
-                    notifications_sent['10min'] = True
-                    scrim_data['notifications_sent'] = notifications_sent
-                    await self.save_scrims_data()
-
-                # 2분 알림 (5분에서 0분 사이)
-                elif (timedelta(seconds=1) <= time_until_start <= timedelta(minutes=5) and
-                      not notifications_sent.get('2min') and is_full):
-                    await self.send_scrim_notification(scrim_data, "2분")
-                    notifications_sent['2min'] = True
-                    scrim_data['notifications_sent'] = notifications_sent
-                    await self.save_scrims_data()
-
-                # 시작 시간이 지난 경우 완료로 표시
-                elif time_until_start.total_seconds() <= 0:
-                    scrim_data['status'] = '완료됨'
-                    await self.save_scrims_data()
-
-                    if scrim_data.get('message_id'):
-                        guild = self.bot.get_guild(scrim_data['guild_id'])
-                        if guild:
-                            channel = guild.get_channel(scrim_data['channel_id'])
-                            if channel:
-                                try:
-                                    message = await channel.fetch_message(scrim_data['message_id'])
-                                    await self.update_scrim_message(message, scrim_id)
-                                except discord.NotFound:
-                                    pass
-        except Exception as e:
-            self.logger.error(f"Error in scrim notification task: {e}", exc_info=True)
+        # Events already stored are simply re-upserted; ones that passed while offline run at once
+        jobs = []
+        for scrim_data in self.active_scrims.values():
+            jobs.extend(self.scrim_event_jobs(scrim_data))
+        await scheduler.schedule_many('scrim_event', jobs)
+
+    @staticmethod
+    def scrim_event_key(scrim_id: str, event: str) -> str:
+        return f"scrim:{scrim_id}:{event}"
+
+    def scrim_event_jobs(self, scrim_data: Dict) -> list:
+        """Scheduler jobs for a scrim's 10-minute, 2-minute and start events that are still pending"""
+        start_time = scrim_data['start_time']
+        sent = scrim_data.get('notifications_sent', {})
+        events = [(event, start_time - lead) for event, lead in SCRIM_REMINDERS if not sent.get(event)]
+        events.append(('start', start_time))
+        return [
+            (self.scrim_event_key(scrim_data['id'], event), run_at,
+             {'scrim_id': scrim_data['id'], 'event': event}, scrim_data['guild_id'])
+            for event, run_at in events
+        ]
+
+    async def schedule_scrim_events(self, scrim_data: Dict):
+        """Schedule (or, after a time change, reschedule) a scrim's events"""
+        scheduler = get_scheduler(self.bot)
+        if scheduler:
+            await scheduler.schedule_many('scrim_event', self.scrim_event_jobs(scrim_data))
+
+    async def cancel_scrim_events(self, scrim_id: str):
+        scheduler = get_scheduler(self.bot)
+        if scheduler:
+            for event in ('10min', '2min', 'start'):
+                await scheduler.cancel(self.scrim_event_key(scrim_id, event))
+
+    async def run_scrim_event(self, payload: dict):
+        """Send a reminder or mark the scrim as started"""
+        scrim_id = payload['scrim_id']
+        event = payload['event']
+        scrim_data = self.active_scrims.get(scrim_id)
+        if not scrim_data:
+            return
+
+        if event == 'start':
+            await self.complete_scrim(scrim_id)
+            return
+
+        if scrim_data['notifications_sent'].get(event):
+            return
+
+        # Reminders only go out for full scrims, and a reminder caught up late is dropped
+        # once the next one is due (e.g. after the bot was offline)
+        if self.due_reminder(scrim_data) != event:
+            return
+        if len(scrim_data['participants']) < scrim_data['max_players']:
+            return
+
+        # Flag first so the scheduled job and a late fill can't both send it
+        await self.mark_notification_sent(scrim_id, event)
+        await self.send_scrim_notification(scrim_data, SCRIM_REMINDER_TEXT[event])
+
+    @staticmethod
+    def due_reminder(scrim_data: Dict) -> Optional[str]:
+        """The reminder whose window (its lead time down to the next one's) contains now, if any"""
+        time_until_start = scrim_data['start_time'] - datetime.now(timezone.utc)
+        for event, lead in SCRIM_REMINDERS:
+            next_lead = min((l for _, l in SCRIM_REMINDERS if l < lead), default=timedelta(0))
+            if next_lead < time_until_start <= lead:
+                return event
+        return None
+
+    def on_scrim_filled(self, scrim_id: str):
+        """A scrim that fills after a reminder's job already ran still gets that reminder"""
+        scrim_data = self.active_scrims.get(scrim_id)
+        if not scrim_data or len(scrim_data['participants']) < scrim_data['max_players']:
+            return
+        event = self.due_reminder(scrim_data)
+        if event and not scrim_data['notifications_sent'].get(event):
+            # Off the interaction path; sending pings can take longer than the response deadline
+            self.bot.loop.create_task(self.run_scrim_event({'scrim_id': scrim_id, 'event': event}))
+
+    async def complete_scrim(self, scrim_id: str):
+        """Mark a scrim that has reached its start time as completed and refresh its message"""
+        scrim_data = self.active_scrims.get(scrim_id)
+        if not scrim_data:
+            return
+
+        await self.set_scrim_status(scrim_id, '완료됨')
+
+        if scrim_data.get('message_id'):
+            guild = self.bot.get_guild(scrim_data['guild_id'])
+            if guild:
+                channel = guild.get_channel(scrim_data['channel_id'])
+                if channel:
+                    try:
+                        message = await channel.fetch_message(scrim_data['message_id'])
+                        await self.update_scrim_message(message, scrim_id)
+                    except discord.NotFound:
+                        pass
 
     async def send_scrim_notification(self, scrim_data: Dict, time_text: str):
         try:
@@ -2301,7 +2585,7 @@ class ScrimCog(commands.Cog):
 
     @tasks.loop(hours=6)
     async def cleanup_old_scrims(self):
-        """오래된 완료/취소된 내전 정리"""
+        """오래된 완료/취소된 내전을 메모리에서 정리 (기록은 데이터베이스에 유지)"""
         try:
             now = datetime.now(pytz.utc)
             cutoff_time = now - timedelta(days=7)
@@ -2315,7 +2599,6 @@ class ScrimCog(commands.Cog):
             if scrims_to_remove:
                 for scrim_id in scrims_to_remove:
                     del self.scrims_data[scrim_id]
-                await self.save_scrims_data()
                 self.logger.info(f"Cleaned up {len(scrims_to_remove)} old scrim(s).")
         except Exception as e:
             self.logger.error(f"Error in cleanup task: {e}", exc_info=True)
@@ -1,7 +1,7 @@
 # /cogs/warning_system.py
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
 import asyncpg
 import datetime
@@ -9,6 +9,7 @@ import asyncio
 from typing import Optional
 import logging
 from utils.config import DATABASE_URL
+from cogs.scheduler import get_scheduler
 
 # Set up logger
 logger = logging.getLogger(__name__)
@@ -249,9 +250,6 @@ class WarningSystem(commands.Cog):
         self.warning_embed_message_id = None  # Store the message ID
         self.db_pool = None
 
-        # Start the warning expiration check task
-        self.warning_expiration_check.start()
-
     async def get_db_pool(self):
         """Get or create database connection pool"""
         if self.db_pool is None:
@@ -340,10 +338,60 @@ class WarningSystem(commands.Cog):
             await self.bot.wait_until_ready()  # Wait for bot to be ready
             await asyncio.sleep(2)  # Additional delay to ensure everything is loaded
             await self.check_and_setup_warning_embeds()
+            await self.setup_expiration_jobs()
         except Exception as e:
             logger.error(f"Error in delayed_setup: {e}")
 
-    @tasks.loop(minutes=5)  # Check every 5 minutes
+    async def setup_expiration_jobs(self):
+        """Register the expiry handler and schedule a job for every running warning timer"""
+        scheduler = get_scheduler(self.bot)
+        if not scheduler:
+            logger.warning("Job scheduler not loaded - warning timers will only expire via 경고만료체크")
+            return
+
+        scheduler.register_handler('warning_expire', self.run_scheduled_expiration)
+
+        # Timers that ran out while the bot was offline are scheduled in the past and fire immediately
+        pool = await self.get_db_pool()
+        states = await pool.fetch('''
+            SELECT guild_id, user_id, timer_expires_at FROM user_warning_states
+            WHERE timer_expires_at IS NOT NULL AND can_lose_warnings = TRUE
+        ''')
+        await scheduler.schedule_many('warning_expire', [
+            (self.expiration_job_key(state['guild_id'], state['user_id']), state['timer_expires_at'],
+             {'guild_id': state['guild_id'], 'user_id': state['user_id']}, state['guild_id'])
+            for state in states
+        ])
+
+    @staticmethod
+    def expiration_job_key(guild_id: int, user_id: int) -> str:
+        return f"warning_expire:{guild_id}:{user_id}"
+
+    async def schedule_expiration(self, guild_id: int, user_id: int, expires_at: Optional[datetime.datetime]):
+        """Schedule the user's warning timer, or cancel it when the timer is stopped"""
+        scheduler = get_scheduler(self.bot)
+        if not scheduler:
+            return
+        key = self.expiration_job_key(guild_id, user_id)
+        if expires_at is None:
+            await scheduler.cancel(key)
+        else:
+            await scheduler.schedule('warning_expire', key, expires_at,
+                                     {'guild_id': guild_id, 'user_id': user_id}, guild_id)
+
+    async def run_scheduled_expiration(self, payload: dict):
+        """Expire one user's warning timer when its job comes due"""
+        pool = await self.get_db_pool()
+        async with pool.acquire() as conn:
+            # Re-check the stored state; the timer may have been reset or cleared since scheduling
+            record = await conn.fetchrow('''
+                SELECT guild_id, user_id, active_warnings FROM user_warning_states
+                WHERE guild_id = $1 AND user_id = $2 AND timer_expires_at <= $3
+                  AND timer_expires_at IS NOT NULL AND can_lose_warnings = TRUE
+            ''', payload['guild_id'], payload['user_id'], datetime.datetime.now())
+            if record:
+                await self.expire_warning_state(record, conn)
+
     async def warning_expiration_check(self):
         """Check for expired warnings and update user roles accordingly"""
         try:
@@ -360,35 +408,33 @@ class WarningSystem(commands.Cog):
 
                 for record in expired_states:
                     try:
-                        guild_id = record['guild_id']
-                        user_id = record['user_id']
-                        active_warnings = record['active_warnings']
-
-                        guild = self.bot.get_guild(guild_id)
-                        if not guild:
-                            continue
-
-                        member = guild.get_member(user_id)
-                        if not member:
-                            # User left the server, clean up their warning state
-                            await conn.execute('''
-                                DELETE FROM user_warning_states 
-                                WHERE guild_id = $1 AND user_id = $2
-                            ''', guild_id, user_id)
-                            continue
-
-                        await self.handle_warning_expiration(guild, member, active_warnings, conn)
-
+                        await self.expire_warning_state(record, conn)
                     except Exception as e:
-                        logger.error(f"Error processing expired warning for user {user_id} in guild {guild_id}: {e}")
+                        logger.error(f"Error processing expired warning for user {record['user_id']} in guild {record['guild_id']}: {e}")
                         continue
 
         except Exception as e:
             logger.error(f"Error in warning expiration check: {e}")
 
-    @warning_expiration_check.before_loop
-    async def before_warning_expiration_check(self):
-        await self.bot.wait_until_ready()
+    async def expire_warning_state(self, record, conn):
+        """Apply an expired warning timer for one user"""
+        guild_id = record['guild_id']
+        user_id = record['user_id']
+
+        guild = self.bot.get_guild(guild_id)
+        if not guild:
+            return
+
+        member = guild.get_member(user_id)
+        if not member:
+            # User left the server, clean up their warning state
+            await conn.execute('''
+                DELETE FROM user_warning_states 
+                WHERE guild_id = $1 AND user_id = $2
+            ''', guild_id, user_id)
+            return
+
+        await self.handle_warning_expiration(guild, member, record['active_warnings'], conn)
 
     async def handle_warning_expiration(self, guild: discord.Guild, member: discord.Member,
                                         active_warnings: int, conn):
@@ -410,6 +456,7 @@ class WarningSystem(commands.Cog):
                     SET active_warnings = 1, timer_started_at = $1, timer_expires_at = $2
                     WHERE guild_id = $3 AND user_id = $4
                 ''', datetime.datetime.now(), new_timer_expires, guild.id, member.id)
+                await self.schedule_expiration(guild.id, member.id, new_timer_expires)
 
                 logger.info(f"User {member.id} in guild {guild.id} downgraded from 2x to 1x warning")
 
@@ -491,6 +538,8 @@ class WarningSystem(commands.Cog):
                         can_lose_warnings = $6
                 ''', guild_id, target_user.id, new_warning_count, now, timer_expires, can_lose)
 
+            await self.schedule_expiration(guild_id, target_user.id, timer_expires)
+
             logger.info(
                 f"Warning {warning_id} added for user {target_user.id} in guild {guild_id}. New count: {new_warning_count}")
             return warning_id, new_warning_count
@@ -950,6 +999,8 @@ class WarningSystem(commands.Cog):
                     WHERE guild_id = $1 AND user_id = $2 AND is_active = TRUE
                 ''', interaction.guild.id, user.id)
 
+            await self.schedule_expiration(interaction.guild.id, user.id, None)
+
             embed = discord.Embed(
                 title="✅ 경고 제거 완료",
                 description=f"{user.display_name}님의 모든 경고 ({current_count}개)가 제거되었습니다.",
@@ -980,7 +1031,6 @@ class WarningSystem(commands.Cog):
 
     async def cog_unload(self):
         """Clean up when cog is unloaded"""
-        self.warning_expiration_check.cancel()
         if self.db_pool:
             await self.db_pool.close()
 
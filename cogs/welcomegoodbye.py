@@ -8,6 +8,7 @@ from PIL import Image, ImageDraw, ImageFont
 import os
 import asyncio
 import traceback
+import aiohttp
 
 from utils.config import (
     get_channel_id,
@@ -17,6 +18,7 @@ from utils.config import (
     is_server_configured
 )
 from utils.logger import get_logger
+from utils.http_client import get_http_client
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 BG_PATH = os.path.join(BASE_DIR, "..", "assets", "welcome_bg.png")
@@ -55,13 +57,13 @@ class WelcomeCog(commands.Cog):
 
             avatar_asset = member.display_avatar.with_size(128).with_format("png")
             try:
-                avatar_bytes = await asyncio.wait_for(avatar_asset.read(), timeout=10)
+                avatar_bytes = await get_http_client(self.bot).fetch_bytes(avatar_asset.url, timeout=10)
             except asyncio.TimeoutError:
                 self.logger.warning(f"⏳ [welcome] 아바타 가져오기 타임아웃: {member.display_name} ({member.id})",
                                      extra={'guild_id': guild_id})
                 avatar_bytes = None
-            except discord.HTTPException as e:
-                self.logger.error(f"❌ [welcome] 아바타 HTTP 오류: {e} for {member.display_name} ({member.id})",
+            except aiohttp.ClientResponseError as e:
+                self.logger.error(f"❌ [welcome] 아바타 HTTP 오류: {e.status} for {member.display_name} ({member.id})",
                                   extra={'guild_id': guild_id})
                 avatar_bytes = None
             except Exception as e:
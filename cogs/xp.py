@@ -515,7 +515,7 @@ class XPSystemCog(commands.Cog):
         # User joined a voice channel
         if before.channel is None and after.channel is not None:
             self.voice_users[guild_id][user_id] = now
-            self.logger.info(f"User {user_id} joined voice channel in guild {guild_id}", extra={'guild_id': guild_id})
+            self.logger.info("User %s joined voice channel in guild %s", user_id, guild_id, extra={'guild_id': guild_id})
 
         # User left a voice channel
         elif before.channel is not None and after.channel is None:
@@ -543,7 +543,7 @@ class XPSystemCog(commands.Cog):
                     self.logger.error(f"Error updating voice time for {user_id}: {e}", extra={'guild_id': guild_id})
 
                 del self.voice_users[guild_id][user_id]
-                self.logger.info(f"User {user_id} left voice channel, gained {xp_gained} XP",
+                self.logger.info("User %s left voice channel, gained %s XP", user_id, xp_gained,
                                  extra={'guild_id': guild_id})
 
         # User switched channels (no XP change, just update time)
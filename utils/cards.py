@@ -0,0 +1,135 @@
+# utils/cards.py - Shared integer-encoded playing cards and multi-deck shoe
+import random
+from array import array
+from typing import Iterable, List
+
+# =============================================================================
+# CARD ENCODING
+# =============================================================================
+# A card is a plain int 0-51: suit * 13 + rank index, where rank index 0 is a
+# deuce and 12 is an ace. Everything a game needs per card is a tuple lookup.
+
+RANK_LABELS = ('2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A')
+SUIT_SYMBOLS = ('♠️', '♥️', '♦️', '♣️')
+
+DECK_SIZE = 52
+
+# Poker-style rank value 2-14 (11=J, 12=Q, 13=K, 14=A)
+RANKS = tuple(i % 13 + 2 for i in range(DECK_SIZE))
+SUITS = tuple(i // 13 for i in range(DECK_SIZE))
+
+# Rendering caches
+RANK_TEXT = tuple(RANK_LABELS[i % 13] for i in range(DECK_SIZE))
+CARD_LABELS = tuple(f"{RANK_LABELS[i % 13]}{SUIT_SYMBOLS[i // 13]}" for i in range(DECK_SIZE))
+
+# Blackjack tables: hard points (ace counts 1) and ace flags
+IS_ACE = tuple(RANKS[i] == 14 for i in range(DECK_SIZE))
+BJ_POINTS = tuple(1 if IS_ACE[i] else min(RANKS[i], 10) for i in range(DECK_SIZE))
+
+
+def rank(card: int) -> int:
+    """Rank value 2-14 (ace high)"""
+    return RANKS[card]
+
+
+def suit(card: int) -> int:
+    """Suit index 0-3"""
+    return SUITS[card]
+
+
+def rank_label(card: int) -> str:
+    """Rank as displayed, e.g. '10' or 'K'"""
+    return RANK_TEXT[card]
+
+
+def card_str(card: int) -> str:
+    """Rank and suit as displayed, e.g. 'A♠️'"""
+    return CARD_LABELS[card]
+
+
+def cards_str(cards: Iterable[int], sep: str = ' ') -> str:
+    """Display string for several cards"""
+    return sep.join(CARD_LABELS[c] for c in cards)
+
+
+# =============================================================================
+# BLACKJACK HAND VALUES
+# =============================================================================
+
+def blackjack_hard_total(cards: Iterable[int]) -> int:
+    """Total with every ace counted as 1"""
+    return sum(BJ_POINTS[c] for c in cards)
+
+
+def blackjack_value(cards: List[int]) -> int:
+    """Best blackjack total: one ace is worth 11 whenever that does not bust the hand"""
+    hard = 0
+    has_ace = False
+    for c in cards:
+        hard += BJ_POINTS[c]
+        has_ace = has_ace or IS_ACE[c]
+    return hard + 10 if has_ace and hard <= 11 else hard
+
+
+def is_soft(cards: List[int]) -> bool:
+    """True if the hand's best total counts an ace as 11"""
+    hard = 0
+    has_ace = False
+    for c in cards:
+        hard += BJ_POINTS[c]
+        has_ace = has_ace or IS_ACE[c]
+    return has_ace and hard <= 11
+
+
+# =============================================================================
+# SHOE
+# =============================================================================
+
+class Shoe:
+    """Array-backed shoe of one or more decks.
+
+    Cards are dealt by advancing an index, and shuffling reorders the array in
+    place, so dealing and reshuffling allocate nothing. Once dealing passes the
+    cut card (penetration), the shoe is reshuffled at the start of the next round
+    that begins while no other round is in play. Games sharing a shoe pair every
+    start_round() with an end_round().
+    """
+
+    def __init__(self, decks: int = 1, penetration: float = 0.75):
+        self.decks = decks
+        self.cards = array('B', range(DECK_SIZE)) * decks
+        self.cut_card = max(1, int(len(self.cards) * penetration))
+        self.position = 0
+        self.rounds_in_play = 0
+        self.shuffle()
+
+    def shuffle(self):
+        """Shuffle every card back into the shoe"""
+        random.shuffle(self.cards)
+        self.position = 0
+
+    @property
+    def remaining(self) -> int:
+        return len(self.cards) - self.position
+
+    @property
+    def needs_shuffle(self) -> bool:
+        return self.position >= self.cut_card
+
+    def start_round(self):
+        """Begin a round; reshuffles first if the cut card has come out and no other round is in play"""
+        if self.needs_shuffle and self.rounds_in_play == 0:
+            self.shuffle()
+        self.rounds_in_play += 1
+
+    def end_round(self):
+        """Mark a round started with start_round() as finished"""
+        self.rounds_in_play = max(0, self.rounds_in_play - 1)
+
+    def draw(self) -> int:
+        """Deal one card, reshuffling only if the shoe is completely empty"""
+        if self.position >= len(self.cards):
+            self.shuffle()
+        card = self.cards[self.position]
+        self.position += 1
+        return card
@@ -22,4 +22,45 @@ async def send_guild_log(bot, guild: discord.Guild, level: str, message: str):
             except discord.Forbidden:
                 print(f"Error: Bot lacks permissions to send logs to channel {channel.name} in guild {guild.name}.")
             except Exception as e:
-                print(f"Failed to send log to Discord channel {channel_id}: {e}")
\ No newline at end of file
+                print(f"Failed to send log to Discord channel {channel_id}: {e}")
+
+
+class KeysetPageView(discord.ui.View):
+    """Back/next paging for listings ordered by a keyset such as (timestamp, id).
+
+    fetch_page(cursor) returns (rows, next_cursor). The cursor of every page visited
+    is kept, so going back re-runs that page's seek query instead of an OFFSET scan.
+    """
+
+    def __init__(self, owner_id: int, fetch_page, render_page, next_cursor):
+        super().__init__(timeout=300)
+        self.owner_id = owner_id
+        self.fetch_page = fetch_page
+        self.render_page = render_page
+        self.cursors = [None]  # cursor that produced each visited page
+        self.next_cursor = next_cursor
+        self.update_buttons()
+
+    def update_buttons(self):
+        self.prev_page.disabled = len(self.cursors) == 1
+        self.next_page.disabled = self.next_cursor is None
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        return interaction.user.id == self.owner_id
+
+    async def show_page(self, interaction: discord.Interaction):
+        rows, self.next_cursor = await self.fetch_page(self.cursors[-1])
+        self.update_buttons()
+        await interaction.response.edit_message(embed=self.render_page(rows, len(self.cursors)), view=self)
+
+    @discord.ui.button(label="‹ 뒤로", style=discord.ButtonStyle.secondary)
+    async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if len(self.cursors) > 1:
+            self.cursors.pop()
+        await self.show_page(interaction)
+
+    @discord.ui.button(label="다음 ›", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if self.next_cursor is not None:
+            self.cursors.append(self.next_cursor)
+        await self.show_page(interaction)
@@ -0,0 +1,110 @@
+# utils/http_client.py - Shared pooled HTTP client for cogs that fetch URLs
+import asyncio
+import os
+from typing import Optional
+
+import aiohttp
+
+from utils.logger import get_logger
+
+# Pool sizing: total open connections, and per host so one CDN can't starve the rest
+CONNECTION_LIMIT = 64
+PER_HOST_LIMIT = 8
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=60, connect=10, sock_read=30)
+CHUNK_SIZE = 64 * 1024
+
+
+class DownloadTooLarge(Exception):
+    """Raised when a download exceeds its max_bytes limit"""
+
+
+class HttpClient:
+    """One aiohttp session shared by the whole bot.
+
+    Connections are pooled and kept alive across requests, with at most
+    PER_HOST_LIMIT in flight per host. Downloads are streamed in chunks and
+    written to disk in a worker thread, so neither a large attachment nor a slow
+    disk blocks the event loop. Create it inside the running loop (setup_hook).
+    """
+
+    def __init__(self, limit: int = CONNECTION_LIMIT, limit_per_host: int = PER_HOST_LIMIT,
+                 timeout: aiohttp.ClientTimeout = DEFAULT_TIMEOUT):
+        self.logger = get_logger("HTTP 클라이언트")
+        connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=timeout, raise_for_status=True)
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+    async def close(self):
+        if not self.session.closed:
+            await self.session.close()
+
+    async def fetch_bytes(self, url: str, timeout: Optional[float] = None,
+                          max_bytes: Optional[int] = None) -> bytes:
+        """GET a small resource into memory. Raises aiohttp.ClientError on HTTP errors."""
+        # Only override the session's DEFAULT_TIMEOUT when asked; timeout=None would disable it
+        request_kwargs = {'timeout': aiohttp.ClientTimeout(total=timeout)} if timeout else {}
+        async with self.session.get(url, **request_kwargs) as resp:
+            if max_bytes is None:
+                return await resp.read()
+            if (resp.content_length or 0) > max_bytes:
+                raise DownloadTooLarge(f"{url} is {resp.content_length} bytes (limit {max_bytes})")
+
+            # Content-Length is absent on chunked responses, so the limit is enforced while reading
+            body = bytearray()
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                body += chunk
+                if len(body) > max_bytes:
+                    raise DownloadTooLarge(f"{url} exceeded {max_bytes} bytes")
+            return bytes(body)
+
+    async def download_to_file(self, url: str, path: str, max_bytes: Optional[int] = None,
+                               hasher=None) -> int:
+        """Stream url into path and return the number of bytes written.
+
+        The body is written to a temporary file next to path and renamed into
+        place once complete, so a failed download never leaves a partial file.
+        If a hashlib object is given, it is fed every chunk on the writer thread.
+        """
+        temp_path = f"{path}.part"
+        written = 0
+        async with self.session.get(url) as resp:
+            if max_bytes is not None and (resp.content_length or 0) > max_bytes:
+                raise DownloadTooLarge(f"{url} is {resp.content_length} bytes (limit {max_bytes})")
+
+            f = await asyncio.to_thread(open, temp_path, 'wb')
+            try:
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    written += len(chunk)
+                    if max_bytes is not None and written > max_bytes:
+                        raise DownloadTooLarge(f"{url} exceeded {max_bytes} bytes")
+                    await asyncio.to_thread(_write_chunk, f, chunk, hasher)
+                await asyncio.to_thread(f.close)
+                await asyncio.to_thread(os.replace, temp_path, path)
+            except BaseException:
+                await asyncio.to_thread(f.close)
+                await asyncio.to_thread(remove_quietly, temp_path)
+                raise
+
+        return written
+
+
+def _write_chunk(f, chunk: bytes, hasher):
+    f.write(chunk)
+    if hasher is not None:
+        hasher.update(chunk)
+
+
+def remove_quietly(path: str):
+    """os.remove that ignores a missing file (or any other OSError)"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def get_http_client(bot) -> HttpClient:
+    """Helper function for cogs to get the bot's shared HttpClient"""
+    return bot.http_client
@@ -0,0 +1,173 @@
+# utils/lobby.py - Event-driven lobby/round state machine shared by multiplayer casino games
+import asyncio
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from utils.logger import get_logger
+
+TimerCallback = Callable[[], Awaitable[None]]
+
+
+class LobbyPhase(Enum):
+    JOINING = "joining"
+    PLAYING = "playing"
+    FINISHED = "finished"
+    CANCELLED = "cancelled"
+
+
+class RoundTimer:
+    """Handle for a scheduled round callback. Cancelling only stops it if it has not fired yet."""
+
+    __slots__ = ('handle', 'deadline')
+
+    def __init__(self, handle: asyncio.TimerHandle, deadline: float):
+        self.handle = handle
+        self.deadline = deadline
+
+    @property
+    def pending(self) -> bool:
+        return not self.handle.cancelled() and self.handle.when() > asyncio.get_running_loop().time()
+
+    def cancel(self):
+        self.handle.cancel()
+
+
+class RoundScheduler:
+    """The one timer source for every lobby and round.
+
+    Deadlines (auto-start, draw deadline, next bingo call, cleanup) are loop timer
+    handles, so a waiting lobby holds no sleeping task and costs nothing until its
+    deadline. When a timer fires, its coroutine runs as a tracked task and any
+    exception is logged instead of being lost.
+    """
+
+    def __init__(self):
+        self.logger = get_logger("라운드 스케줄러")
+        self.running: Set[asyncio.Task] = set()
+
+    def call_later(self, delay: float, callback: TimerCallback) -> RoundTimer:
+        """Run callback() after delay seconds"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max(0.0, delay)
+        handle = loop.call_at(deadline, self._fire, callback)
+        return RoundTimer(handle, deadline)
+
+    def _fire(self, callback: TimerCallback):
+        task = asyncio.get_running_loop().create_task(callback())
+        self.running.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self.running.discard(task)
+        if not task.cancelled() and task.exception():
+            self.logger.error(f"Round timer callback failed: {task.exception()}", exc_info=task.exception())
+
+
+# Shared by every game so all round deadlines live in a single place
+round_scheduler = RoundScheduler()
+
+
+class RoundLobby:
+    """Join/leave/ready state machine for one multiplayer round.
+
+    JOINING -> PLAYING -> FINISHED, or JOINING -> CANCELLED. Transitions are
+    synchronous and guarded, so a start button racing the auto-start timer (or
+    the last player's ready racing the draw deadline) only takes effect once.
+    A lobby owns at most one pending timer; scheduling a new one replaces it.
+    """
+
+    def __init__(self, min_players: int = 2, max_players: Optional[int] = None,
+                 scheduler: Optional[RoundScheduler] = None):
+        self.min_players = min_players
+        self.max_players = max_players
+        self.scheduler = scheduler or round_scheduler
+        self.phase = LobbyPhase.JOINING
+        self.members: Dict[int, bool] = {}  # user_id -> ready
+        self.timer: Optional[RoundTimer] = None
+
+        self.started = asyncio.Event()
+        self.all_ready = asyncio.Event()
+        self.closed = asyncio.Event()
+
+    # --- membership -----------------------------------------------------------
+
+    @property
+    def is_joining(self) -> bool:
+        return self.phase is LobbyPhase.JOINING
+
+    @property
+    def is_full(self) -> bool:
+        return self.max_players is not None and len(self.members) >= self.max_players
+
+    @property
+    def has_enough_players(self) -> bool:
+        return len(self.members) >= self.min_players
+
+    @property
+    def ready_count(self) -> int:
+        return sum(self.members.values())
+
+    def join(self, user_id: int) -> bool:
+        """Add a member while joining is open"""
+        if not self.is_joining or user_id in self.members or self.is_full:
+            return False
+        self.members[user_id] = False
+        return True
+
+    def leave(self, user_id: int) -> bool:
+        """Remove a member before the round starts"""
+        if not self.is_joining or user_id not in self.members:
+            return False
+        del self.members[user_id]
+        return True
+
+    def mark_ready(self, user_id: int) -> bool:
+        """Mark a member ready. Returns True exactly once, for the member who completes the round."""
+        if user_id not in self.members or self.members[user_id] or self.all_ready.is_set():
+            return False
+        self.members[user_id] = True
+        if self.members and all(self.members.values()):
+            self.all_ready.set()
+            return True
+        return False
+
+    # --- transitions ----------------------------------------------------------
+
+    def start(self) -> bool:
+        """JOINING -> PLAYING. Returns False if the round already started or was closed."""
+        if not self.is_joining:
+            return False
+        self.cancel_timer()
+        self.phase = LobbyPhase.PLAYING
+        self.started.set()
+        return True
+
+    def close(self):
+        """Finish a started round or cancel one that never started"""
+        self.cancel_timer()
+        if self.phase is LobbyPhase.PLAYING:
+            self.phase = LobbyPhase.FINISHED
+        elif self.phase is LobbyPhase.JOINING:
+            self.phase = LobbyPhase.CANCELLED
+        self.closed.set()
+
+    async def wait_all_ready(self, timeout: float) -> bool:
+        """Wait until every member is ready. Returns False on timeout."""
+        try:
+            await asyncio.wait_for(self.all_ready.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # --- timers ---------------------------------------------------------------
+
+    def schedule(self, delay: float, callback: TimerCallback) -> RoundTimer:
+        """Replace this lobby's pending timer with callback() after delay seconds"""
+        self.cancel_timer()
+        self.timer = self.scheduler.call_later(delay, callback)
+        return self.timer
+
+    def cancel_timer(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
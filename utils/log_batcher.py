@@ -0,0 +1,123 @@
+# utils/log_batcher.py - Merges bursts of log-channel posts into as few sends as possible
+import asyncio
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import discord
+
+from utils.logger import get_logger
+
+BATCH_WINDOW = 2.0  # seconds to collect entries before sending
+
+# Discord's per-message limits
+MAX_EMBEDS = 10
+MAX_FILES = 10
+MAX_EMBED_CHARS = 6000
+
+# (file, size in bytes)
+LogFile = Tuple[discord.File, int]
+
+
+class ChannelLogBatcher:
+    """Per-channel coalescing of log embeds and their files.
+
+    The first entry for a channel schedules a flush BATCH_WINDOW seconds out;
+    everything queued for that channel until then is packed into messages of up
+    to 10 embeds / 10 files within the embed character and upload size limits.
+    A purge that produces a hundred delete logs becomes a handful of sends.
+    Files too large to upload are dropped (their links stay in the embed), and a
+    batch whose upload fails is re-sent without its files.
+    """
+
+    def __init__(self, window: float = BATCH_WINDOW):
+        self.window = window
+        self.logger = get_logger("로그 배치")
+        self.pending_entries: Dict[int, List[Tuple[discord.Embed, List[LogFile]]]] = {}
+        self.channels: Dict[int, discord.abc.Messageable] = {}
+        self.flush_tasks: Dict[int, asyncio.Task] = {}
+
+    def enqueue(self, channel, embed: discord.Embed, files: Sequence[LogFile] = ()):
+        """Queue an embed (and its files) for the channel's next batch"""
+        self.pending_entries.setdefault(channel.id, []).append((embed, list(files)))
+        self.channels[channel.id] = channel
+        if channel.id not in self.flush_tasks:
+            self.flush_tasks[channel.id] = asyncio.get_running_loop().create_task(self._run_flush(channel.id))
+
+    async def _run_flush(self, channel_id: int):
+        try:
+            await asyncio.sleep(self.window)
+            # Entries queued while a batch is being sent go out in the next round
+            while self.pending_entries.get(channel_id):
+                entries = self.pending_entries.pop(channel_id)
+                await self._send_batches(self.channels[channel_id], entries)
+        except Exception as e:
+            self.logger.error(f"로그 배치 처리 중 오류 발생: {e}", exc_info=True)
+        finally:
+            del self.flush_tasks[channel_id]
+            if channel_id not in self.pending_entries:
+                self.channels.pop(channel_id, None)
+
+    async def flush_all(self):
+        """Send everything queued right away (e.g. on unload)"""
+        for task in list(self.flush_tasks.values()):
+            task.cancel()
+        for channel_id, entries in list(self.pending_entries.items()):
+            del self.pending_entries[channel_id]
+            await self._send_batches(self.channels[channel_id], entries)
+
+    @staticmethod
+    def _fit_files(entry_files: List[LogFile], upload_limit: int) -> List[LogFile]:
+        """Files of one entry that fit in a single message; the rest are closed and left as links in the embed"""
+        kept, size = [], 0
+        for f, file_size in entry_files:
+            if len(kept) < MAX_FILES and size + file_size <= upload_limit:
+                kept.append((f, file_size))
+                size += file_size
+            else:
+                f.close()
+        return kept
+
+    def _pack(self, entries, upload_limit: int) -> List[Tuple[List[discord.Embed], List[discord.File]]]:
+        batches = []
+        embeds, files, chars, size = [], [], 0, 0
+        for embed, entry_files in entries:
+            entry_files = self._fit_files(entry_files, upload_limit)
+            entry_chars = len(embed)
+            entry_size = sum(file_size for _, file_size in entry_files)
+            fits = (len(embeds) < MAX_EMBEDS and len(files) + len(entry_files) <= MAX_FILES
+                    and chars + entry_chars <= MAX_EMBED_CHARS and size + entry_size <= upload_limit)
+            if embeds and not fits:
+                batches.append((embeds, files))
+                embeds, files, chars, size = [], [], 0, 0
+            embeds.append(embed)
+            files.extend(f for f, _ in entry_files)
+            chars += entry_chars
+            size += entry_size
+        if embeds:
+            batches.append((embeds, files))
+        return batches
+
+    async def _send_batches(self, channel, entries):
+        guild: Optional[discord.Guild] = getattr(channel, 'guild', None)
+        upload_limit = guild.filesize_limit if guild else 10 * 1024 * 1024
+        guild_id = guild.id if guild else None
+
+        forbidden = False
+        for embeds, files in self._pack(entries, upload_limit):
+            try:
+                if not forbidden:
+                    await channel.send(embeds=embeds, files=files)
+            except discord.Forbidden:
+                self.logger.error(f"봇이 로그 채널 {channel}에 메시지를 보낼 권한이 없습니다.", extra={'guild_id': guild_id})
+                forbidden = True
+            except discord.HTTPException as e:
+                self.logger.error(f"로그 배치 전송 실패 ({len(embeds)}개 임베드, {len(files)}개 파일): {e}",
+                                  extra={'guild_id': guild_id})
+                if files:
+                    # The attachment links are in the embeds, so the log itself still gets through
+                    try:
+                        await channel.send(embeds=embeds)
+                    except discord.HTTPException as retry_error:
+                        self.logger.error(f"파일 없이 재전송도 실패: {retry_error}", extra={'guild_id': guild_id})
+            finally:
+                for f in files:
+                    f.close()
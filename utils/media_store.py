@@ -0,0 +1,312 @@
+# utils/media_store.py - Content-addressed, deduplicated media history storage
+import asyncio
+import gzip
+import hashlib
+import io
+import os
+import shutil
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from utils.config import get_server_setting
+from utils.http_client import get_http_client, remove_quietly
+from utils.logger import get_logger
+
+# Per-guild defaults, overridable with the media_quota_mb / media_retention_days server settings
+DEFAULT_QUOTA_MB = 2048
+DEFAULT_RETENTION_DAYS = 90
+
+# Only compress what actually shrinks; media formats are already compressed
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/xml', 'image/svg+xml', 'image/bmp',
+                      'audio/wav', 'audio/x-wav', 'image/tiff')
+COMPRESSIBLE_EXTENSIONS = {'.txt', '.log', '.json', '.csv', '.xml', '.svg', '.html', '.md', '.bmp', '.wav',
+                           '.tif', '.tiff', '.py', '.js', '.yaml', '.yml', '.ini', '.cfg'}
+MIN_COMPRESSION_GAIN = 0.9  # Keep the gzip copy only if it is at most 90% of the original
+
+
+class MediaStore:
+    """Attachment storage where each distinct file is kept once per server.
+
+    Blobs live under <base>/<guild_id>/blobs/<aa>/<sha256>[.gz] and are indexed
+    in media_blobs; media_refs maps (message, filename) to the blob it used, so a
+    meme reposted a hundred times is one file with a hundred refs. Every server
+    has a byte quota and a retention age: blobs unused for longer than the
+    retention are dropped, and when a server is over quota its least recently
+    used blobs go first. Refs cascade away with their blob.
+
+    A blob returned by store_attachment stays pinned, so eviction skips it,
+    until the caller has opened it and calls release(). Files larger than the
+    whole quota are never stored (DownloadTooLarge). Placing a blob and evicting
+    share a per-guild lock, so an eviction can't remove a file that a concurrent
+    store of the same content has just written back.
+    """
+
+    def __init__(self, bot, base_folder: str = "mediahistory"):
+        self.bot = bot
+        self.base_folder = base_folder
+        self.logger = get_logger("미디어 저장소")
+        self.evicting: set = set()  # guild_ids with an eviction pass in flight
+        self.pinned: Dict[int, Counter] = {}  # guild_id -> sha256 -> stores not yet released
+        self.blob_locks: Dict[int, asyncio.Lock] = {}  # guild_id -> lock around blob placement and eviction
+
+    async def setup_database(self):
+        """Create the blob index tables"""
+        try:
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS media_blobs (
+                    guild_id BIGINT NOT NULL,
+                    sha256 CHAR(64) NOT NULL,
+                    original_size BIGINT NOT NULL,
+                    stored_size BIGINT NOT NULL,
+                    compressed BOOLEAN NOT NULL DEFAULT FALSE,
+                    content_type VARCHAR(128),
+                    created_at TIMESTAMPTZ DEFAULT NOW(),
+                    last_used_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (guild_id, sha256)
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS media_refs (
+                    message_id BIGINT NOT NULL,
+                    filename TEXT NOT NULL,
+                    guild_id BIGINT NOT NULL,
+                    sha256 CHAR(64) NOT NULL,
+                    stored_at TIMESTAMPTZ DEFAULT NOW(),
+                    PRIMARY KEY (message_id, filename),
+                    FOREIGN KEY (guild_id, sha256) REFERENCES media_blobs(guild_id, sha256) ON DELETE CASCADE
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_media_blobs_lru ON media_blobs(guild_id, last_used_at);
+                CREATE INDEX IF NOT EXISTS idx_media_refs_blob ON media_refs(guild_id, sha256);
+            """)
+
+            self.logger.info("✅ 미디어 저장소 테이블이 준비되었습니다.")
+        except Exception as e:
+            self.logger.error(f"❌ 미디어 저장소 테이블 설정 실패: {e}")
+
+    # --- paths and settings ---------------------------------------------------
+
+    def blob_path(self, guild_id: int, sha256: str, compressed: bool) -> str:
+        return os.path.join(self.base_folder, str(guild_id), "blobs", sha256[:2],
+                            f"{sha256}.gz" if compressed else sha256)
+
+    @staticmethod
+    def quota_bytes(guild_id: int) -> int:
+        return int(get_server_setting(guild_id, 'media_quota_mb', DEFAULT_QUOTA_MB)) * 1024 * 1024
+
+    @staticmethod
+    def retention(guild_id: int) -> timedelta:
+        return timedelta(days=int(get_server_setting(guild_id, 'media_retention_days', DEFAULT_RETENTION_DAYS)))
+
+    @staticmethod
+    def is_compressible(filename: str, content_type: Optional[str]) -> bool:
+        if content_type and content_type.startswith(COMPRESSIBLE_TYPES):
+            return True
+        return os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS
+
+    # --- storing --------------------------------------------------------------
+
+    async def store_attachment(self, guild_id: int, message_id: int, attachment) -> Dict:
+        """Download an attachment into the store (or reuse the existing blob) and record the ref.
+
+        Returns {'guild_id', 'sha256', 'path', 'compressed', 'deduplicated', 'size'}. The blob is
+        pinned against eviction until release() is called with the result. Raises DownloadTooLarge
+        for a file bigger than the guild's quota.
+        """
+        staging_folder = os.path.join(self.base_folder, str(guild_id), "staging")
+        await asyncio.to_thread(os.makedirs, staging_folder, exist_ok=True)
+        staging_path = os.path.join(staging_folder, uuid.uuid4().hex)
+
+        hasher = hashlib.sha256()
+        size = await get_http_client(self.bot).download_to_file(attachment.url, staging_path,
+                                                                 max_bytes=self.quota_bytes(guild_id), hasher=hasher)
+        sha256 = hasher.hexdigest()
+
+        try:
+            async with self.blob_lock(guild_id):
+                self._pin(guild_id, sha256)
+                compressed, deduplicated = await self._place_or_reuse(guild_id, sha256, staging_path, size,
+                                                                      attachment)
+
+            await self.bot.pool.execute("""
+                INSERT INTO media_refs (message_id, filename, guild_id, sha256) VALUES ($1, $2, $3, $4)
+                ON CONFLICT (message_id, filename) DO UPDATE SET sha256 = EXCLUDED.sha256, stored_at = NOW()
+            """, message_id, attachment.filename, guild_id, sha256)
+        except BaseException:
+            self._unpin(guild_id, sha256)
+            raise
+        finally:
+            await asyncio.to_thread(remove_quietly, staging_path)
+
+        return {
+            'guild_id': guild_id,
+            'sha256': sha256,
+            'path': self.blob_path(guild_id, sha256, compressed),
+            'compressed': compressed,
+            'deduplicated': deduplicated,
+            'size': size
+        }
+
+    def blob_lock(self, guild_id: int) -> asyncio.Lock:
+        return self.blob_locks.setdefault(guild_id, asyncio.Lock())
+
+    async def _place_or_reuse(self, guild_id: int, sha256: str, staging_path: str, size: int,
+                              attachment) -> Tuple[bool, bool]:
+        """Reuse the guild's blob for sha256 or write a new one. Returns (compressed, deduplicated)."""
+        existing = await self.bot.pool.fetchrow("""
+            UPDATE media_blobs SET last_used_at = NOW()
+            WHERE guild_id = $1 AND sha256 = $2
+            RETURNING compressed
+        """, guild_id, sha256)
+
+        if existing and await asyncio.to_thread(os.path.exists,
+                                                self.blob_path(guild_id, sha256, existing['compressed'])):
+            return existing['compressed'], True
+
+        compressed = await self._write_blob(guild_id, sha256, staging_path, attachment.filename,
+                                            attachment.content_type)
+        stored_size = await asyncio.to_thread(os.path.getsize, self.blob_path(guild_id, sha256, compressed))
+        await self.bot.pool.execute("""
+            INSERT INTO media_blobs (guild_id, sha256, original_size, stored_size, compressed, content_type)
+            VALUES ($1, $2, $3, $4, $5, $6)
+            ON CONFLICT (guild_id, sha256) DO UPDATE SET
+                stored_size = EXCLUDED.stored_size,
+                compressed = EXCLUDED.compressed,
+                last_used_at = NOW()
+        """, guild_id, sha256, size, stored_size, compressed, attachment.content_type)
+        return compressed, False
+
+    async def _write_blob(self, guild_id: int, sha256: str, staging_path: str, filename: str,
+                          content_type: Optional[str]) -> bool:
+        """Move a staged download into place, gzipped if that pays off. Returns whether it was compressed."""
+        compress = self.is_compressible(filename, content_type)
+        return await asyncio.to_thread(self._place_blob, guild_id, sha256, staging_path, compress)
+
+    def _place_blob(self, guild_id: int, sha256: str, staging_path: str, compress: bool) -> bool:
+        # Runs in a worker thread
+        plain_path = self.blob_path(guild_id, sha256, False)
+        os.makedirs(os.path.dirname(plain_path), exist_ok=True)
+
+        if compress:
+            gz_path = self.blob_path(guild_id, sha256, True)
+            with open(staging_path, 'rb') as src, gzip.open(f"{gz_path}.part", 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst)
+            if os.path.getsize(f"{gz_path}.part") <= os.path.getsize(staging_path) * MIN_COMPRESSION_GAIN:
+                os.replace(f"{gz_path}.part", gz_path)
+                return True
+            os.remove(f"{gz_path}.part")
+
+        shutil.copyfile(staging_path, plain_path)
+        return False
+
+    async def open_blob(self, stored: Dict) -> io.IOBase:
+        """File object with the original bytes of a stored attachment (for re-uploading)"""
+        if stored['compressed']:
+            data = await asyncio.to_thread(_read_gzip, stored['path'])
+            return io.BytesIO(data)
+        return await asyncio.to_thread(open, stored['path'], 'rb')
+
+    # --- pinning --------------------------------------------------------------
+
+    def _pin(self, guild_id: int, sha256: str):
+        self.pinned.setdefault(guild_id, Counter())[sha256] += 1
+
+    def _unpin(self, guild_id: int, sha256: str):
+        pins = self.pinned.get(guild_id)
+        if not pins:
+            return
+        pins[sha256] -= 1
+        if pins[sha256] <= 0:
+            del pins[sha256]
+        if not pins:
+            del self.pinned[guild_id]
+
+    def release(self, stored: Dict):
+        """Unpin a stored blob once it has been opened (or isn't needed), then enforce the quota"""
+        self._unpin(stored['guild_id'], stored['sha256'])
+        if not stored['deduplicated']:
+            self.request_eviction(stored['guild_id'])
+
+    def pinned_blobs(self, guild_id: int) -> List[str]:
+        return list(self.pinned.get(guild_id, ()))
+
+    # --- eviction -------------------------------------------------------------
+
+    def request_eviction(self, guild_id: int):
+        """Run an eviction pass for a guild unless one is already running"""
+        if guild_id in self.evicting:
+            return
+        self.evicting.add(guild_id)
+        self.bot.loop.create_task(self._run_eviction(guild_id))
+
+    async def _run_eviction(self, guild_id: int):
+        try:
+            await self.evict(guild_id)
+        except Exception as e:
+            self.logger.error(f"Media eviction failed: {e}", extra={'guild_id': guild_id})
+        finally:
+            self.evicting.discard(guild_id)
+
+    async def evict(self, guild_id: int) -> int:
+        """Drop blobs past retention, then least recently used ones until the guild fits its quota.
+
+        Pinned blobs (stored but not yet released) are neither evicted nor counted. The DELETE
+        and the file removal both run under the guild's blob lock, so the pin list can't change
+        in between and no store can re-create a file that is about to be removed.
+        """
+        async with self.blob_lock(guild_id):
+            return await self._evict_locked(guild_id)
+
+    async def _evict_locked(self, guild_id: int) -> int:
+        cutoff = datetime.now(timezone.utc) - self.retention(guild_id)
+        rows = await self.bot.pool.fetch("""
+            WITH ranked AS (
+                SELECT sha256, last_used_at,
+                       SUM(stored_size) OVER (ORDER BY last_used_at DESC, sha256) AS running_size
+                FROM media_blobs
+                WHERE guild_id = $1 AND NOT (sha256 = ANY($4::text[]))
+            )
+            DELETE FROM media_blobs b
+            USING ranked r
+            WHERE b.guild_id = $1 AND b.sha256 = r.sha256
+              AND (r.running_size > $2 OR r.last_used_at < $3)
+            RETURNING b.sha256, b.compressed, b.stored_size
+        """, guild_id, self.quota_bytes(guild_id), cutoff, self.pinned_blobs(guild_id))
+
+        if rows:
+            paths = [self.blob_path(guild_id, row['sha256'], row['compressed']) for row in rows]
+            await asyncio.to_thread(lambda: [remove_quietly(path) for path in paths])
+            freed = sum(row['stored_size'] for row in rows)
+            self.logger.info(f"미디어 {len(rows)}개 정리 ({freed / 1024 / 1024:.1f}MB 확보)", extra={'guild_id': guild_id})
+        return len(rows)
+
+    # --- reporting ------------------------------------------------------------
+
+    async def usage_report(self, guild_id: int) -> Dict:
+        """Blob/ref counts and byte totals for a guild"""
+        row = await self.bot.pool.fetchrow("""
+            SELECT
+                (SELECT COUNT(*) FROM media_blobs WHERE guild_id = $1) AS blob_count,
+                (SELECT COALESCE(SUM(stored_size), 0) FROM media_blobs WHERE guild_id = $1) AS stored_bytes,
+                (SELECT COALESCE(SUM(original_size), 0) FROM media_blobs WHERE guild_id = $1) AS original_bytes,
+                (SELECT COUNT(*) FILTER (WHERE compressed) FROM media_blobs WHERE guild_id = $1) AS compressed_count,
+                (SELECT MIN(last_used_at) FROM media_blobs WHERE guild_id = $1) AS oldest_used_at,
+                (SELECT COUNT(*) FROM media_refs WHERE guild_id = $1) AS ref_count,
+                (SELECT COALESCE(SUM(b.original_size), 0)
+                 FROM media_refs r JOIN media_blobs b ON b.guild_id = r.guild_id AND b.sha256 = r.sha256
+                 WHERE r.guild_id = $1) AS referenced_bytes
+        """, guild_id)
+        report = dict(row)
+        report['quota_bytes'] = self.quota_bytes(guild_id)
+        report['retention_days'] = self.retention(guild_id).days
+        return report
+
+
+def _read_gzip(path: str) -> bytes:
+    with gzip.open(path, 'rb') as f:
+        return f.read()
@@ -0,0 +1,146 @@
+# utils/message_archive.py - Full-text searchable archive of deleted and edited messages
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.logger import get_logger
+
+SEARCH_PAGE_SIZE = 8
+
+_MESSAGE_CONTENT = object()  # entry() default: archive message.content
+
+
+def build_prefix_query(text: str) -> Optional[str]:
+    """to_tsquery input matching every word of text as a prefix.
+
+    Korean attaches particles to words (검색 -> 검색어를, 검색했다), so a plain
+    whole-word match misses most hits; prefix terms catch them without needing a
+    morphological analyser in Postgres. Only word characters reach to_tsquery.
+    """
+    words = re.findall(r'\w+', text.lower())
+    if not words:
+        return None
+    return ' & '.join(f"{word}:*" for word in words[:8])
+
+
+class MessageArchive:
+    """Postgres archive of deleted/edited messages with a generated tsvector.
+
+    Rows are appended with one UNNEST insert per event (a bulk delete is one
+    statement), searched through a GIN index on the 'simple' tsvector, and paged
+    by the (archived_at, archive_id) keyset so page 500 costs the same as page 1.
+    """
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.logger = get_logger("메시지 아카이브")
+
+    async def setup_database(self):
+        """Create the archive table and its indexes"""
+        try:
+            await self.bot.pool.execute("""
+                CREATE TABLE IF NOT EXISTS message_archive (
+                    archive_id BIGSERIAL PRIMARY KEY,
+                    guild_id BIGINT NOT NULL,
+                    channel_id BIGINT NOT NULL,
+                    message_id BIGINT NOT NULL,
+                    author_id BIGINT,
+                    author_name TEXT,
+                    event VARCHAR(16) NOT NULL,
+                    content TEXT,
+                    new_content TEXT,
+                    attachments TEXT[],
+                    archived_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                    search TSVECTOR GENERATED ALWAYS AS (
+                        to_tsvector('simple', COALESCE(content, '') || ' ' || COALESCE(new_content, ''))
+                    ) STORED
+                )
+            """)
+
+            await self.bot.pool.execute("""
+                CREATE INDEX IF NOT EXISTS idx_message_archive_search ON message_archive USING GIN (search);
+                CREATE INDEX IF NOT EXISTS idx_message_archive_guild ON message_archive(guild_id, archived_at DESC, archive_id DESC);
+                CREATE INDEX IF NOT EXISTS idx_message_archive_author ON message_archive(guild_id, author_id, archived_at DESC, archive_id DESC);
+                CREATE INDEX IF NOT EXISTS idx_message_archive_channel ON message_archive(guild_id, channel_id, archived_at DESC, archive_id DESC);
+            """)
+
+            self.logger.info("✅ 메시지 아카이브 테이블이 준비되었습니다.")
+        except Exception as e:
+            self.logger.error(f"❌ 메시지 아카이브 테이블 설정 실패: {e}")
+
+    @staticmethod
+    def entry(message, event: str, new_content: Optional[str] = None, content=_MESSAGE_CONTENT) -> Tuple:
+        """Archive row for a discord.Message or CachedMessage.
+
+        content overrides message.content, e.g. an edit's original text resolved from the
+        cache; pass None when it is unknown so the row stores NULL.
+        """
+        author = message.author
+        return (
+            message.guild.id,
+            message.channel.id,
+            message.id,
+            author.id if author else getattr(message, 'author_id', None),
+            str(author) if author else getattr(message, 'author_name', None),
+            event,
+            message.content if content is _MESSAGE_CONTENT else content,
+            new_content,
+            [a.url for a in message.attachments]
+        )
+
+    async def archive(self, entries: Sequence[Tuple]):
+        """Append rows built by entry(); failures are logged, never raised"""
+        if not entries:
+            return
+        try:
+            columns = list(zip(*entries))
+            await self.bot.pool.execute("""
+                INSERT INTO message_archive (guild_id, channel_id, message_id, author_id, author_name,
+                                             event, content, new_content, attachments)
+                SELECT g, c, m, a, n, e, t, nt, string_to_array(att, E'\\n')
+                FROM UNNEST($1::bigint[], $2::bigint[], $3::bigint[], $4::bigint[], $5::text[],
+                            $6::text[], $7::text[], $8::text[], $9::text[])
+                     AS r(g, c, m, a, n, e, t, nt, att)
+            """, *columns[:8], ['\n'.join(urls) if urls else None for urls in columns[8]])
+        except Exception as e:
+            self.logger.error(f"메시지 아카이브 저장 실패 ({len(entries)}개): {e}", exc_info=True)
+
+    async def search(self, guild_id: int, author_id: Optional[int] = None, channel_id: Optional[int] = None,
+                     text: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     cursor: Optional[Tuple[datetime, int]] = None,
+                     limit: int = SEARCH_PAGE_SIZE) -> Tuple[List[Dict], Optional[Tuple[datetime, int]]]:
+        """One page of matches, newest first. Returns (rows, next_cursor)."""
+        conditions = ["guild_id = $1"]
+        args: list = [guild_id]
+
+        def bind(value) -> str:
+            args.append(value)
+            return f"${len(args)}"
+
+        if author_id is not None:
+            conditions.append(f"author_id = {bind(author_id)}")
+        if channel_id is not None:
+            conditions.append(f"channel_id = {bind(channel_id)}")
+        if text:
+            query = build_prefix_query(text)
+            if query:
+                conditions.append(f"search @@ to_tsquery('simple', {bind(query)})")
+        if since is not None:
+            conditions.append(f"archived_at >= {bind(since)}")
+        if until is not None:
+            conditions.append(f"archived_at < {bind(until)}")
+        if cursor is not None:
+            conditions.append(f"(archived_at, archive_id) < ({bind(cursor[0])}, {bind(cursor[1])})")
+
+        rows = await self.bot.pool.fetch(f"""
+            SELECT archive_id, channel_id, message_id, author_id, author_name, event,
+                   content, new_content, attachments, archived_at
+            FROM message_archive
+            WHERE {' AND '.join(conditions)}
+            ORDER BY archived_at DESC, archive_id DESC
+            LIMIT {bind(limit + 1)}
+        """, *args)
+
+        page = [dict(row) for row in rows[:limit]]
+        next_cursor = (page[-1]['archived_at'], page[-1]['archive_id']) if len(rows) > limit else None
+        return page, next_cursor
@@ -0,0 +1,237 @@
+# utils/message_cache.py - Local, restart-safe cache of recent messages for edit/delete logging
+import asyncio
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+
+from utils.logger import get_logger
+
+DEFAULT_PATH = "data/message_cache.sqlite3"
+PER_CHANNEL_LIMIT = 1000
+TTL_SECONDS = 7 * 24 * 3600
+FLUSH_INTERVAL = 2.0  # seconds between batched writes
+PURGE_INTERVAL = 3600
+
+
+class CachedAttachment:
+    """The attachment fields the message log needs, rebuilt from the cache"""
+
+    __slots__ = ('filename', 'url', 'content_type', 'size')
+
+    def __init__(self, filename: str, url: str, content_type: Optional[str] = None, size: int = 0):
+        self.filename = filename
+        self.url = url
+        self.content_type = content_type
+        self.size = size
+
+    def __eq__(self, other):
+        return getattr(other, 'url', None) == self.url
+
+    def __hash__(self):
+        return hash(self.url)
+
+
+class CachedMessage:
+    """Stand-in for a discord.Message that is no longer in discord.py's cache"""
+
+    def __init__(self, row: Dict, guild, channel, author):
+        self.id = row['message_id']
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+        self.author_id = row['author_id']
+        self.author_name = row['author_name']
+        self.content = row['content']
+        self.attachments = [CachedAttachment(**a) for a in row['attachments']]
+        self.created_at = row['created_at']
+
+    @property
+    def jump_url(self) -> str:
+        return f"https://discord.com/channels/{self.guild.id}/{self.channel.id}/{self.id}"
+
+
+class MessageCache:
+    """Bounded per-channel message cache in a local SQLite file.
+
+    on_message puts messages into an in-memory write buffer that is flushed to
+    SQLite in one transaction every FLUSH_INTERVAL seconds, so a busy channel
+    costs one disk write per batch rather than per message, which matters on an
+    SD card. Lookups check the buffer first. Each channel keeps its newest
+    PER_CHANNEL_LIMIT messages and anything older than TTL_SECONDS is purged.
+    All SQLite work runs on one dedicated thread that owns the connection.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, per_channel_limit: int = PER_CHANNEL_LIMIT,
+                 ttl_seconds: int = TTL_SECONDS):
+        self.path = path
+        self.per_channel_limit = per_channel_limit
+        self.ttl_seconds = ttl_seconds
+        self.logger = get_logger("메시지 캐시")
+
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="message-cache")
+        self.conn: Optional[sqlite3.Connection] = None
+        self.pending: Dict[int, tuple] = {}  # message_id -> row awaiting flush
+        self.in_flight: Dict[int, tuple] = {}  # rows being written by the current flush
+        self.pending_deletes: set = set()
+        self.flush_task: Optional[asyncio.Task] = None
+        self.last_purge = 0.0
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # --- lifecycle ------------------------------------------------------------
+
+    async def open(self):
+        await self._run(self._open)
+        self.flush_task = asyncio.get_running_loop().create_task(self._flush_loop())
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS messages (
+                message_id INTEGER PRIMARY KEY,
+                guild_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                author_id INTEGER NOT NULL,
+                author_name TEXT,
+                content TEXT,
+                attachments TEXT,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_channel ON messages(channel_id, message_id)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_messages_created ON messages(created_at)")
+        self.conn.commit()
+
+    async def close(self):
+        if self.flush_task:
+            self.flush_task.cancel()
+            self.flush_task = None
+        if self.conn:
+            await self.flush()
+            await self._run(self.conn.close)
+            self.conn = None
+        self.executor.shutdown(wait=False)
+
+    # --- public API -----------------------------------------------------------
+
+    def put(self, message):
+        """Cache (or refresh) a message; written on the next flush"""
+        attachments = json.dumps([
+            {'filename': a.filename, 'url': a.url, 'content_type': a.content_type, 'size': a.size}
+            for a in message.attachments
+        ], ensure_ascii=False)
+        self.pending_deletes.discard(message.id)
+        self.pending[message.id] = (
+            message.id, message.guild.id, message.channel.id, message.author.id, str(message.author),
+            message.content, attachments, message.created_at.timestamp()
+        )
+
+    def forget(self, message_id: int):
+        """Drop a message, e.g. once its deletion has been logged"""
+        self.pending.pop(message_id, None)
+        self.pending_deletes.add(message_id)
+
+    async def get(self, message_id: int) -> Optional[Dict]:
+        """Cached row as a dict, or None"""
+        return (await self.get_many([message_id])).get(message_id)
+
+    async def get_many(self, message_ids: Iterable[int]) -> Dict[int, Dict]:
+        """Cached rows for whichever of message_ids are cached, in one query"""
+        rows = {}
+        missing = []
+        for message_id in message_ids:
+            if message_id in self.pending_deletes:
+                continue
+            row = self.pending.get(message_id) or self.in_flight.get(message_id)
+            if row is None:
+                missing.append(message_id)
+            else:
+                rows[message_id] = row
+        if missing and self.conn:
+            for row in await self._run(self._fetch_many, missing):
+                rows[row[0]] = row
+
+        return {
+            message_id: {
+                'message_id': row[0], 'guild_id': row[1], 'channel_id': row[2], 'author_id': row[3],
+                'author_name': row[4], 'content': row[5], 'attachments': json.loads(row[6] or '[]'),
+                'created_at': row[7]
+            }
+            for message_id, row in rows.items()
+        }
+
+    def _fetch_many(self, message_ids: List[int]):
+        placeholders = ",".join("?" * len(message_ids))
+        return self.conn.execute(f"""
+            SELECT message_id, guild_id, channel_id, author_id, author_name, content, attachments, created_at
+            FROM messages WHERE message_id IN ({placeholders})
+        """, message_ids).fetchall()
+
+    # --- flushing and eviction ------------------------------------------------
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                self.logger.error(f"Message cache flush failed: {e}")
+
+    async def flush(self):
+        """Write buffered messages, trim touched channels and purge expired rows"""
+        if not self.pending and not self.pending_deletes and time.time() - self.last_purge < PURGE_INTERVAL:
+            return
+        self.in_flight, self.pending = self.pending, {}
+        deletes, self.pending_deletes = list(self.pending_deletes), set()
+        purge = time.time() - self.last_purge >= PURGE_INTERVAL
+        if purge:
+            self.last_purge = time.time()
+        try:
+            await self._run(self._write, list(self.in_flight.values()), deletes, purge)
+        except BaseException:
+            # Keep the batch for the next flush: messages put since then are newer and win,
+            # and deletes are only restored for messages that weren't re-cached meanwhile
+            self.pending_deletes.update(d for d in deletes if d not in self.pending)
+            for message_id, row in self.in_flight.items():
+                if message_id not in self.pending_deletes:  # forgotten while the write was running
+                    self.pending.setdefault(message_id, row)
+            if purge:
+                self.last_purge = 0.0
+            raise
+        finally:
+            self.in_flight = {}
+
+    def _write(self, rows: List[tuple], deletes: List[int], purge: bool):
+        with self.conn:
+            if rows:
+                self.conn.executemany("""
+                    INSERT INTO messages (message_id, guild_id, channel_id, author_id, author_name,
+                                          content, attachments, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(message_id) DO UPDATE SET
+                        content = excluded.content,
+                        attachments = excluded.attachments,
+                        author_name = excluded.author_name
+                """, rows)
+            if deletes:
+                self.conn.executemany("DELETE FROM messages WHERE message_id = ?", [(d,) for d in deletes])
+
+            # Keep only the newest messages of every channel that just grew
+            for channel_id in {row[2] for row in rows}:
+                self.conn.execute("""
+                    DELETE FROM messages
+                    WHERE channel_id = ? AND message_id < (
+                        SELECT message_id FROM messages WHERE channel_id = ?
+                        ORDER BY message_id DESC LIMIT 1 OFFSET ?
+                    )
+                """, (channel_id, channel_id, self.per_channel_limit - 1))
+
+            if purge:
+                self.conn.execute("DELETE FROM messages WHERE created_at < ?", (time.time() - self.ttl_seconds,))
@@ -0,0 +1,167 @@
+# utils/team_balance.py - Even team splits for scrims by player rating
+import itertools
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Largest lobby split exactly; each half enumerates 2^(n/2) subsets (65k at 32 players)
+EXACT_LIMIT = 32
+
+
+def team_sizes(player_count: int, team_count: int) -> List[int]:
+    """Sizes as even as possible, larger teams first"""
+    base, extra = divmod(player_count, team_count)
+    return [base + 1 if i < extra else base for i in range(team_count)]
+
+
+def balance_teams(ratings: Dict[int, float], team_count: int = 2) -> List[List[int]]:
+    """Split players into team_count teams of (nearly) equal size with sums as close as possible.
+
+    Two teams of up to EXACT_LIMIT players are split optimally by meet-in-the-middle;
+    anything larger, or more than two teams, uses the greedy split plus swap refinement.
+    """
+    players = sorted(ratings, key=lambda p: ratings[p], reverse=True)
+    if team_count < 2 or len(players) < team_count:
+        return [players]
+
+    if team_count == 2 and len(players) <= EXACT_LIMIT:
+        return _split_two_exact(players, ratings)
+    return _split_greedy(players, ratings, team_count)
+
+
+def rating_spread(teams: Sequence[Sequence[int]], ratings: Dict[int, float]) -> float:
+    """Difference between the strongest and weakest team's rating sum"""
+    sums = [sum(ratings[p] for p in team) for team in teams]
+    return max(sums) - min(sums)
+
+
+# =============================================================================
+# EXACT TWO-TEAM SPLIT
+# =============================================================================
+
+def _subset_sums(values: Sequence[float]) -> List[List[Tuple[float, int]]]:
+    """(sum, mask) for every subset of values, bucketed by subset size"""
+    by_size: List[List[Tuple[float, int]]] = [[] for _ in range(len(values) + 1)]
+    sums = [0.0] * (1 << len(values))
+    by_size[0].append((0.0, 0))
+    for mask in range(1, 1 << len(values)):
+        low = mask & -mask
+        sums[mask] = sums[mask ^ low] + values[low.bit_length() - 1]
+        by_size[bin(mask).count('1')].append((sums[mask], mask))
+    return by_size
+
+
+def _split_two_exact(players: List[int], ratings: Dict[int, float]) -> List[List[int]]:
+    """Optimal equal-size split: pair left-half subsets with the closest right-half subset"""
+    values = [ratings[p] for p in players]
+    size = len(players) // 2
+    target = sum(values) / 2
+
+    half = len(players) // 2
+    left, right = values[:half], values[half:]
+    left_sums = _subset_sums(left)
+    right_sums = [sorted(bucket) for bucket in _subset_sums(right)]
+    right_keys = [[s for s, _ in bucket] for bucket in right_sums]
+
+    best = (float('inf'), 0, 0)
+    for k in range(max(0, size - len(right)), min(size, len(left)) + 1):
+        keys, bucket = right_keys[size - k], right_sums[size - k]
+        for s, left_mask in left_sums[k]:
+            i = bisect_left(keys, target - s)
+            for j in (i - 1, i):
+                if 0 <= j < len(keys):
+                    gap = abs(s + keys[j] - target)
+                    if gap < best[0]:
+                        best = (gap, left_mask, bucket[j][1])
+            if best[0] == 0:
+                break
+
+    _, left_mask, right_mask = best
+    chosen = {i for i in range(len(left)) if left_mask >> i & 1}
+    chosen |= {half + i for i in range(len(right)) if right_mask >> i & 1}
+    team_a = [p for i, p in enumerate(players) if i in chosen]
+    team_b = [p for i, p in enumerate(players) if i not in chosen]
+    return [team_a, team_b]
+
+
+# =============================================================================
+# GREEDY FALLBACK
+# =============================================================================
+
+def _split_greedy(players: List[int], ratings: Dict[int, float], team_count: int) -> List[List[int]]:
+    """Strongest-first into the weakest open team, then swap pairs while the spread shrinks"""
+    capacity = team_sizes(len(players), team_count)
+    teams: List[List[int]] = [[] for _ in range(team_count)]
+    sums = [0.0] * team_count
+
+    for p in players:  # already strongest first
+        open_teams = [t for t in range(team_count) if len(teams[t]) < capacity[t]]
+        t = min(open_teams, key=lambda i: sums[i])
+        teams[t].append(p)
+        sums[t] += ratings[p]
+
+    improved = True
+    while improved:
+        improved = False
+        hi = max(range(team_count), key=lambda i: sums[i])
+        lo = min(range(team_count), key=lambda i: sums[i])
+        gap = sums[hi] - sums[lo]
+        best_swap, best_gap = None, gap
+        for a in teams[hi]:
+            for b in teams[lo]:
+                delta = ratings[a] - ratings[b]
+                if 0 < delta < gap and abs(gap - 2 * delta) < best_gap:
+                    best_swap, best_gap = (a, b, delta), abs(gap - 2 * delta)
+        if best_swap:
+            a, b, delta = best_swap
+            teams[hi][teams[hi].index(a)] = b
+            teams[lo][teams[lo].index(b)] = a
+            sums[hi] -= delta
+            sums[lo] += delta
+            improved = True
+
+    return teams
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+
+def _split_two_brute_force(ratings: Dict[int, float]) -> List[List[int]]:
+    """Reference split over every combination; only usable for small lobbies"""
+    players = list(ratings)
+    target = sum(ratings.values()) / 2
+    best = min(itertools.combinations(players, len(players) // 2),
+               key=lambda team: abs(sum(ratings[p] for p in team) - target))
+    chosen = set(best)
+    return [list(best), [p for p in players if p not in chosen]]
+
+
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(42)
+    print(f"{'players':>7} {'brute force':>12} {'balancer':>10} {'spread (bf / bal)':>18}")
+    for n in (10, 14, 18, 20, 24):
+        ratings = {uid: rng.randint(300, 800) for uid in range(n)}
+
+        start = time.perf_counter()
+        fast = balance_teams(ratings)
+        fast_time = time.perf_counter() - start
+
+        if n <= 20:
+            start = time.perf_counter()
+            brute = _split_two_brute_force(ratings)
+            brute_time = f"{(time.perf_counter() - start) * 1000:10.1f}ms"
+            brute_spread = f"{rating_spread(brute, ratings):g}"
+        else:
+            brute_time, brute_spread = f"{'-':>12}", "-"
+
+        print(f"{n:>7} {brute_time:>12} {fast_time * 1000:8.1f}ms "
+              f"{brute_spread + ' / ' + format(rating_spread(fast, ratings), 'g'):>18}")
+
+    ratings = {uid: rng.randint(300, 800) for uid in range(60)}
+    start = time.perf_counter()
+    teams = balance_teams(ratings)
+    print(f"60 players (greedy): {(time.perf_counter() - start) * 1000:.1f}ms, "
+          f"spread {rating_spread(teams, ratings):g}")